@@ -0,0 +1,166 @@
+"""
+Measure the throughput of the bank email parsers, in emails per second, on a
+generated corpus of BAC and Promerica notification bodies.
+
+Besides the engine it times the way the parsers worked before it: a parser
+object per email and one uncompiled `re.search` per field. Both are checked to
+extract the same fields.
+
+    poetry run python -m benchmarks.parsers --emails 20000 --repeat 5
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple, Type
+
+# The repositories and services import each other, the dependencies package
+# loads them in an order that works
+import src.dependencies  # noqa: F401
+from src.models.enums import Bank
+from src.parsers import (BacMessageParser, BaseMessageParser, ParsedFields,
+                         PromericaMessageParser)
+from src.schemas import EmailMessageModel
+from src.services.transaction_service import parse_many
+
+BUSINESSES = ['AUTO MERCADO ESCAZU', 'WALMART CURRIDABAT', 'UBER TRIP', 'AMAZON MKTPLACE PMTS',
+              'FARMACIA FISCHEL', 'DELTA SERVICENTRO', 'NETFLIX.COM', 'SODA LA MAYA',
+              'PRICESMART ZAPOTE', 'MCDONALDS LINCOLN PLAZA', 'SPOTIFY', 'GASOLINERA LA GALERA']
+BUSINESS_TYPES = ['SUPERMERCADOS', 'RESTAURANTES', 'ESTACIONES DE SERVICIO',
+                  'FARMACIAS', 'SERVICIOS DIGITALES', 'TRANSPORTE']
+CURRENCIES = ['CRC', 'CRC', 'CRC', 'USD']
+
+FOOTER = '''
+Este correo es generado automaticamente, por favor no responda a esta direccion.
+Si usted no reconoce esta transaccion comuniquese de inmediato con nuestro Centro
+de Atencion al Cliente, disponible las 24 horas del dia, los 365 dias del ano.
+Recuerde que nunca le solicitaremos por correo electronico, mensaje de texto o
+llamada telefonica sus claves, PIN, codigos de seguridad o informacion de sus
+tarjetas. Proteja su informacion y la de su familia.
+La informacion contenida en este mensaje es confidencial y de uso exclusivo del
+destinatario. Si usted recibio este mensaje por error, le solicitamos eliminarlo
+y notificar al remitente. Cualquier divulgacion, copia o distribucion del mismo
+esta prohibida.
+'''
+
+BAC_BODY = '''Hola {holder}
+A continuacion le detallamos la transaccion realizada:
+Comercio:
+    {business}
+Ciudad y pais:
+    SAN JOSE, Costa Rica
+Fecha:
+    {date:%b %d, %Y, %H:%M}
+VISA
+    ************{card}
+Autorizacion:
+    {authorization}
+Referencia:
+    {reference}
+Tipo de Transaccion:
+    COMPRA
+Monto:
+    {currency} {value:,.2f}
+''' + FOOTER
+
+PROMERICA_BODY = '''Comprobante de Transaccion
+Estimado(a) {holder}:
+Le informamos que se ha realizado una transaccion con su tarjeta
+Tarjeta    ****{card}
+Comercio    {business}
+Tipo de Comercio    {business_type}
+  * Monto  
+ {currency}: {value:,.2f}
+  * Fecha    {date:%d/%m/%Y %H:%M}
+  * Autorizacion    {authorization}
+''' + FOOTER
+
+
+def build_corpus(size: int, seed: int) -> List[Tuple[Bank, EmailMessageModel]]:
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    corpus = []
+    for i in range(size):
+        bank = Bank.BAC if i % 2 == 0 else Bank.PROMERICA
+        template = BAC_BODY if bank is Bank.BAC else PROMERICA_BODY
+        date = start + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60))
+        body = template.format(
+            holder='JUAN PEREZ MORA',
+            business=rng.choice(BUSINESSES),
+            business_type=rng.choice(BUSINESS_TYPES),
+            date=date,
+            card=rng.randrange(1000, 9999),
+            authorization=rng.randrange(100000, 999999),
+            reference=rng.randrange(10 ** 11, 10 ** 12),
+            currency=rng.choice(CURRENCIES),
+            value=rng.uniform(500, 250000),
+        )
+        corpus.append((bank, EmailMessageModel(
+            subject='Comprobante de Transaccion', from_email=bank.email, date=date, body=body)))
+    return corpus
+
+
+def per_call_parse(parser: Type[BaseMessageParser], email: EmailMessageModel) -> ParsedFields:
+    instance = parser(email)
+    groups = {}
+    for rule in instance.rules:
+        match = re.search(rule.pattern, instance.body, rule.flags)
+        groups.update(match.groupdict() if match else dict.fromkeys(
+            re.compile(rule.pattern, rule.flags).groupindex))
+    return parser.from_groups(groups)
+
+
+def measure(func: Callable[[], object], count: int, repeat: int) -> float:
+    best = min(_timed(func) for _ in range(repeat))
+    return count / best
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--emails', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.emails, args.seed)
+    by_bank = {bank: [email for b, email in corpus if b is bank]
+               for bank in (Bank.BAC, Bank.PROMERICA)}
+    parsers = {Bank.BAC: BacMessageParser,
+               Bank.PROMERICA: PromericaMessageParser}
+
+    for bank, emails in by_bank.items():
+        bank_parser = parsers[bank]
+        for email in emails:
+            if bank_parser.parse(email.body) != per_call_parse(bank_parser, email):
+                raise SystemExit(
+                    f'{bank.name} engine result differs from the per call parser:\n{email.body}')
+
+    def run_per_call():
+        for bank, emails in by_bank.items():
+            for email in emails:
+                per_call_parse(parsers[bank], email)
+
+    def run_engine():
+        for bank, emails in by_bank.items():
+            parsers[bank].parse_many(email.body for email in emails)
+
+    def run_transactions():
+        for bank, emails in by_bank.items():
+            parse_many(emails, bank)
+
+    print(f'{args.emails} emails, best of {args.repeat}')
+    for name, func in [('per call parser', run_per_call),
+                       ('engine, fields only', run_engine),
+                       ('engine, TransactionCreate', run_transactions)]:
+        print(f'{name:<28}{measure(func, args.emails, args.repeat):>12,.0f} emails/s')
+
+
+if __name__ == '__main__':
+    main()
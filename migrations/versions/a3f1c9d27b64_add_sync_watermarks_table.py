@@ -0,0 +1,35 @@
+"""Add sync_watermarks table
+
+Revision ID: a3f1c9d27b64
+Revises: 294740e49083
+Create Date: 2026-10-18 09:12:41.530118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d27b64'
+down_revision: Union[str, None] = '294740e49083'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_watermarks',
+        sa.Column('bank_name', sa.String(), nullable=False),
+        sa.Column('mailbox', sa.String(), nullable=False),
+        sa.Column('last_email_date', sa.DateTime(
+            timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text(
+            'CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('bank_name', 'mailbox')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_watermarks')
@@ -0,0 +1,47 @@
+"""Add indexes matching the transactions query shapes
+
+Revision ID: c7d2e4b81f05
+Revises: a3f1c9d27b64
+Create Date: 2026-10-18 11:03:27.184462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e4b81f05'
+down_revision: Union[str, None] = 'a3f1c9d27b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, but it doesn't block
+    # ingestion while the indexes are built
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_listing', 'transactions',
+            [sa.text('date(date) DESC'), 'business', sa.text('value DESC'), 'id'],
+            postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'ix_transactions_bank_value', 'transactions',
+            ['bank_name', 'value', 'id'],
+            postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'ix_transactions_currency_date', 'transactions',
+            ['currency_id', 'date'], postgresql_include=['value'],
+            postgresql_concurrently=True, if_not_exists=True)
+    op.execute('ANALYZE transactions')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transactions_currency_date', table_name='transactions',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_transactions_bank_value', table_name='transactions',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_transactions_listing', table_name='transactions',
+                      postgresql_concurrently=True, if_exists=True)
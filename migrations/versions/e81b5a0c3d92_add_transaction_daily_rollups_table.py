@@ -0,0 +1,44 @@
+"""Add transaction_daily_rollups table
+
+Revision ID: e81b5a0c3d92
+Revises: c7d2e4b81f05
+Create Date: 2026-10-18 12:26:05.907312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b5a0c3d92'
+down_revision: Union[str, None] = 'c7d2e4b81f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transaction_daily_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('currency_id', sa.Integer(), nullable=False),
+        sa.Column('bank_name', sa.String(), nullable=False),
+        sa.Column('total_value', sa.Float(), nullable=False),
+        sa.Column('transaction_count', sa.BigInteger(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=False),
+        sa.Column('max_value', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['currency_id'], ['currencies.id']),
+        sa.PrimaryKeyConstraint('day', 'currency_id', 'bank_name')
+    )
+    op.execute('''
+        INSERT INTO transaction_daily_rollups
+            (day, currency_id, bank_name, total_value, transaction_count, min_value, max_value)
+        SELECT date::date, currency_id, bank_name, SUM(value), COUNT(*), MIN(value), MAX(value)
+        FROM transactions
+        GROUP BY date::date, currency_id, bank_name
+    ''')
+
+
+def downgrade() -> None:
+    op.drop_table('transaction_daily_rollups')
@@ -0,0 +1,164 @@
+"""
+Record the EXPLAIN (ANALYZE, BUFFERS) plans of the transactions queries before
+and after the indexes of migration c7d2e4b81f05, on a seeded dataset.
+
+Everything happens inside one transaction, in a scratch schema that shadows the
+real tables through the search_path, and is rolled back at the end. The
+database only needs to be migrated (the metrics query uses the time_period
+type).
+
+    poetry run python -m scripts.explain_indexes --rows 200000 --output explain.md
+"""
+import argparse
+import re
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import Connection, create_engine, select, text
+
+# The repositories and services import each other, the dependencies package
+# loads them in an order that works
+import src.dependencies  # noqa: F401
+from src.config import config
+from src.models import TimePeriod, TransactionDailyRollupTable, TransactionTable
+from src.models.currency import CurrencyTable
+from src.repositories.statements import EXPENSES, PERIOD_EXPENSE_METRICS
+from src.schemas.api_response import DateRange
+from src.services.transaction_service import BANK_LISTING_SORT, LISTING_SORT
+from src.utils.explain import Explain
+from src.utils.keyset import order_by_keys, seek_predicate
+
+SCHEMA = 'explain_check'
+QUERY_INDEXES = ('ix_transactions_listing',
+                 'ix_transactions_bank_value', 'ix_transactions_currency_date')
+
+SEED = '''
+INSERT INTO transactions (id, date, value, currency_id, business, bank_name, bank_email, body)
+SELECT
+    md5(i::text) || md5((-i)::text),
+    timestamp '2020-01-01' + random() * interval '5 years',
+    round((random() * 100000)::numeric, 2),
+    CASE WHEN random() < 0.8 THEN 1 ELSE 2 END,
+    'Business ' || (random() * 500)::int,
+    CASE WHEN i % 2 = 0 THEN 'BAC' ELSE 'Promerica' END,
+    '',
+    ''
+FROM generate_series(1, :rows) AS i
+'''
+
+SEED_ROLLUPS = '''
+INSERT INTO transaction_daily_rollups
+    (day, currency_id, bank_name, total_value, transaction_count, min_value, max_value)
+SELECT date::date, currency_id, bank_name, SUM(value), COUNT(*), MIN(value), MAX(value)
+FROM transactions
+GROUP BY date::date, currency_id, bank_name
+'''
+
+
+def build_queries(conn: Connection, rows: int, page_size: int) -> List[Tuple[str, object]]:
+    date_range = DateRange(start_date=datetime(2022, 1, 1),
+                           end_date=datetime(2023, 12, 31))
+    listing_filter = date_range.contains(TransactionTable.date)
+    bank_filter = TransactionTable.bank_name == 'BAC'
+    deep_offset = rows // 4
+
+    # Sort keys of a row deep into each listing, as a keyset cursor would carry them
+    listing_key = conn.execute(
+        select(*[key.column for key in LISTING_SORT]).where(listing_filter)
+        .order_by(*order_by_keys(LISTING_SORT)).offset(deep_offset).limit(1)).one()
+    bank_key = conn.execute(
+        select(*[key.column for key in BANK_LISTING_SORT]).where(bank_filter)
+        .order_by(*order_by_keys(BANK_LISTING_SORT)).offset(deep_offset).limit(1)).one()
+
+    listing = select(TransactionTable).where(
+        listing_filter).order_by(*order_by_keys(LISTING_SORT))
+    bank_listing = select(TransactionTable).where(
+        bank_filter).order_by(*order_by_keys(BANK_LISTING_SORT))
+
+    expenses = EXPENSES.params(date_range.model_dump())
+    metrics = PERIOD_EXPENSE_METRICS.params(
+        **date_range.model_dump(), period=TimePeriod.MONTHLY.value, currency='CRC')
+
+    return [
+        ('listing, first page', listing.limit(page_size + 1)),
+        (f'listing, OFFSET {deep_offset}', listing.offset(
+            deep_offset).limit(page_size + 1)),
+        ('listing, keyset page at the same row', listing.where(
+            seek_predicate(LISTING_SORT, listing_key)).limit(page_size + 1)),
+        ('bank listing, first page', bank_listing.limit(page_size + 1)),
+        ('bank listing, keyset deep page', bank_listing.where(
+            seek_predicate(BANK_LISTING_SORT, bank_key)).limit(page_size + 1)),
+        ('expenses', expenses),
+        ('monthly metrics', metrics),
+    ]
+
+
+def explain(conn: Connection, statement) -> Tuple[str, float]:
+    lines = conn.execute(
+        Explain(statement, analyze=True, buffers=True, format='TEXT')).scalars().all()
+    plan = '\n'.join(lines)
+    match = re.search(r'Execution Time: ([\d.]+) ms', plan)
+    return plan, float(match.group(1)) if match else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--page-size', type=int, default=config.PAGE_SIZE)
+    parser.add_argument('--output', default='explain_indexes.md')
+    args = parser.parse_args()
+
+    engine = create_engine(config.DATABASE_URL)
+    tables = [CurrencyTable.__table__, TransactionTable.__table__,
+              TransactionDailyRollupTable.__table__]
+    indexes = [index for index in TransactionTable.__table__.indexes
+               if index.name in QUERY_INDEXES]
+    plans = {}
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            conn.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+            conn.execute(text(f'SET LOCAL search_path TO {SCHEMA}, public'))
+            # checkfirst would find the real tables through the search_path
+            CurrencyTable.metadata.create_all(
+                conn, tables=tables, checkfirst=False)
+            for index in indexes:
+                index.drop(conn)
+
+            conn.execute(text(
+                "INSERT INTO currencies (id, code, symbol) VALUES (1, 'CRC', '₡'), (2, 'USD', '$')"))
+            conn.execute(text(SEED), {'rows': args.rows})
+            conn.execute(text(SEED_ROLLUPS))
+            for table in tables:
+                conn.execute(text(f'ANALYZE {table.name}'))
+            queries = build_queries(conn, args.rows, args.page_size)
+
+            for name, statement in queries:
+                plans[name] = [explain(conn, statement)]
+
+            for index in indexes:
+                index.create(conn)
+            conn.execute(text('ANALYZE transactions'))
+
+            for name, statement in queries:
+                plans[name].append(explain(conn, statement))
+        finally:
+            transaction.rollback()
+
+    report = [f'# EXPLAIN before/after the transactions indexes ({args.rows} rows)', '',
+              '| Query | Before (ms) | After (ms) |', '| --- | ---: | ---: |']
+    report += [f'| {name} | {before[1]:.2f} | {after[1]:.2f} |'
+               for name, (before, after) in plans.items()]
+    for name, (before, after) in plans.items():
+        report += ['', f'## {name}', '', '### Before', '', '```',
+                   before[0], '```', '', '### After', '', '```', after[0], '```']
+
+    with open(args.output, 'w') as f:
+        f.write('\n'.join(report) + '\n')
+    print('\n'.join(report[:len(plans) + 4]))
+    print(f'\nFull plans written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,9 +11,83 @@ class Settings(BaseSettings):
         extra="ignore"
     )
     DATABASE_URL: str
+    # 'async' serves the read endpoints from an asyncpg engine on the event loop instead of the threadpool
+    DATABASE_ENGINE: Literal['sync', 'async'] = 'sync'
+    # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connections each engine of a worker keeps open, and how many more it may open under load
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    # Seconds a checkout waits for a free connection before failing
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    # Seconds after which a connection is replaced on its next checkout, -1 keeps them
+    DATABASE_POOL_RECYCLE: int = -1
+    # Test every connection with a round trip on checkout, so dropped ones are replaced
+    DATABASE_POOL_PRE_PING: bool = False
+    # Milliseconds before Postgres cancels a statement, 0 lets them run
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 0
+    # Statements taking at least this many milliseconds go to the slow_queries log, 0 logs none
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    # Whether slow statements are logged with their parameters, which hold email bodies on inserts
+    SLOW_QUERY_LOG_PARAMETERS: bool = True
     EMAIL_PROCESSING_THREADS: int
+    EMAIL_API_URL: str = 'http://email-api:80'
+    EMAIL_API_TIMEOUT: float = 30.0
+    # 'asyncio' fetches every bank concurrently on one event loop, 'threads' uses ThreadedPaginator
+    EMAIL_FETCH_ENGINE: Literal['asyncio', 'threads'] = 'asyncio'
+    # Global budget of in-flight page fetches shared by every bank and request
+    EMAIL_FETCH_CONCURRENCY: int = 16
+    EMAIL_API_MAX_CONNECTIONS: int = 20
+    EMAIL_API_MAX_CONNECTIONS_PER_HOST: int = 10
+    # Retries per page in ThreadedPaginator, with jittered exponential backoff starting at EMAIL_FETCH_BACKOFF seconds
+    EMAIL_FETCH_RETRIES: int = 3
+    EMAIL_FETCH_BACKOFF: float = 0.5
     CACHE_CAPACITY_TRANSACTION_LIST: int = 5
+    # How listings fill total_items when the request doesn't pick a count mode, see CountMode
+    PAGINATION_COUNT_MODE: Literal['exact', 'cached', 'estimate', 'window', 'none'] = 'exact'
+    # Cached counts are dropped on every write to their table, when a pull in any worker moves the
+    # ingest generation of the response cache, and after COUNT_CACHE_TTL seconds
+    COUNT_CACHE_CAPACITY: int = 256
+    COUNT_CACHE_TTL: float = 300.0
     ENVIRONMENT: Literal['local', 'development', 'production'] = 'local'
+    # Rows per multi-row INSERT when pulling in bulk. None writes one batch per fetched page.
+    INGEST_BATCH_SIZE: Optional[int] = None
+    # Pages buffered between two stages of the pull pipeline (fetch -> parse -> write)
+    INGEST_QUEUE_SIZE: int = 4
+    # Worker processes that parse pulled emails, 0 parses them on a thread of the pull pipeline
+    PARSE_PROCESSES: int = 0
+    # Emails per batch sent to a parse worker
+    PARSE_BATCH_SIZE: int = 250
+    # In-memory Bloom filter of the stored transaction ids, lets pulls skip the existence check for new ids
+    KNOWN_IDS_FILTER_ENABLED: bool = True
+    KNOWN_IDS_FILTER_CAPACITY: int = 1_000_000
+    KNOWN_IDS_FILTER_ERROR_RATE: float = 0.01
+    # Ids read per round trip when the filter is rebuilt
+    KNOWN_IDS_FILTER_BATCH_SIZE: int = 10_000
+    # Rows fetched from the server side cursor per chunk of GET /transactions/export
+    EXPORT_BATCH_SIZE: int = 5_000
+    # Incremental pulls start this many minutes before each bank's sync watermark
+    SYNC_OVERLAP_MINUTES: int = 60
+    # Background incremental pull of every bank, see services/scheduler_service.py
+    SYNC_SCHEDULER_ENABLED: bool = True
+    SYNC_INTERVAL_MINUTES: int = 30
+    # Codes missing from the bundled ISO-4217 table are looked up on restcountries.com
+    CURRENCY_REMOTE_LOOKUP: bool = False
+    CURRENCY_REMOTE_LOOKUP_TIMEOUT: float = 5.0
+    # Seconds before the set of currencies served to readers is reloaded in the background
+    CURRENCY_SET_TTL: float = 300.0
+    MEMCACHE_HOST: str = 'memcached'
+    MEMCACHE_PORT: int = 11211
+    # Seconds before a Memcached call gives up, the cache is skipped when it is down
+    MEMCACHE_TIMEOUT: float = 0.5
+    # Seconds Memcached is left alone after a failed call before it is tried again
+    MEMCACHE_RETRY_AFTER: float = 30.0
+    # Read endpoints are cached until the next pull writes new rows, see services/response_cache_service.py
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 3600
+    RESPONSE_CACHE_L1_CAPACITY: int = 256
+    # How long a worker trusts its copy of the shared ingest generation before asking Memcached again
+    RESPONSE_CACHE_GENERATION_TTL: float = 1.0
     MAILBOX: str = 'inbox'
     PAGE_SIZE: int = 15
 
@@ -1,10 +1,57 @@
-from sqlalchemy import create_engine
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker
 from .config.app_settings import config
+from .utils.pool_stats import (InstrumentedAsyncAdaptedQueuePool,
+                               InstrumentedQueuePool, forget_pool,
+                               instrument_pool)
+from .utils.query_stats import forget_engine, instrument_engine
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+def pool_options() -> dict:
+    return dict(
+        pool_size=config.DATABASE_POOL_SIZE,
+        max_overflow=config.DATABASE_MAX_OVERFLOW,
+        pool_timeout=config.DATABASE_POOL_TIMEOUT,
+        pool_recycle=config.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=config.DATABASE_POOL_PRE_PING,
+    )
+
 
-engine = create_engine(config.DATABASE_URL)
+def query_stats_options() -> dict:
+    threshold = config.SLOW_QUERY_THRESHOLD_MS
+    return dict(
+        slow_threshold=threshold / 1000 if threshold > 0 else None,
+        log_parameters=config.SLOW_QUERY_LOG_PARAMETERS,
+    )
+
+
+def connect_args(url: str) -> dict:
+    """Driver arguments that set DATABASE_STATEMENT_TIMEOUT_MS on every new connection."""
+    timeout = config.DATABASE_STATEMENT_TIMEOUT_MS
+    if timeout <= 0:
+        return {}
+    if make_url(url).get_driver_name() == 'asyncpg':
+        return {'server_settings': {'statement_timeout': str(timeout)}}
+    return {'options': f'-c statement_timeout={timeout}'}
+
+
+engine = create_engine(config.DATABASE_URL, poolclass=InstrumentedQueuePool,
+                       connect_args=connect_args(config.DATABASE_URL), **pool_options())
+instrument_pool('sync', engine.pool)
+instrument_engine('sync', engine, **query_stats_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Only created when DATABASE_ENGINE is 'async', which needs the `async` extra (poetry install -E async) for asyncpg
+async_engine: Optional['AsyncEngine'] = None
+AsyncSessionLocal: Optional['async_sessionmaker[AsyncSession]'] = None
+_async_engine_lock = threading.Lock()
+
 
 def get_db():
     db = SessionLocal()
@@ -12,3 +59,39 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_database_url() -> str:
+    if config.ASYNC_DATABASE_URL:
+        return config.ASYNC_DATABASE_URL
+    return make_url(config.DATABASE_URL).set(drivername='postgresql+asyncpg').render_as_string(hide_password=False)
+
+
+def get_async_session_factory() -> 'async_sessionmaker[AsyncSession]':
+    global async_engine, AsyncSessionLocal
+    with _async_engine_lock:
+        if AsyncSessionLocal is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            url = async_database_url()
+            async_engine = create_async_engine(
+                url, poolclass=InstrumentedAsyncAdaptedQueuePool, connect_args=connect_args(url), **pool_options())
+            instrument_pool('async', async_engine.sync_engine.pool)
+            instrument_engine('async', async_engine.sync_engine, **query_stats_options())
+            AsyncSessionLocal = async_sessionmaker(
+                async_engine, autoflush=False, expire_on_commit=False)
+        return AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncIterator['AsyncSession']:
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def close_async_engine():
+    global async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        forget_pool('async')
+        forget_engine('async')
+        await async_engine.dispose()
+        async_engine, AsyncSessionLocal = None, None
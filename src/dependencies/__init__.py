@@ -1,2 +1,2 @@
-from .currency_enum import cached_currency_enum
+from .currency_set import get_currency_set
 from .service_getters import get_email_reader_service, get_transaction_service
@@ -0,0 +1,29 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..models.currency import CurrencyTable
+from ..repositories.async_generic_repository import AsyncGenericRepository
+from ..schemas.currency import Currency, CurrencyCreate, CurrencyUpdate
+from ..services.async_generic_service import AsyncGenericService
+from ..services.async_transaction_service import AsyncTransactionService
+from ..services.currency_registry import CurrencySet, get_currency_registry
+
+
+async def get_async_transaction_service(
+        db: AsyncSession = Depends(get_async_db)
+) -> AsyncTransactionService:
+    return AsyncTransactionService(db, get_currency_registry())
+
+
+async def get_async_currency_service(
+        db: AsyncSession = Depends(get_async_db)
+) -> AsyncGenericService[CurrencyTable, CurrencyCreate, CurrencyUpdate, Currency]:
+    return AsyncGenericService(CurrencyTable, CurrencyCreate, CurrencyUpdate, Currency,
+                               AsyncGenericRepository(db, CurrencyTable))
+
+
+async def get_currency_set_async() -> CurrencySet:
+    # Only the first call of the process waits for the currencies, later
+    # reloads happen in the background
+    return get_currency_registry().snapshot()
@@ -0,0 +1,5 @@
+from ..services.currency_registry import CurrencySet, get_currency_registry
+
+
+def get_currency_set() -> CurrencySet:
+    return get_currency_registry().snapshot()
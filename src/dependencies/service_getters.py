@@ -25,7 +25,8 @@ def get_currency_service(
 def get_email_reader_service() -> EmailReaderService:
     global email_reader_service_instance
     if not email_reader_service_instance:
-        return EmailReaderService()
+        # Stateless apart from its pooled HTTP clients, so it is safe to share
+        email_reader_service_instance = EmailReaderService()
     return email_reader_service_instance
 
 
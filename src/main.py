@@ -1,22 +1,43 @@
 import logging
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
+import httpx
 from fastapi import FastAPI, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from requests import RequestException
 
 from .config.app_settings import config
+from .database import close_async_engine
 from .models import PydanticValidationError
-from .routers import TransactionRouter, CurrencyRouter
+from .routers import TransactionRouter, CurrencyRouter, SystemRouter
+from .services.email_fetch_engine import close_email_fetch_engine
+from .services.known_ids_service import get_known_transaction_ids
+from .services.parse_pool import close_parse_pool
+from .services.scheduler_service import start_sync_scheduler, stop_sync_scheduler
 from .utils.logging import configure_root_logger
 from .utils.response import create_exception_response
+from .utils.tracing import ServerTimingMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 configure_root_logger(
     log_level=logging.INFO if config.ENVIRONMENT == 'production' else logging.DEBUG)
 
-app = FastAPI(redirect_slashes=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_sync_scheduler()
+    # Starts loading the stored ids in the background
+    get_known_transaction_ids()
+    yield
+    stop_sync_scheduler()
+    close_email_fetch_engine()
+    close_parse_pool()
+    await close_async_engine()
+
+
+app = FastAPI(redirect_slashes=False, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +46,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ServerTimingMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
@@ -56,5 +78,11 @@ async def requests_exception_handler(request: Request, exc: RequestException):
     return create_exception_response(HTTPStatus.INTERNAL_SERVER_ERROR, ValueError(msg))
 
 
+@app.exception_handler(httpx.HTTPError)
+async def httpx_exception_handler(request: Request, exc: httpx.HTTPError):
+    return create_exception_response(HTTPStatus.BAD_GATEWAY, ValueError(f"Email API request failed: {exc!r}"))
+
+
 app.include_router(TransactionRouter, prefix="/v1")
 app.include_router(CurrencyRouter, prefix="/v1")
+app.include_router(SystemRouter, prefix="/v1")
@@ -1,3 +1,5 @@
-from .enums import Bank, ExpensePriority, ExpenseType, TimePeriod
+from .enums import Bank, CountMode, ExpensePriority, ExpenseType, ExportFormat, TimePeriod
 from .exceptions import PydanticValidationError, TransactionIDExistsError
 from .transaction import TransactionTable, generate_transaction_id
+from .sync_watermark import SyncWatermarkTable
+from .transaction_rollup import TransactionDailyRollupTable
@@ -44,3 +44,23 @@ class TimePeriod(Enum):
     WEEKLY = "weekly"
     MONTHLY = "monthly"
     YEARLY = "yearly"
+
+
+class CountMode(Enum):
+    """How a paginated listing fills `total_items`."""
+    # COUNT(*) of the filtered rows before every page
+    EXACT = "exact"
+    # EXACT, remembered per filter until the table is written to
+    CACHED = "cached"
+    # Row estimate of the query planner
+    ESTIMATE = "estimate"
+    # count(*) OVER () next to the page rows, in the same query
+    WINDOW = "window"
+    # No count at all
+    NONE = "none"
+
+
+class ExportFormat(Enum):
+    CSV = "csv"
+    # One JSON object per line
+    NDJSON = "ndjson"
@@ -20,7 +20,7 @@ from ..schemas.transaction import TransactionCreate, TransactionsPageResponse
 from ..services.email_service import EmailReaderService
 from ..services.memcache_service import MemcacheService
 from ..utils.pagination import PaginationDetails, ThreadedPaginator
-from ..utils import hash_pagination_meta
+from ..utils import hash_pagination_meta, span
 
 
 class BankTransactionService:
@@ -75,7 +75,9 @@ class BankTransactionService:
             config.EMAIL_PROCESSING_THREADS,
             fetch
         )
-        transactions_response, exec_time = bac_paginator()
+        with span('threaded_pagination') as pagination:
+            transactions_response = bac_paginator()
+        exec_time = pagination.duration
         self.logger.debug(
             f'Took {exec_time:.4f} seconds during threaded pagination')
         all_transactions = []
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, String
+
+from ._base import Base
+
+
+class SyncWatermarkTable(Base):
+    """
+    Newest email date that has been fully ingested for a bank's mailbox.
+    """
+    __tablename__ = 'sync_watermarks'
+
+    bank_name = Column(String, primary_key=True)
+    mailbox = Column(String, primary_key=True)
+    last_email_date = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(
+        timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -1,8 +1,8 @@
 import hashlib
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Float, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Float, Index, Integer, String, Text, func
+from sqlalchemy.orm import deferred, relationship
 from ._base import Base
 
 
@@ -22,8 +22,9 @@ class TransactionTable(Base):
         timezone.utc), nullable=False)
     value = Column(Float, nullable=False)
     currency_id = Column(Integer, ForeignKey('currencies.id'), nullable=False)
-    # Establish relationship with the CurrencyTable
-    currency = relationship('CurrencyTable', lazy='joined')
+    # Establish relationship with the CurrencyTable. Not joined by default, the
+    # listings map currency_id to its code through the CurrencyRegistry
+    currency = relationship('CurrencyTable', lazy='select')
     business = Column(String, nullable=False)
     business_type = Column(String, nullable=True)
     bank_name = Column(String, nullable=False)
@@ -32,4 +33,16 @@ class TransactionTable(Base):
     expense_priority = Column(Integer, nullable=True)
     # Replace Enum with ForeignKey or Integer if dynamic enums are needed
     expense_type = Column(Integer, nullable=True)
-    body = Column(Text, nullable=False)
+    # The raw email, most reads don't need it so it is only loaded on access
+    body = deferred(Column(Text, nullable=False))
+
+    __table_args__ = (
+        # GET /transactions/ sorts by (date(date) DESC, business, value DESC, id)
+        Index('ix_transactions_listing', func.date(date).desc(),
+              business, value.desc(), id),
+        # GET /transactions/bac and /promerica filter on bank_name and sort by (value, id)
+        Index('ix_transactions_bank_value', bank_name, value, id),
+        # The expenses and metrics queries filter on currency and a date range and sum value
+        Index('ix_transactions_currency_date', currency_id, date,
+              postgresql_include=['value']),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, Date, Float, ForeignKey, Integer, String
+
+from ._base import Base
+
+
+class TransactionDailyRollupTable(Base):
+    """
+    Per day, currency and bank aggregates of `transactions`, kept up to date by
+    TransactionRepository in the same database transaction that writes the
+    transactions themselves.
+    """
+    __tablename__ = 'transaction_daily_rollups'
+
+    day = Column(Date, primary_key=True)
+    currency_id = Column(Integer, ForeignKey('currencies.id'), primary_key=True)
+    bank_name = Column(String, primary_key=True)
+    total_value = Column(Float, nullable=False)
+    transaction_count = Column(BigInteger, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
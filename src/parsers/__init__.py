@@ -1,3 +1,4 @@
+from .engine import FieldRule, ParsedFields, ParserEngine
 from .base_parser import BaseMessageParser
 from .bac_parser import BacMessageParser
 from .promerica_parser import PromericaMessageParser
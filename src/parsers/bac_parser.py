@@ -1,32 +1,25 @@
-from email.message import Message
 import re
-from typing import Tuple
+from typing import Dict, Optional
+
 from . import BaseMessageParser
+from .engine import FieldRule, ParsedFields
 
 
 class BacMessageParser(BaseMessageParser):
-    def __init__(self, msg: Message):
-        self.msg = msg
-        super().__init__(msg)
+    rules = (
+        FieldRule(
+            r'Comercio:\s*(?:\r\n|\n)?\s*(?P<business>.+?)\s*(?:\r\n|\n)', re.DOTALL),
+        FieldRule(
+            r'Monto:\s*(?:\r?\n)?\s*(?P<currency>[A-Z]{3})\s*(?P<value>[\d,]*\.\d{2})'),
+    )
 
-    def parse_business(self) -> str | None:
-        regex = re.compile(
-            r'Comercio:\s*(?:\r\n|\n)?\s*(?P<business>.+?)\s*(?:\r\n|\n)', re.DOTALL
+    @classmethod
+    def from_groups(cls, groups: Dict[str, Optional[str]]) -> ParsedFields:
+        business = groups['business']
+        value = groups['value']
+        return ParsedFields(
+            business=business.strip() if business is not None else None,
+            business_type=None,
+            value=float(value.replace(',', '')) if value is not None else 0.0,
+            currency=groups['currency'].strip() if value is not None else ''
         )
-        match = regex.search(self.body)
-        return match.group('business').strip() if match else None
-
-    def parse_business_type(self) -> str | None:
-        return None
-
-    def parse_value_and_currency(self) -> Tuple[float, str]:
-        regex = re.compile(
-            r'Monto:\s*(?:\r?\n)?\s*(?P<currency>[A-Z]{3})\s*(?P<value>[\d,]*\.\d{2})'
-        )
-
-        match = regex.search(self.body)
-        if match:
-            currency = match.group('currency').strip()
-            value = float(match.group('value').replace(',', ''))
-            return value, currency
-        return 0.0, ''
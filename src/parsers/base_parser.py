@@ -1,11 +1,21 @@
 from abc import ABC, abstractmethod
+from functools import cached_property
 from logging import getLogger
-from typing import Tuple
+from typing import ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from ..schemas.email import EmailMessageModel
+from .engine import FieldRule, ParsedFields, ParserEngine
 
 
 class BaseMessageParser(ABC):
+    # Extraction rules of the bank, compiled into `engine` once per subclass
+    rules: ClassVar[Sequence[FieldRule]] = ()
+    engine: ClassVar[ParserEngine]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.engine = ParserEngine(cls.rules)
+
     def __init__(self, msg: EmailMessageModel):
         self.msg = msg
         self.logger = getLogger(self.__class__.__name__)
@@ -14,14 +24,30 @@ class BaseMessageParser(ABC):
     def body(self) -> str:
         return self.msg.body
 
+    @classmethod
     @abstractmethod
-    def parse_business(self) -> str | None:
+    def from_groups(cls, groups: Dict[str, Optional[str]]) -> ParsedFields:
+        """Build the parsed fields from the groups the rules matched (None when they didn't)."""
         raise NotImplementedError
 
-    @abstractmethod
+    @classmethod
+    def parse(cls, body: Optional[str]) -> ParsedFields:
+        return cls.from_groups(cls.engine.scan(body or ''))
+
+    @classmethod
+    def parse_many(cls, bodies: Iterable[Optional[str]]) -> List[ParsedFields]:
+        scan, from_groups = cls.engine.scan, cls.from_groups
+        return [from_groups(scan(body or '')) for body in bodies]
+
+    @cached_property
+    def parsed(self) -> ParsedFields:
+        return self.parse(self.body)
+
+    def parse_business(self) -> str | None:
+        return self.parsed.business
+
     def parse_business_type(self) -> str | None:
-        raise NotImplementedError
+        return self.parsed.business_type
 
-    @abstractmethod
     def parse_value_and_currency(self) -> Tuple[float, str]:
-        raise NotImplementedError
+        return self.parsed.value, self.parsed.currency
@@ -0,0 +1,42 @@
+import re
+from typing import Dict, NamedTuple, Optional, Sequence
+
+
+class FieldRule(NamedTuple):
+    """A regex whose named groups are extracted from the first place it matches in a body."""
+    pattern: str
+    flags: re.RegexFlag = re.NOFLAG
+
+
+class ParsedFields(NamedTuple):
+    business: Optional[str]
+    business_type: Optional[str]
+    value: float
+    currency: str
+
+
+class ParserEngine:
+    """
+    Applies a bank's `FieldRule`s to email bodies.
+
+    The rules are compiled once, and every body yields all of its groups from
+    one `scan` call. Each rule stays a separate search: they start with a
+    literal label, which `re` skips to directly, and that outruns a single
+    alternation over the body (whose lookaheads defeat the skip) several times.
+    """
+
+    def __init__(self, rules: Sequence[FieldRule]):
+        self.rules = tuple(rules)
+        self._patterns = tuple(re.compile(rule.pattern, rule.flags)
+                               for rule in self.rules)
+        self._empty: Dict[str, Optional[str]] = dict.fromkeys(
+            name for pattern in self._patterns for name in pattern.groupindex)
+
+    def scan(self, body: str) -> Dict[str, Optional[str]]:
+        """Named groups of the first match of every rule, None for the rules that don't match."""
+        groups = self._empty.copy()
+        for pattern in self._patterns:
+            match = pattern.search(body)
+            if match:
+                groups.update(match.groupdict())
+        return groups
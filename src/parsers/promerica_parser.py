@@ -1,36 +1,27 @@
-import re
-from email.message import Message
-from typing import Tuple
+from typing import Dict, Optional
 
 from . import BaseMessageParser
 from ..utils.text import strip_excess_whitespace
+from .engine import FieldRule, ParsedFields
 
 
 class PromericaMessageParser(BaseMessageParser):
-    def __init__(self, msg: Message):
-        self.msg = msg
-        super().__init__(msg)
+    rules = (
+        FieldRule(r'Comercio\s+(?P<business>[A-Z\s]+)'),
+        FieldRule(r'Tipo de Comercio\s+(?P<business_type>[A-Z\s]+)'),
+        FieldRule(r'Monto\s+\n (?P<currency>\w+): (?P<value>[\d,]+.\d{2})'),
+    )
 
-    def parse_business(self) -> str | None:
-        business_match = re.search(r"Comercio\s+([A-Z\s]+)", self.body)
-        if business_match:
-            business = business_match.group(1).strip()
-            return ', '.join(strip_excess_whitespace(business))
-        return None
+    @staticmethod
+    def _clean_name(name: Optional[str]) -> Optional[str]:
+        return ', '.join(strip_excess_whitespace(name.strip())) if name is not None else None
 
-    def parse_business_type(self) -> str | None:
-        business_type_match = re.search(
-            r"Tipo de Comercio\s+([A-Z\s]+)", self.body)
-        if business_type_match:
-            business_type = business_type_match.group(1).strip()
-            return ', '.join(strip_excess_whitespace(business_type))
-        return None
-
-    def parse_value_and_currency(self) -> Tuple[float, str]:
-        value_currency_match = re.search(
-            r"Monto\s+\n (\w+): ([\d,]+.\d{2})", self.body)
-        if value_currency_match:
-            currency = value_currency_match.group(1)
-            value = float(value_currency_match.group(2).replace(',', ''))
-            return value, currency
-        return 0.0, ''
+    @classmethod
+    def from_groups(cls, groups: Dict[str, Optional[str]]) -> ParsedFields:
+        value = groups['value']
+        return ParsedFields(
+            business=cls._clean_name(groups['business']),
+            business_type=cls._clean_name(groups['business_type']),
+            value=float(value.replace(',', '')) if value is not None else 0.0,
+            currency=groups['currency'] if value is not None else ''
+        )
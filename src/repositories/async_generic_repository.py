@@ -0,0 +1,78 @@
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy import ColumnElement, Row, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.typing import ModelType
+from ..utils.cache import count_cache
+from ..utils.keyset import KeysetRow, SortKey
+from ..utils.tracing import traced
+from .generic_repository import BaseRepository
+
+
+class AsyncGenericRepository(BaseRepository[ModelType]):
+    """
+    Read side of `GenericRepository` on an `AsyncSession`, for
+    DATABASE_ENGINE=async. It runs the same statements, awaiting the database
+    instead of holding a thread while it answers.
+    """
+
+    def __init__(self, db: AsyncSession, model: Type[ModelType]):
+        super().__init__(model)
+        self.db = db
+
+    @traced
+    async def get(self, id: str) -> Optional[ModelType]:
+        return await self.db.get(self.model, id)
+
+    @traced
+    async def get_all(self) -> List[ModelType]:
+        return (await self.db.scalars(self._select(None))).all()
+
+    @traced
+    async def get_paginated(
+        self, offset: int, limit: int, where: Optional[ColumnElement] = None,
+        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None,
+        columns: Optional[Sequence[ColumnElement]] = None
+    ) -> List[Union[ModelType, Row]]:
+        result = await self.db.execute(
+            self._paginated_query(offset, limit, where, order_by, columns=columns))
+        return result.all() if columns else result.scalars().all()
+
+    @traced
+    async def get_paginated_with_total(
+        self, offset: int, limit: int, where: Optional[ColumnElement] = None,
+        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None,
+        columns: Optional[Sequence[ColumnElement]] = None
+    ) -> Tuple[List[Union[ModelType, Row]], Optional[int]]:
+        rows = (await self.db.execute(self._paginated_query(
+            offset, limit, where, order_by, func.count().over().label('total_count'), columns=columns))).all()
+        return self._with_total(rows, columns)
+
+    @traced
+    async def get_keyset_page(
+        self, limit: int, sort: Sequence[SortKey], where: Optional[ColumnElement] = None,
+        after: Optional[Sequence[Any]] = None, before: Optional[Sequence[Any]] = None,
+        with_total: bool = False, columns: Optional[Sequence[ColumnElement]] = None
+    ) -> List[KeysetRow[Union[ModelType, Row]]]:
+        rows = (await self.db.execute(self._keyset_query(
+            limit, sort, where, after, before, with_total, columns))).all()
+        return self._keyset_rows(rows, sort, after, before, with_total, columns)
+
+    @traced
+    async def count(self, where: Optional[ColumnElement] = None) -> int:
+        return (await self.db.execute(self._count_query(where))).scalar_one()
+
+    @traced
+    async def cached_count(self, where: Optional[ColumnElement] = None, ingest_generation: Optional[str] = None) -> int:
+        key = self._count_cache_key(where, self.db.bind.dialect, ingest_generation)
+        total = count_cache.get(self.table_name, key)
+        if total is None:
+            generation = count_cache.generation(self.table_name)
+            total = (await self.db.execute(self._count_query(where))).scalar_one()
+            count_cache.put(self.table_name, key, generation, total)
+        return total
+
+    @traced
+    async def estimate_count(self, where: Optional[ColumnElement] = None) -> int:
+        return self._planned_rows((await self.db.execute(self._estimate_query(where))).scalar_one())
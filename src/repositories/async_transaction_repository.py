@@ -0,0 +1,39 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from ..models import TimePeriod, TransactionTable
+from ..schemas.api_response import DateRange
+from ..schemas.currency import Currency
+from ..schemas.transaction import TransactionMetricsByPeriodResult
+from ..utils.tracing import traced
+from .async_generic_repository import AsyncGenericRepository
+from .statements import EXPENSES, PERIOD_EXPENSE_METRICS
+from .transaction_repository import expenses_by_currency, metrics_by_period, metrics_params
+
+
+class AsyncTransactionRepository(AsyncGenericRepository[TransactionTable]):
+    """The queries behind the transaction read endpoints, on an `AsyncSession`."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, TransactionTable)
+
+    @traced
+    async def get(self, id: str) -> Optional[TransactionTable]:
+        return await self.db.get(TransactionTable, id, options=[undefer(TransactionTable.body)])
+
+    @traced
+    async def get_expenses(
+        self, date_range: DateRange, currency_codes: Iterable[str]
+    ) -> Optional[dict[str, Optional[float]]]:
+        result = await self.db.execute(EXPENSES, date_range.model_dump())
+        return expenses_by_currency(currency_codes, result.fetchall())
+
+    @traced
+    async def get_metrics_by_period(
+        self, date_range: DateRange, period: TimePeriod, currency: Currency
+    ) -> List[TransactionMetricsByPeriodResult]:
+        result = await self.db.execute(
+            PERIOD_EXPENSE_METRICS, metrics_params(date_range, period, currency))
+        return metrics_by_period(result.fetchall())
@@ -1,90 +1,246 @@
 from logging import getLogger
-from typing import Callable, Generic, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Generic, List, Optional, Sequence, Tuple, Type, Union
 
 from fastapi import Query
-from sqlalchemy import ColumnElement, select, func
+from sqlalchemy import ColumnElement, Dialect, Row, select, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..schemas.typing import ModelType
-from ..utils.decorators import timed_operation
+from ..utils.cache import count_cache
+from ..utils.explain import Explain
+from ..utils.hashing import hash_any
+from ..utils.keyset import KeysetRow, SortKey, order_by_keys, seek_predicate
+from ..utils.tracing import traced
 
 
-class GenericRepository(Generic[ModelType]):
-    def __init__(self, db: Session, model: Type[ModelType]):
-        self.db = db
+class BaseRepository(Generic[ModelType]):
+    """
+    Statements shared by `GenericRepository` and `AsyncGenericRepository`,
+    which only differ in how they run them.
+    """
+
+    def __init__(self, model: Type[ModelType]):
         self.model = model
         self.logger = getLogger(self.__class__.__name__)
 
-    @timed_operation
-    def create(self, obj_in: ModelType) -> Tuple[ModelType, float]:
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+    def invalidate_counts(self):
+        count_cache.invalidate(self.table_name)
+
+    def _select(self, columns: Optional[Sequence[ColumnElement]], *extra_columns):
+        # Plain Core rows of `columns` when given, ORM instances otherwise
+        return select(*columns, *extra_columns) if columns else select(self.model, *extra_columns)
+
+    def _paginated_query(
+        self, offset: int, limit: int, where: Optional[ColumnElement] = None,
+        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None, *extra_columns,
+        columns: Optional[Sequence[ColumnElement]] = None
+    ):
+        query = self._select(columns, *extra_columns)
+
+        if order_by is not None:
+            if not isinstance(order_by, (list, tuple)):
+                order_by = [order_by]
+            query = query.order_by(*order_by)
+        if where is not None:
+            query = query.where(where)
+
+        return query.offset(offset).limit(limit)
+
+    def _with_total(self, rows: Sequence[Row], columns: Optional[Sequence[ColumnElement]]) -> Tuple[List[Union[ModelType, Row]], Optional[int]]:
+        return [self._item(row, columns) for row in rows], (rows[0][-1] if rows else None)
+
+    @staticmethod
+    def _item(row: Row, columns: Optional[Sequence[ColumnElement]]) -> Union[ModelType, Row]:
+        return row[:len(columns)] if columns else row[0]
+
+    def _keyset_query(
+        self, limit: int, sort: Sequence[SortKey], where: Optional[ColumnElement],
+        after: Optional[Sequence[Any]], before: Optional[Sequence[Any]],
+        with_total: bool, columns: Optional[Sequence[ColumnElement]]
+    ):
+        key_columns = [key.column.label(f'sort_key_{i}')
+                       for i, key in enumerate(sort)]
+        if with_total:
+            key_columns.append(func.count().over().label('total_count'))
+        query = self._select(columns, *key_columns)
+
+        if where is not None:
+            query = query.where(where)
+        if after is not None:
+            query = query.where(seek_predicate(sort, after))
+        if before is not None:
+            query = query.where(seek_predicate(sort, before, reverse=True))
+
+        reverse = after is None and before is not None
+        return query.order_by(*order_by_keys(sort, reverse)).limit(limit)
+
+    def _keyset_rows(
+        self, rows: Sequence[Row], sort: Sequence[SortKey], after: Optional[Sequence[Any]],
+        before: Optional[Sequence[Any]], with_total: bool, columns: Optional[Sequence[ColumnElement]]
+    ) -> List[KeysetRow[Union[ModelType, Row]]]:
+        start = len(columns) if columns else 1
+        results = [
+            KeysetRow(self._item(row, columns), list(row[start:start + len(sort)]),
+                      row[-1] if with_total else None)
+            for row in rows
+        ]
+        if after is None and before is not None:
+            results.reverse()
+        return results
+
+    def _count_query(self, where: Optional[ColumnElement] = None):
+        query = select(func.count()).select_from(self.model)
+        if where is not None:
+            query = query.where(where)
+        return query
+
+    def _count_cache_key(self, where: Optional[ColumnElement], dialect: Dialect, ingest_generation: Optional[str]) -> str:
+        compiled = self._count_query(where).compile(dialect=dialect)
+        return hash_any((str(compiled), compiled.params, ingest_generation))
+
+    def _estimate_query(self, where: Optional[ColumnElement] = None):
+        query = select(self.model.id)
+        if where is not None:
+            query = query.where(where)
+        return Explain(query)
+
+    @staticmethod
+    def _planned_rows(plan: Any) -> int:
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class GenericRepository(BaseRepository[ModelType]):
+    def __init__(self, db: Session, model: Type[ModelType]):
+        super().__init__(model)
+        self.db = db
+
+    def _refresh(self, db_obj: ModelType):
+        """Reload a row after it was written, which is what `create` and `update` return."""
+        self.db.refresh(db_obj)
+
+    @traced
+    def create(self, obj_in: ModelType) -> ModelType:
         self.db.add(obj_in)
         try:
             self.db.commit()
-            self.db.refresh(obj_in)
+            self.invalidate_counts()
+            self._refresh(obj_in)
             return obj_in
         except IntegrityError as e:
             self.db.rollback()
             raise e
 
-    @timed_operation
-    def get(self, id: str) -> Tuple[Optional[ModelType], float]:
+    @traced
+    def get(self, id: str) -> Optional[ModelType]:
         return self.db.query(self.model).filter(self.model.id == id).first()
 
-    @timed_operation
-    def get_all(self) -> Tuple[List[ModelType], float]:
+    @traced
+    def get_all(self) -> List[ModelType]:
         return self.db.query(self.model).all()
 
-    @timed_operation
-    def update(self, id: str, obj_in: dict) -> Tuple[Optional[ModelType], float]:
+    @traced
+    def update(self, id: str, obj_in: dict) -> Optional[ModelType]:
         db_obj = self.get(id)
         if db_obj:
             for key, value in obj_in.items():
                 setattr(db_obj, key, value)
             try:
                 self.db.commit()
-                self.db.refresh(db_obj)
+                self.invalidate_counts()
+                self._refresh(db_obj)
                 return db_obj
             except IntegrityError as e:
                 self.db.rollback()
                 raise e
         return None
 
-    @timed_operation
-    def delete(self, id: str) -> Tuple[Optional[ModelType], float]:
+    @traced
+    def delete(self, id: str) -> Optional[ModelType]:
         db_obj = self.get(id)
         if db_obj:
             self.db.delete(db_obj)
             try:
                 self.db.commit()
+                self.invalidate_counts()
                 return db_obj
             except IntegrityError as e:
                 self.db.rollback()
                 raise e
         return None
 
-    @timed_operation
+    @traced
     def get_paginated(
         self, offset: int, limit: int, where: Optional[ColumnElement] = None,
-        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None
-    ) -> Tuple[List[ModelType], float]:
-        query = select(self.model)
+        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None,
+        columns: Optional[Sequence[ColumnElement]] = None
+    ) -> List[Union[ModelType, Row]]:
+        """
+        A page of ORM instances, or of plain rows with `columns` (which skips
+        building an instance per row).
+        """
+        result = self.db.execute(
+            self._paginated_query(offset, limit, where, order_by, columns=columns))
+        return result.all() if columns else result.scalars().all()
 
-        if order_by is not None:
-            query = query.order_by(*order_by)
-        if where is not None:
-            query = query.where(where)
+    @traced
+    def get_paginated_with_total(
+        self, offset: int, limit: int, where: Optional[ColumnElement] = None,
+        order_by: Optional[Union[ColumnElement, list[ColumnElement]]] = None,
+        columns: Optional[Sequence[ColumnElement]] = None
+    ) -> Tuple[List[Union[ModelType, Row]], Optional[int]]:
+        """
+        Same page as `get_paginated` plus the number of rows matching `where`,
+        read from a `count(*) OVER ()` column of the same query. The total is
+        None when the page is empty.
+        """
+        rows = self.db.execute(self._paginated_query(
+            offset, limit, where, order_by, func.count().over().label('total_count'), columns=columns)).all()
+        return self._with_total(rows, columns)
 
-        results = self.db.execute(
-            query
-            .offset(offset)
-            .limit(limit)
-        ).scalars().all()
-        return results
+    @traced
+    def get_keyset_page(
+        self, limit: int, sort: Sequence[SortKey], where: Optional[ColumnElement] = None,
+        after: Optional[Sequence[Any]] = None, before: Optional[Sequence[Any]] = None,
+        with_total: bool = False, columns: Optional[Sequence[ColumnElement]] = None
+    ) -> List[KeysetRow[Union[ModelType, Row]]]:
+        """
+        Fetch up to `limit` rows in `sort` order that come right after the sort
+        key `after` (or right before `before`), seeking on the key instead of
+        skipping rows with OFFSET. Each row is returned with its own sort key so
+        the caller can build the next cursor from it, and with `with_total` also
+        with the number of rows matching `where` and the seek predicate. With
+        `columns` the items are plain rows of those columns.
+        """
+        rows = self.db.execute(self._keyset_query(
+            limit, sort, where, after, before, with_total, columns)).all()
+        return self._keyset_rows(rows, sort, after, before, with_total, columns)
 
-    @timed_operation
-    def count(self, where: Optional[ColumnElement] = None) -> Tuple[int, float]:
-        query = select(func.count()).select_from(self.model)
-        if where is not None:
-            query = query.where(where).order_by()
-        return self.db.execute(query).scalar_one()
+    @traced
+    def count(self, where: Optional[ColumnElement] = None) -> int:
+        return self.db.execute(self._count_query(where)).scalar_one()
+
+    @traced
+    def cached_count(self, where: Optional[ColumnElement] = None, ingest_generation: Optional[str] = None) -> int:
+        """
+        `count`, served from the process-wide count cache while the table is
+        unchanged. Writes made by other workers only drop the count through
+        `ingest_generation`, the shared one of the response cache, or after
+        COUNT_CACHE_TTL when there is none.
+        """
+        key = self._count_cache_key(where, self.db.get_bind().dialect, ingest_generation)
+        total = count_cache.get(self.table_name, key)
+        if total is None:
+            generation = count_cache.generation(self.table_name)
+            total = self.db.execute(self._count_query(where)).scalar_one()
+            count_cache.put(self.table_name, key, generation, total)
+        return total
+
+    @traced
+    def estimate_count(self, where: Optional[ColumnElement] = None) -> int:
+        """Number of rows matching `where` as estimated by the query planner, without reading them."""
+        return self._planned_rows(self.db.execute(self._estimate_query(where)).scalar_one())
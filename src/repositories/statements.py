@@ -0,0 +1,26 @@
+import os
+
+from sqlalchemy import DateTime, String, TextClause, bindparam, text
+
+SQL_DIR = os.path.join(os.path.dirname(__file__), 'db')
+
+
+def load_statement(file_name: str) -> TextClause:
+    """Read a .pgsql file from `SQL_DIR` into a statement with named bind parameters."""
+    with open(os.path.join(SQL_DIR, file_name), encoding='utf-8') as f:
+        return text(f.read())
+
+
+# Loaded once at import and shared by every request, so the SQL text never
+# changes between calls and only the bound values do.
+EXPENSES = load_statement('expenses.pgsql').bindparams(
+    bindparam('start_date', type_=DateTime),
+    bindparam('end_date', type_=DateTime),
+)
+
+PERIOD_EXPENSE_METRICS = load_statement('period_expense_metrics.pgsql').bindparams(
+    bindparam('start_date', type_=DateTime),
+    bindparam('end_date', type_=DateTime),
+    bindparam('period', type_=String),
+    bindparam('currency', type_=String),
+)
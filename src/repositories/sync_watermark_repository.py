@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..models.sync_watermark import SyncWatermarkTable
+from ..repositories.generic_repository import GenericRepository
+from ..utils.tracing import traced
+
+
+class SyncWatermarkRepository(GenericRepository[SyncWatermarkTable]):
+    def __init__(self, db: Session):
+        super().__init__(db, SyncWatermarkTable)
+
+    @traced
+    def get_last_email_date(self, bank_name: str, mailbox: str) -> Optional[datetime]:
+        return self.db.execute(
+            select(SyncWatermarkTable.last_email_date).where(
+                SyncWatermarkTable.bank_name == bank_name,
+                SyncWatermarkTable.mailbox == mailbox
+            )
+        ).scalar_one_or_none()
+
+    @traced
+    def advance(self, bank_name: str, mailbox: str, last_email_date: datetime) -> datetime:
+        """
+        Move the watermark forward to `last_email_date`. A watermark never moves
+        backwards, so an older date leaves the stored one untouched.
+        """
+        statement = insert(SyncWatermarkTable).values(
+            bank_name=bank_name,
+            mailbox=mailbox,
+            last_email_date=last_email_date,
+            updated_at=datetime.now(timezone.utc)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[SyncWatermarkTable.bank_name,
+                            SyncWatermarkTable.mailbox],
+            set_={
+                'last_email_date': func.greatest(SyncWatermarkTable.last_email_date, statement.excluded.last_email_date),
+                'updated_at': statement.excluded.updated_at,
+            }
+        ).returning(SyncWatermarkTable.last_email_date)
+        try:
+            result = self.db.execute(statement).scalar_one()
+            self.db.commit()
+            return result
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
@@ -1,50 +1,178 @@
-import os
 from collections import defaultdict
-from typing import List, Optional, Tuple
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, override
 
-from jinja2 import Environment, FileSystemLoader
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Row, String, any_, bindparam, func, inspect, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, undefer
 
-from ..dependencies.currency_enum import cached_currency_enum
-from ..models import TimePeriod, TransactionTable
+from ..models import TimePeriod, TransactionDailyRollupTable, TransactionTable
 from ..repositories.generic_repository import GenericRepository
 from ..schemas.api_response import DateRange
 from ..schemas.currency import Currency
 from ..schemas.transaction import TransactionMetricsByPeriodResult
-from ..utils.decorators import timed_operation
+from ..utils.tracing import traced
+from .statements import EXPENSES, PERIOD_EXPENSE_METRICS
 
 
 class TransactionRepository(GenericRepository[TransactionTable]):
     def __init__(self, db: Session):
         super().__init__(db, TransactionTable)
-        template_dir = os.path.join(os.path.dirname(__file__), 'db')
-        self._db_env = Environment(loader=FileSystemLoader(template_dir))
-
-    @timed_operation
-    def get_expenses(self, date_range: DateRange) -> Tuple[Optional[dict[str, Optional[float]]], float]:
-        template = self._db_env.get_template('expenses.pgsql')
-        currency_enum = cached_currency_enum()
-        query = text(template.render(
-            date_range.model_dump(), currencies=currency_enum, decimals=5))
-        self.logger.debug(query.text)
-        result = self.db.execute(query).fetchall()
-        expenses = {
-            currency[1]: currency[0] for currency in self.db.execute(query).fetchall()
-        }
-        return expenses
-
-    @timed_operation
+
+    def _add_to_rollups(self, rows: Iterable) -> None:
+        """
+        Fold freshly inserted transactions into transaction_daily_rollups, in
+        the caller's database transaction. `rows` only need `date`,
+        `currency_id`, `bank_name` and `value`.
+        """
+        buckets: Dict[Tuple[date, int, str], dict] = {}
+        for row in rows:
+            key = (row.date.date(), row.currency_id, row.bank_name)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    'day': key[0],
+                    'currency_id': row.currency_id,
+                    'bank_name': row.bank_name,
+                    'total_value': row.value,
+                    'transaction_count': 1,
+                    'min_value': row.value,
+                    'max_value': row.value,
+                }
+            else:
+                bucket['total_value'] += row.value
+                bucket['transaction_count'] += 1
+                bucket['min_value'] = min(bucket['min_value'], row.value)
+                bucket['max_value'] = max(bucket['max_value'], row.value)
+        if not buckets:
+            return
+
+        rollups = TransactionDailyRollupTable
+        # Sorted so concurrent ingests lock the rollup rows in the same order
+        statement = insert(rollups).values(
+            [buckets[key] for key in sorted(buckets)])
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollups.day,
+                            rollups.currency_id, rollups.bank_name],
+            set_={
+                'total_value': rollups.total_value + statement.excluded.total_value,
+                'transaction_count': rollups.transaction_count + statement.excluded.transaction_count,
+                'min_value': func.least(rollups.min_value, statement.excluded.min_value),
+                'max_value': func.greatest(rollups.max_value, statement.excluded.max_value),
+            }
+        )
+        self.db.execute(statement)
+
+    @override
+    @traced
+    def get(self, id: str) -> Optional[TransactionTable]:
+        # A single transaction comes with its raw email
+        return self.db.get(TransactionTable, id, options=[undefer(TransactionTable.body)])
+
+    @override
+    def _refresh(self, db_obj: TransactionTable):
+        # A plain refresh leaves the deferred body out, written rows come back with it
+        self.db.refresh(db_obj, [attribute.key for attribute in inspect(TransactionTable).column_attrs])
+
+    @override
+    @traced
+    def create(self, obj_in: TransactionTable) -> TransactionTable:
+        self.db.add(obj_in)
+        try:
+            self.db.flush()
+            self._add_to_rollups([obj_in])
+            self.db.commit()
+            self.invalidate_counts()
+            self._refresh(obj_in)
+            return obj_in
+        except IntegrityError as e:
+            self.db.rollback()
+            raise e
+
+    @traced
+    def insert_many(self, rows: List[dict]) -> List[str]:
+        """
+        Insert every row with a single `INSERT ... ON CONFLICT (id) DO NOTHING
+        RETURNING ...`, add the rows that were actually written to the daily
+        rollups and commit once. Only the ids that were written are returned,
+        rows whose id already exists are silently skipped.
+        """
+        if not rows:
+            return []
+        statement = (
+            insert(TransactionTable)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[TransactionTable.id])
+            .returning(TransactionTable.id, TransactionTable.date, TransactionTable.currency_id,
+                       TransactionTable.bank_name, TransactionTable.value)
+        )
+        try:
+            inserted = self.db.execute(statement).all()
+            self._add_to_rollups(inserted)
+            self.db.commit()
+            if inserted:
+                self.invalidate_counts()
+            return [row.id for row in inserted]
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
+    @traced
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        """The ones of `ids` already stored, looked up with a single `id = ANY(:ids)`."""
+        if not ids:
+            return set()
+        statement = select(TransactionTable.id).where(
+            TransactionTable.id == any_(bindparam('ids', type_=ARRAY(String))))
+        return set(self.db.execute(statement, {'ids': list(ids)}).scalars())
+
+    def stream_rows(
+        self, columns: Sequence[ColumnElement], where: Optional[ColumnElement], order_by: Sequence[ColumnElement],
+        batch_size: int
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Every row of `columns` matching `where`, read through a server side
+        cursor and yielded in lists of up to `batch_size` rows, so memory stays
+        flat however many rows match.
+        """
+        query = select(*columns).order_by(*order_by)
+        if where is not None:
+            query = query.where(where)
+        result = self.db.execute(
+            query.execution_options(yield_per=batch_size))
+        yield from result.partitions()
+
+    def iter_ids(self, batch_size: int) -> Iterator[str]:
+        """Every stored id, streamed from a server side cursor `batch_size` rows at a time."""
+        yield from self.db.execute(
+            select(TransactionTable.id).execution_options(yield_per=batch_size)).scalars()
+
+    @traced
+    def get_expenses(
+        self, date_range: DateRange, currency_codes: Iterable[str]
+    ) -> Optional[dict[str, Optional[float]]]:
+        return expenses_by_currency(
+            currency_codes, self.db.execute(EXPENSES, date_range.model_dump()).fetchall())
+
+    @traced
     def get_metrics_by_period(
         self, date_range: DateRange, period: TimePeriod, currency: Currency
-    ) -> Tuple[List[TransactionMetricsByPeriodResult], float]:
-        query = text(self._db_env.get_template('period_expense_metrics.pgsql').render(
-            date_range.model_dump(), period=period.value, currency=currency.value
-        ))
-        row = self.db.execute(query).fetchall()
-        metrics: List[TransactionMetricsByPeriodResult] = []
-        if row:
-            for i in row:
-                metrics.append(
-                    TransactionMetricsByPeriodResult(**i._mapping))
-        return metrics
+    ) -> List[TransactionMetricsByPeriodResult]:
+        return metrics_by_period(self.db.execute(
+            PERIOD_EXPENSE_METRICS, metrics_params(date_range, period, currency)).fetchall())
+
+
+def expenses_by_currency(currency_codes: Iterable[str], rows: Sequence[Row]) -> dict[str, Optional[float]]:
+    # Every known currency is listed, the ones without expenses as None
+    expenses: dict[str, Optional[float]] = dict.fromkeys(currency_codes)
+    expenses.update({currency[1]: currency[0] for currency in rows})
+    return expenses
+
+
+def metrics_params(date_range: DateRange, period: TimePeriod, currency: Currency) -> dict:
+    return {**date_range.model_dump(), 'period': period.value, 'currency': currency.code}
+
+
+def metrics_by_period(rows: Sequence[Row]) -> List[TransactionMetricsByPeriodResult]:
+    return [TransactionMetricsByPeriodResult(**row._mapping) for row in rows]
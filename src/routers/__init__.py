@@ -1,2 +1,9 @@
-from .transactions import router as TransactionRouter
-from .currency import router as CurrencyRouter
+from ..config import config
+from .system import router as SystemRouter
+
+if config.DATABASE_ENGINE == 'async':
+    from .async_transactions import router as TransactionRouter
+    from .async_currency import router as CurrencyRouter
+else:
+    from .transactions import router as TransactionRouter
+    from .currency import router as CurrencyRouter
@@ -0,0 +1,19 @@
+import logging
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from ..dependencies.async_service_getters import get_async_currency_service
+from ..schemas.api_response import ApiResponse, SingleResponse
+from ..schemas.currency import Currency
+from ..services.async_generic_service import AsyncGenericService
+from ..services.response_cache_service import cached_response_async
+
+router = APIRouter(prefix="/currency")
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/", response_model=ApiResponse[SingleResponse[List[Currency]]])
+async def get_all(currency_service: AsyncGenericService = Depends(get_async_currency_service)):
+    return await cached_response_async('currency', {}, currency_service.get_all)
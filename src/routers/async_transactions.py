@@ -0,0 +1,158 @@
+"""
+The transaction endpoints for DATABASE_ENGINE=async. Reads are coroutines on
+the async engine, pulls and exports are the threadpool handlers of
+`transactions`, registered here in the same order so the routes match alike.
+"""
+import logging
+from http import HTTPStatus
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..dependencies.async_service_getters import (get_async_transaction_service,
+                                                  get_currency_set_async)
+from ..models.enums import Bank, CountMode, TimePeriod
+from ..models.transaction import TransactionTable
+from ..schemas import ApiResponse, CursorModel, DateRange
+from ..schemas.api_response import Meta, PaginatedResponse, SingleResponse
+from ..schemas.transaction import Transaction, TransactionMetricsByPeriodResult
+from ..services.async_transaction_service import AsyncTransactionService
+from ..services.currency_registry import CurrencySet, get_currency_registry
+from ..services.response_cache_service import cached_response_async
+from ..services.transaction_service import LISTING_SORT
+from ..utils import create_exception_response, create_raw_json_response
+from ..utils.iso4217 import canonical_code
+from .transactions import (FIELDS_DESCRIPTION, _requested_columns,
+                           export_transactions, pull_transactions_from_email)
+
+router = APIRouter(prefix="/transactions")
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics", response_model=ApiResponse[SingleResponse[List[TransactionMetricsByPeriodResult]]])
+async def get_metrics(
+    date_range: DateRange = Depends(),
+    period: TimePeriod = Query(TimePeriod.MONTHLY),
+    currency: str = Query('CRC'),
+    currencies: CurrencySet = Depends(get_currency_set_async),
+    transaction_service: AsyncTransactionService = Depends(get_async_transaction_service),
+):
+    code = canonical_code(currency)
+    # A miss reloads the registry once, the snapshot may predate a currency created by another worker
+    currency_schema = currencies.get(code) or await run_in_threadpool(get_currency_registry().get_by_code, code)
+    if currency_schema is None:
+        return ApiResponse(meta=Meta(status=HTTPStatus.NOT_FOUND, message=f'{currency.upper()} has no records in the system', request_time=0.0))
+    return await cached_response_async(
+        'transactions/metrics', {'date_range': date_range,
+                                 'period': period, 'currency': currency_schema.code},
+        lambda: transaction_service.get_metrics_by_period(date_range, period, currency_schema))
+
+
+@router.get("/expenses", response_model=ApiResponse[SingleResponse[dict]])
+async def get_expenses(
+    date_range: DateRange = Depends(),
+    currencies: CurrencySet = Depends(get_currency_set_async),
+    transaction_service: AsyncTransactionService = Depends(get_async_transaction_service),
+):
+    return await cached_response_async(
+        'transactions/expenses', {'date_range': date_range,
+                                  'currencies': currencies.version},
+        lambda: transaction_service.get_expenses(date_range))
+
+
+router.post("/pull", response_model=ApiResponse)(pull_transactions_from_email)
+
+
+async def _bank_listing(
+    bank: Bank, endpoint: str, date_range: DateRange, cursor: CursorModel, count: Optional[CountMode],
+    fields: Optional[str], transaction_service: AsyncTransactionService
+):
+    if (date_range.end_date is None) and (date_range.start_date is None):
+        date_range = None
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    return create_raw_json_response(await cached_response_async(
+        endpoint, {'date_range': date_range, 'cursor': cursor, 'count': count,
+                   'fields': [column.key for column in columns]},
+        lambda: transaction_service.get_paginated_from_bank(cursor=cursor, bank=bank, date_range=date_range, count_mode=count,
+                                                            columns=columns)))
+
+
+@router.get("/promerica", response_model=ApiResponse[PaginatedResponse[Transaction]])
+async def get_all_promerica(
+    date_range: DateRange = Depends(),
+    cursor_str: Optional[str] = Query(
+        None, description="Cursor for pagination", alias="cursor"
+    ),
+    page: Optional[int] = Query(None, description="Current page"),
+    page_size: Optional[int] = Query(
+        None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    transaction_service: AsyncTransactionService = Depends(get_async_transaction_service),
+):
+    cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
+    return await _bank_listing(Bank.PROMERICA, 'transactions/promerica', date_range, cursor, count, fields,
+                               transaction_service)
+
+
+@router.get("/bac", response_model=ApiResponse[PaginatedResponse[Transaction]])
+async def get_all_bac(
+    date_range: DateRange = Depends(),
+    cursor_str: Optional[str] = Query(
+        None, description="Cursor for pagination", alias="cursor"
+    ),
+    page: Optional[int] = Query(None, description="Current page"),
+    page_size: Optional[int] = Query(
+        None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    transaction_service: AsyncTransactionService = Depends(get_async_transaction_service),
+):
+    cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
+    return await _bank_listing(Bank.BAC, 'transactions/bac', date_range, cursor, count, fields,
+                               transaction_service)
+
+
+router.get("/export", response_class=StreamingResponse)(export_transactions)
+
+
+@router.get("/{transaction_id}", response_model=ApiResponse[SingleResponse[Transaction]])
+async def get_by_id(transaction_id: str, transaction_service: AsyncTransactionService = Depends(get_async_transaction_service)):
+    resp = await transaction_service.get(transaction_id)
+    resp.meta.message = "Transaction retrieved successfully"
+    return resp
+
+
+@router.get("/", response_model=ApiResponse[PaginatedResponse[Transaction]])
+async def get_all(
+    date_range: DateRange = Depends(),
+    cursor_str: Optional[str] = Query(
+        None, description="Cursor for pagination", alias="cursor"
+    ),
+    page: Optional[int] = Query(None, description="Current page"),
+    page_size: Optional[int] = Query(
+        None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    transaction_service: AsyncTransactionService = Depends(get_async_transaction_service),
+):
+    whereclause = date_range.contains(TransactionTable.date)
+    cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    return create_raw_json_response(await cached_response_async(
+        'transactions', {'date_range': date_range, 'cursor': cursor, 'count': count,
+                         'fields': [column.key for column in columns]},
+        lambda: transaction_service.get_paginated(cursor=cursor, filter=whereclause, sort=LISTING_SORT, count_mode=count,
+                                                  columns=columns)))
@@ -7,6 +7,7 @@ from ..dependencies.service_getters import get_currency_service
 from ..schemas.api_response import ApiResponse, SingleResponse
 from ..schemas.currency import Currency
 from ..services.currency_service import CurrencyService
+from ..services.response_cache_service import cached_response
 
 router = APIRouter(prefix="/currency")
 
@@ -15,5 +16,4 @@ logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=ApiResponse[SingleResponse[List[Currency]]])
 def get_all(currency_service: CurrencyService = Depends(get_currency_service)):
-    data = currency_service.get_all()
-    return data
+    return cached_response('currency', {}, currency_service.get_all)
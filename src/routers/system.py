@@ -0,0 +1,45 @@
+import logging
+from http import HTTPStatus
+from typing import List
+
+from fastapi import APIRouter
+
+from ..schemas.api_response import ApiResponse, Meta, SingleResponse
+from ..services import scheduler_service
+from ..services.scheduler_service import SyncJobStats
+from ..utils.pool_stats import PoolSnapshot, pool_snapshots
+from ..utils.query_stats import QueryTotals, query_totals
+
+router = APIRouter(prefix="/system")
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/scheduler", response_model=ApiResponse[SingleResponse[List[SyncJobStats]]])
+def get_scheduler_stats():
+    scheduler = scheduler_service.sync_scheduler_instance
+    if not scheduler:
+        return ApiResponse(meta=Meta(status=HTTPStatus.NOT_FOUND, message='The sync scheduler is disabled'))
+    return ApiResponse(
+        meta=Meta(status=HTTPStatus.OK,
+                  message='Scheduled sync jobs'),
+        data=SingleResponse(item=scheduler.get_stats())
+    )
+
+
+@router.get("/pool", response_model=ApiResponse[SingleResponse[List[PoolSnapshot]]])
+def get_pool_stats():
+    return ApiResponse(
+        meta=Meta(status=HTTPStatus.OK,
+                  message='Connection pools of this worker'),
+        data=SingleResponse(item=pool_snapshots())
+    )
+
+
+@router.get("/queries", response_model=ApiResponse[SingleResponse[List[QueryTotals]]])
+def get_query_stats():
+    return ApiResponse(
+        meta=Meta(status=HTTPStatus.OK,
+                  message='Statements run by the engines of this worker'),
+        data=SingleResponse(item=query_totals())
+    )
@@ -3,44 +3,66 @@ from http import HTTPStatus
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from fastapi.responses import StreamingResponse
 
-from ..dependencies import get_transaction_service
-from ..dependencies.currency_enum import cached_currency_enum
-from ..models.enums import Bank, TimePeriod
+from ..dependencies import get_currency_set, get_transaction_service
+from ..models.enums import Bank, CountMode, ExportFormat, TimePeriod
 from ..models.transaction import TransactionTable
 from ..schemas import ApiResponse, CursorModel, DateRange
 from ..schemas.api_response import Meta, PaginatedResponse, SingleResponse
 from ..schemas.currency import Currency
 from ..schemas.transaction import Transaction, TransactionMetricsByPeriodResult
 from ..services import TransactionService
-from ..utils import create_json_response
+from ..services.currency_registry import CurrencySet, get_currency_registry
+from ..services.response_cache_service import cached_response
+from ..services.transaction_service import LISTING_SORT, listing_columns
+from ..utils import (create_exception_response, create_json_response,
+                     create_raw_json_response)
+from ..utils.iso4217 import canonical_code
 
 router = APIRouter(prefix="/transactions")
 
 logger = logging.getLogger(__name__)
 
+FIELDS_DESCRIPTION = "Comma separated fields of every item, all of them but body by default"
+
+
+def _metrics_currency(currencies: CurrencySet, code: str) -> Optional[Currency]:
+    # The snapshot may predate a currency created by another worker, a miss reloads the registry once
+    return currencies.get(code) or get_currency_registry().get_by_code(code)
+
+
+def _requested_columns(fields: Optional[str]):
+    return listing_columns([field.strip() for field in fields.split(',') if field.strip()] if fields else None)
+
 
 @router.get("/metrics", response_model=ApiResponse[SingleResponse[List[TransactionMetricsByPeriodResult]]])
 def get_expenses(
     date_range: DateRange = Depends(),
     period: TimePeriod = Query(TimePeriod.MONTHLY),
     currency: str = Query('CRC'),
+    currencies: CurrencySet = Depends(get_currency_set),
     transaction_service: TransactionService = Depends(get_transaction_service),
 ):
-    enm = cached_currency_enum()
-    try:
-        return transaction_service.get_metrics_by_period(date_range, period, enm[currency])
-    except KeyError:
+    currency_schema = _metrics_currency(currencies, canonical_code(currency))
+    if currency_schema is None:
         return ApiResponse(meta=Meta(status=HTTPStatus.NOT_FOUND, message=f'{currency.upper()} has no records in the system', request_time=0.0))
+    return cached_response(
+        'transactions/metrics', {'date_range': date_range,
+                                 'period': period, 'currency': currency_schema.code},
+        lambda: transaction_service.get_metrics_by_period(date_range, period, currency_schema))
 
 
 @router.get("/expenses", response_model=ApiResponse[SingleResponse[dict]])
 def get_expenses(
     date_range: DateRange = Depends(),
+    currencies: CurrencySet = Depends(get_currency_set),
     transaction_service: TransactionService = Depends(get_transaction_service),
 ):
-    return transaction_service.get_expenses(date_range)
+    return cached_response(
+        'transactions/expenses', {'date_range': date_range,
+                                  'currencies': currencies.version},
+        lambda: transaction_service.get_expenses(date_range))
 
 
 @router.post("/pull", response_model=ApiResponse)
@@ -51,11 +73,15 @@ def pull_transactions_from_email(
     ),
     page_size: Optional[int] = Query(
         None, description="Number of items per page"),
+    bulk: bool = Query(
+        True, description="Write each page (or INGEST_BATCH_SIZE rows) with a single INSERT"),
+    incremental: bool = Query(
+        False, description="Only fetch emails newer than each bank's sync watermark"),
     transaction_service: TransactionService = Depends(get_transaction_service),
 ):
     cursor = CursorModel(page_size=page_size, cursor=cursor_str)
     result = transaction_service.pull_transactions_from_email(
-        cursor, date_range)
+        cursor, date_range, bulk=bulk, incremental=incremental)
     return create_json_response(result)
 
 
@@ -68,13 +94,24 @@ def get_all_promerica(
     page: Optional[int] = Query(None, description="Current page"),
     page_size: Optional[int] = Query(
         None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     transaction_service: TransactionService = Depends(get_transaction_service),
 
 ):
     if (date_range.end_date is None) and (date_range.start_date is None):
         date_range = None
     cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
-    return transaction_service.get_paginated_from_bank(cursor=cursor, bank=Bank.PROMERICA, date_range=date_range)
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    return create_raw_json_response(cached_response(
+        'transactions/promerica', {'date_range': date_range, 'cursor': cursor, 'count': count,
+                                   'fields': [column.key for column in columns]},
+        lambda: transaction_service.get_paginated_from_bank(cursor=cursor, bank=Bank.PROMERICA, date_range=date_range, count_mode=count,
+                                                            columns=columns)))
 
 
 @router.get("/bac", response_model=ApiResponse[PaginatedResponse[Transaction]])
@@ -86,13 +123,24 @@ def get_all_bac(
     page: Optional[int] = Query(None, description="Current page"),
     page_size: Optional[int] = Query(
         None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     transaction_service: TransactionService = Depends(get_transaction_service),
 
 ):
     if (date_range.end_date is None) and (date_range.start_date is None):
         date_range = None
     cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
-    return transaction_service.get_paginated_from_bank(cursor=cursor, bank=Bank.BAC, date_range=date_range)
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    return create_raw_json_response(cached_response(
+        'transactions/bac', {'date_range': date_range, 'cursor': cursor, 'count': count,
+                             'fields': [column.key for column in columns]},
+        lambda: transaction_service.get_paginated_from_bank(cursor=cursor, bank=Bank.BAC, date_range=date_range, count_mode=count,
+                                                            columns=columns)))
 
 # @router.get("/by-date", response_model=ApiResponse[PaginatedResponse[Transaction]])
 # def get_by_date(date_range: DateRange, cursor: Optional[str] = Query(None), page_size: int = Query(10), db: Session = Depends(get_db)):
@@ -100,6 +148,35 @@ def get_all_bac(
 #     return service.get_by_date(cursor=cursor, page_size=page_size, date_range=DateRange(**date_range.model_dump()))
 
 
+@router.get("/export", response_class=StreamingResponse)
+def export_transactions(
+    date_range: DateRange = Depends(),
+    bank: Optional[str] = Query(None, description="Bank name or notification email"),
+    currency: Optional[str] = Query(None, description="Currency code"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias='format'),
+    currencies: CurrencySet = Depends(get_currency_set),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    bank_filter = Bank.from_email_or_name(bank) if bank else None
+    if bank and bank_filter is None:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, ValueError(f'Unknown bank {bank}'))
+    currency_filter = currencies.get(canonical_code(currency)) if currency else None
+    if currency and currency_filter is None:
+        return create_exception_response(HTTPStatus.NOT_FOUND, ValueError(f'{currency.upper()} has no records in the system'))
+
+    return StreamingResponse(
+        transaction_service.export(
+            date_range, bank_filter, currency_filter, columns, export_format),
+        media_type='text/csv' if export_format == ExportFormat.CSV else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="transactions.{export_format.value}"'}
+    )
+
+
 @router.get("/{transaction_id}", response_model=ApiResponse[SingleResponse[Transaction]])
 def get_by_id(transaction_id: str, transaction_service: TransactionService = Depends(get_transaction_service)):
     resp = transaction_service.get(transaction_id)
@@ -116,9 +193,20 @@ def get_all(
     page: Optional[int] = Query(None, description="Current page"),
     page_size: Optional[int] = Query(
         None, description="Number of items per page"),
+    count: Optional[CountMode] = Query(
+        None, description="How total_items is computed, defaults to PAGINATION_COUNT_MODE"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     transaction_service: TransactionService = Depends(get_transaction_service),
 
 ):
     whereclause = date_range.contains(TransactionTable.date)
     cursor = CursorModel(page=page, page_size=page_size, cursor=cursor_str)
-    return transaction_service.get_paginated(cursor=cursor, filter=whereclause, order_by=[func.date(TransactionTable.date).desc(), TransactionTable.business, TransactionTable.value.desc()])
+    try:
+        columns = _requested_columns(fields)
+    except ValueError as e:
+        return create_exception_response(HTTPStatus.BAD_REQUEST, e)
+    return create_raw_json_response(cached_response(
+        'transactions', {'date_range': date_range, 'cursor': cursor, 'count': count,
+                         'fields': [column.key for column in columns]},
+        lambda: transaction_service.get_paginated(cursor=cursor, filter=whereclause, sort=LISTING_SORT, count_mode=count,
+                                                  columns=columns)))
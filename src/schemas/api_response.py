@@ -2,7 +2,7 @@ import base64
 from hashlib import sha256
 import json
 from datetime import datetime
-from typing import Generic, List, Optional, TypeVar
+from typing import Any, Generic, List, Optional, TypeVar
 
 from pydantic import BaseModel, Field, model_validator
 from sqlalchemy import ColumnElement, and_
@@ -49,6 +49,12 @@ class CursorModel(BaseModel):
         ..., description="The current page number")
     cursor: Optional[str] = Field(
         default=None, description="The cursor string for pagination")
+    after: Optional[List[Any]] = Field(
+        default=None, description="Sort key of the row the page starts after (keyset pagination)")
+    before: Optional[List[Any]] = Field(
+        default=None, description="Sort key of the row the page ends before (keyset pagination)")
+    total_items: Optional[int] = Field(
+        default=None, description="Row count carried over from the first page (window counts)")
 
     @model_validator(mode='before')
     def initialize_fields(cls, values):
@@ -63,23 +69,38 @@ class CursorModel(BaseModel):
                 cursor_page_size = data.get('page_size', config.PAGE_SIZE)
                 if not page:
                     values['page'] = cursor_page
+                    # An explicit page means OFFSET pagination, so the sort
+                    # keys are only honoured when the cursor drives the page
+                    values.setdefault('after', data.get('after'))
+                    values.setdefault('before', data.get('before'))
+                    values.setdefault('total_items', data.get('total_items'))
                 if not page_size:
                     values['page_size'] = cursor_page_size
-            except (base64.binascii.Error, json.JSONDecodeError):
+            except (base64.binascii.Error, json.JSONDecodeError, UnicodeDecodeError, AttributeError):
                 raise ValueError("Invalid cursor format")
         else:
             values['page'] = page if page else 1
             values['page_size'] = page_size if page_size else config.PAGE_SIZE
         return values
 
+    @property
+    def is_keyset(self) -> bool:
+        return self.after is not None or self.before is not None
+
     def encode(self) -> str:
         """
-        Encode the current page and page_size into a base64 cursor string.
+        Encode the current page, page_size and sort keys into a base64 cursor string.
 
         Returns:
             str: The base64 encoded cursor string.
         """
         cursor_data = {"page": self.page, "page_size": self.page_size}
+        if self.after is not None:
+            cursor_data["after"] = self.after
+        if self.before is not None:
+            cursor_data["before"] = self.before
+        if self.total_items is not None:
+            cursor_data["total_items"] = self.total_items
         cursor_str = json.dumps(cursor_data)
         self.cursor = base64.urlsafe_b64encode(cursor_str.encode()).decode()
         return self.cursor
@@ -117,6 +138,9 @@ class CursorModel(BaseModel):
             return CursorModel(
                 page=data.get('page', None),
                 page_size=data.get('page_size', None),
+                after=data.get('after', None),
+                before=data.get('before', None),
+                total_items=data.get('total_items', None),
                 cursor=cursor
             )
         except (base64.binascii.Error, json.JSONDecodeError) as e:
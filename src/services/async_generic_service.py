@@ -0,0 +1,78 @@
+from typing import List, Optional, Sequence, Type, Union
+
+from sqlalchemy import ColumnElement
+
+from ..models.enums import CountMode
+from ..repositories.async_generic_repository import AsyncGenericRepository
+from ..schemas.api_response import (ApiResponse, CursorModel,
+                                    PaginatedResponse, SingleResponse)
+from ..schemas.typing import (CreateSchemaType, ModelType, ReturnSchemaType,
+                              UpdateSchemaType)
+from ..utils.keyset import SortKey
+from ..utils.tracing import elapsed, traced
+from .generic_service import BaseService
+from .response_cache_service import ingest_generation_async
+
+
+class AsyncGenericService(BaseService[ModelType, CreateSchemaType, UpdateSchemaType, ReturnSchemaType]):
+    """The read methods of `GenericService` over an `AsyncGenericRepository`."""
+
+    def __init__(self, model: Type[ModelType], create_schema: Type[CreateSchemaType], update_schema: Type[UpdateSchemaType], return_schema: Type[ReturnSchemaType], repository: AsyncGenericRepository):
+        super().__init__(model, create_schema, update_schema, return_schema)
+        self.repository = repository
+
+    @traced
+    async def get(self, id: str) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
+        db_obj = await self.repository.get(id)
+        return self._single_response(db_obj, elapsed())
+
+    @traced
+    async def get_all(self) -> ApiResponse[SingleResponse[List[ReturnSchemaType]]]:
+        data = await self.repository.get_all()
+        return self._list_response(data, elapsed())
+
+    async def _count(self, filter: Optional[ColumnElement], count_mode: CountMode) -> Optional[int]:
+        if count_mode == CountMode.EXACT:
+            return await self.repository.count(filter)
+        if count_mode == CountMode.CACHED:
+            return await self.repository.cached_count(filter, await ingest_generation_async())
+        if count_mode == CountMode.ESTIMATE:
+            return await self.repository.estimate_count(filter)
+        # WINDOW reads the count from the page query itself
+        return None
+
+    @traced
+    async def get_paginated(self, cursor: CursorModel, filter: Optional[ColumnElement] = None,
+                            order_by: Optional[Union[ColumnElement,
+                                                     list[ColumnElement]]] = None,
+                            sort: Optional[Sequence[SortKey]] = None,
+                            count_mode: Optional[CountMode] = None,
+                            columns: Optional[Sequence[ColumnElement]] = None
+                            ) -> ApiResponse[PaginatedResponse[ReturnSchemaType]]:
+        """Same pages as `GenericService.get_paginated`."""
+        plan = self._page_plan(cursor, sort, count_mode)
+        if plan.carried_total is not None:
+            total_items = plan.carried_total
+        else:
+            total_items = await self._count(filter, plan.count_mode)
+
+        if plan.is_keyset:
+            after, before = self._cursor_keys(cursor, sort)
+            rows = await self.repository.get_keyset_page(
+                cursor.page_size + 1, sort, filter, after=after, before=before,
+                with_total=plan.with_total, columns=columns)
+            page = self._keyset_page(cursor, rows, after, before)
+        else:
+            order_by = self._offset_order(sort, order_by)
+            offset = (cursor.page - 1) * cursor.page_size
+            if plan.with_total:
+                db_objs, window_total = await self.repository.get_paginated_with_total(
+                    offset, cursor.page_size + 1, filter, order_by, columns)
+            else:
+                window_total = None
+                db_objs = await self.repository.get_paginated(
+                    offset, cursor.page_size + 1, filter, order_by, columns)
+            page = self._offset_page(cursor, db_objs, window_total)
+
+        return self._paginated_response(
+            cursor, plan, total_items, page, elapsed(), columns)
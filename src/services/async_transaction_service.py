@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional, override
+
+from sqlalchemy import Column
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Bank, TransactionTable
+from ..models.enums import CountMode, TimePeriod
+from ..repositories.async_transaction_repository import AsyncTransactionRepository
+from ..schemas import (ApiResponse, CursorModel, DateRange, PaginatedResponse,
+                       SingleResponse, Transaction, TransactionCreate,
+                       TransactionUpdate)
+from ..schemas.currency import Currency
+from ..schemas.transaction import TransactionMetricsByPeriodResult
+from ..utils.tracing import elapsed, traced
+from .async_generic_service import AsyncGenericService
+from .currency_registry import CurrencyRegistry
+from .transaction_service import (BANK_LISTING_SORT, LISTING_COLUMNS,
+                                  bank_filter, expenses_response,
+                                  metrics_response, no_metrics_response,
+                                  transaction_item, transaction_schema)
+
+DIVISION_BY_ZERO = '22012'
+
+
+class AsyncTransactionService(
+    AsyncGenericService[TransactionTable, TransactionCreate, TransactionUpdate, Transaction]
+):
+    """
+    The read side of `TransactionService` on an `AsyncSession`, behind the
+    read endpoints when DATABASE_ENGINE is 'async'. Writes and pulls stay on
+    `TransactionService`.
+    """
+
+    def __init__(self, db: AsyncSession, registry: CurrencyRegistry):
+        self.repository: AsyncTransactionRepository = AsyncTransactionRepository(db)
+        self.registry = registry
+
+        super().__init__(
+            TransactionTable,
+            TransactionCreate,
+            TransactionUpdate,
+            Transaction,
+            self.repository,
+        )
+
+    @override
+    def _to_schema(self, db_obj: TransactionTable) -> Transaction:
+        return transaction_schema(self.registry, db_obj)
+
+    @override
+    def _row_to_item(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return transaction_item(self.registry, row)
+
+    @traced
+    async def get_expenses(self, date_range: DateRange) -> ApiResponse[SingleResponse[dict]]:
+        data = await self.repository.get_expenses(
+            date_range, self.registry.snapshot().codes)
+        return expenses_response(date_range, data, elapsed())
+
+    async def get_paginated_from_bank(self, cursor: CursorModel, bank: Bank, date_range: Optional[DateRange] = None,
+                                      count_mode: Optional[CountMode] = None,
+                                      columns: Optional[List[Column]] = None) -> ApiResponse[PaginatedResponse[Transaction]]:
+        return await self.get_paginated(cursor, bank_filter(bank, date_range), sort=BANK_LISTING_SORT, count_mode=count_mode,
+                                        columns=columns or LISTING_COLUMNS)
+
+    @traced
+    async def get_metrics_by_period(self, date_range: DateRange, period: TimePeriod, currency: Currency) -> ApiResponse[SingleResponse[TransactionMetricsByPeriodResult]]:
+        try:
+            response = await self.repository.get_metrics_by_period(
+                date_range, period, currency)
+        except DBAPIError as e:
+            if getattr(e.orig, 'sqlstate', None) != DIVISION_BY_ZERO:
+                raise
+            return no_metrics_response(date_range, currency)
+        return metrics_response(date_range, period, response, elapsed())
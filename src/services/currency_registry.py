@@ -0,0 +1,185 @@
+import threading
+import time
+from logging import getLogger
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import config
+from ..database import SessionLocal
+from ..models.currency import CurrencyTable
+from ..schemas.currency import Currency
+
+
+class CurrencySet(NamedTuple):
+    """Immutable view of the registered currencies, `version` changes whenever they do."""
+    version: int
+    by_code: Mapping[str, Currency]
+
+    @property
+    def codes(self) -> List[str]:
+        return sorted(self.by_code)
+
+    def get(self, code: str) -> Optional[Currency]:
+        return self.by_code.get(code)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.by_code
+
+
+class CurrencyRegistry:
+    """
+    Process-wide map of the registered currencies, by code and by id.
+
+    Loaded from the database on first use and kept current as currencies are
+    created through `resolve`. A lookup that misses reloads the table once
+    before giving up, which picks up currencies created by other workers.
+    Concurrent misses for the same new code are serialized, so only one of
+    them creates it.
+
+    `snapshot` serves readers that only need the current set. Once it is older
+    than `ttl` seconds the next call starts a reload in the background and
+    keeps returning the previous set until it lands. Readers that miss a code
+    in a snapshot can confirm it with `get_by_code`.
+    """
+
+    def __init__(self, session_factory: sessionmaker[Session], ttl: float):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.logger = getLogger(self.__class__.__name__)
+        self._by_code: Dict[str, Currency] = {}
+        self._by_id: Dict[int, Currency] = {}
+        self._loaded = False
+        self._loaded_at = float('-inf')
+        self._version = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._background_lock = threading.Lock()
+        self._creation_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def refresh(self):
+        session = self.session_factory()
+        try:
+            currencies = [Currency.model_validate(row) for row in session.execute(
+                select(CurrencyTable)).scalars().all()]
+        finally:
+            session.close()
+        by_code = {currency.code: currency for currency in currencies}
+        with self._lock:
+            if by_code != self._by_code:
+                self._version += 1
+            # Swapped whole, readers never see a half built map
+            self._by_code = by_code
+            self._by_id = {currency.id: currency for currency in currencies}
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+        self.logger.info(
+            f"Loaded {len(currencies)} currencies (version {self._version})")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.refresh()
+
+    def _refresh_in_background(self):
+        if not self._background_lock.acquire(blocking=False):
+            # Already on its way
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.warning(f"Couldn't reload the currencies: {e!r}")
+            finally:
+                self._background_lock.release()
+
+        threading.Thread(target=run, name='currency-refresh',
+                         daemon=True).start()
+
+    def snapshot(self) -> CurrencySet:
+        self._ensure_loaded()
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            self._refresh_in_background()
+        with self._lock:
+            return CurrencySet(self._version, self._by_code)
+
+    def register(self, currency: Currency):
+        with self._lock:
+            if self._by_code.get(currency.code) != currency:
+                self._version += 1
+            self._by_code = {**self._by_code, currency.code: currency}
+            self._by_id = {**self._by_id, currency.id: currency}
+
+    def all(self) -> List[Currency]:
+        self._ensure_loaded()
+        return list(self._by_code.values())
+
+    def get_by_code(self, code: str) -> Optional[Currency]:
+        self._ensure_loaded()
+        currency = self._by_code.get(code)
+        if currency is None:
+            self.refresh()
+            currency = self._by_code.get(code)
+        return currency
+
+    def get_by_id(self, currency_id: int) -> Optional[Currency]:
+        self._ensure_loaded()
+        currency = self._by_id.get(currency_id)
+        if currency is None:
+            self.refresh()
+            currency = self._by_id.get(currency_id)
+        return currency
+
+    def code_for(self, currency_id: int) -> Optional[str]:
+        currency = self.get_by_id(currency_id)
+        return currency.code if currency else None
+
+    def resolve(self, code: str, create: Callable[[str], Currency]) -> Currency:
+        """
+        The currency registered for `code`, created with `create` when there is
+        none yet. Only one thread at a time creates a given code, the others
+        wait and get its result.
+        """
+        self._ensure_loaded()
+        currency = self._by_code.get(code)
+        if currency is not None:
+            return currency
+
+        with self._lock:
+            creation_lock = self._creation_locks.setdefault(
+                code, threading.Lock())
+        with creation_lock:
+            currency = self.get_by_code(code)
+            if currency is None:
+                try:
+                    currency = create(code)
+                except IntegrityError:
+                    # Another worker created it after our last refresh
+                    self.refresh()
+                    currency = self._by_code.get(code)
+                    if currency is None:
+                        raise
+                self.register(currency)
+                self.logger.info(f"Registered the new currency {code}")
+        return currency
+
+
+currency_registry_instance: Optional[CurrencyRegistry] = None
+_currency_registry_lock = threading.Lock()
+
+
+def get_currency_registry() -> CurrencyRegistry:
+    global currency_registry_instance
+    with _currency_registry_lock:
+        if not currency_registry_instance:
+            currency_registry_instance = CurrencyRegistry(
+                SessionLocal, config.CURRENCY_SET_TTL)
+        return currency_registry_instance
@@ -1,23 +1,29 @@
+import time
 from http import HTTPStatus
-from typing import Optional, Tuple, override
+from typing import Optional, override
 
 import requests
 from sqlalchemy.orm import Session
 
-from ..utils.dynamic_enum import remap_currency_codes
+from ..config import config
+from ..utils import iso4217
+from ..utils.iso4217 import canonical_code
 
 from ..models.currency import CurrencyTable
 from ..repositories.currency_repository import CurrencyRepository
 from ..repositories.generic_repository import GenericRepository
 from ..schemas.api_response import ApiResponse, Meta, SingleResponse
 from ..schemas.currency import Currency, CurrencyCreate, CurrencyUpdate
+from ..services.currency_registry import get_currency_registry
 from ..services.generic_service import GenericService
-from ..utils.decorators import timed_operation
+from ..services.response_cache_service import bump_ingest_generation
+from ..utils.tracing import elapsed, traced
 
 
 class CurrencyService(GenericService[CurrencyTable, CurrencyCreate, CurrencyUpdate, Currency]):
     def __init__(self, db: Session):
         self.repository: CurrencyRepository = CurrencyRepository(db)
+        self.registry = get_currency_registry()
 
         super().__init__(
             CurrencyTable,
@@ -27,11 +33,28 @@ class CurrencyService(GenericService[CurrencyTable, CurrencyCreate, CurrencyUpda
             self.repository
         )
 
-    @timed_operation
-    def get_currency_metadata(self, code: str) -> Tuple[CurrencyCreate, float]:
-        code = remap_currency_codes(code)
+    @traced
+    def get_currency_metadata(self, code: str) -> CurrencyCreate:
+        """
+        Metadata of `code` from the bundled ISO-4217 table. Codes missing from
+        it are looked up on restcountries.com when CURRENCY_REMOTE_LOOKUP is on,
+        and otherwise registered with their code only.
+        """
+        code = canonical_code(code)
+        info = iso4217.lookup(code)
+        if info:
+            return CurrencyCreate(code=info.code, name=info.name, symbol=info.symbol, region=info.region)
+        if config.CURRENCY_REMOTE_LOOKUP:
+            try:
+                return self._fetch_remote_metadata(code)
+            except (requests.RequestException, KeyError, IndexError) as e:
+                self.logger.warning(
+                    f"Couldn't get the metadata of {code} from restcountries.com: {e!r}")
+        return CurrencyCreate(code=code, name=None, symbol=None, region=None)
+
+    def _fetch_remote_metadata(self, code: str) -> CurrencyCreate:
         response = requests.get(
-            f'https://restcountries.com/v3.1/currency/{code}')
+            f'https://restcountries.com/v3.1/currency/{code}', timeout=config.CURRENCY_REMOTE_LOOKUP_TIMEOUT)
         response.raise_for_status()
         data = response.json()[0]
         return CurrencyCreate(
@@ -41,18 +64,30 @@ class CurrencyService(GenericService[CurrencyTable, CurrencyCreate, CurrencyUpda
             region=data['name']['common']
         )
 
+    @traced
     def create_from_code(self, code: str) -> ApiResponse[SingleResponse[Currency]]:
-        code = remap_currency_codes(code)
-        new_entry, time_get_meta = self.get_currency_metadata(code)
+        code = canonical_code(code)
+        new_entry = self.get_currency_metadata(code)
         response = self.create(new_entry)
-        response.meta.request_time += time_get_meta
+        bump_ingest_generation()
+        response.meta.request_time = elapsed()
         response.meta.message = f"Created a new currency {
-            response.data.item.name}"
+            response.data.item.name or code}"
         return response
 
+    def get_or_create(self, code: str) -> Currency:
+        """
+        The registered currency for `code`, from memory when possible.
+        Unknown codes are created once, even when several requests miss at once.
+        """
+        return self.registry.resolve(
+            canonical_code(code), lambda code: self.create_from_code(code).data.item)
+
     def get_by_code(self, code: str) -> ApiResponse[SingleResponse[Currency]]:
-        code = remap_currency_codes(code)
-        result, elapsed_time = self.repository.filter_by_code(code)
+        code = canonical_code(code)
+        start_time = time.perf_counter()
+        result = self.registry.get_by_code(code)
+        elapsed_time = time.perf_counter() - start_time
         if result:
             return ApiResponse(
                 meta=Meta(
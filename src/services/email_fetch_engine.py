@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from logging import getLogger
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+
+from ..config import config
+
+T = TypeVar('T')
+
+
+class EmailFetchEngine:
+    """
+    Process-wide asyncio engine for talking to the email-api.
+
+    A single event loop runs on a daemon thread and owns one pooled
+    `httpx.AsyncClient`, so keep-alive connections survive across requests.
+    Every page fetch, no matter which request or bank it belongs to, has to
+    acquire a slot from the global concurrency budget and from the per-host
+    budget before it reaches the network.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        max_connections_per_host: int,
+        max_concurrency: int,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max(1, max_connections)
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.max_concurrency = max(1, max_concurrency)
+        self.logger = getLogger(self.__class__.__name__)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._budget: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.run(self._open())
+
+    async def _open(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self._budget = asyncio.Semaphore(self.max_concurrency)
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        """Schedule `coro` on the engine loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run `coro` on the engine loop and block the calling thread until it finishes."""
+        return self.submit(coro).result()
+
+    async def get_json(self, path: str, params: Optional[dict] = None) -> Any:
+        url = self._client.build_request('GET', path).url
+        host_slot = self._host_slots.setdefault(
+            url.host, asyncio.Semaphore(self.max_connections_per_host))
+        async with self._budget, host_slot:
+            response = await self._client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _shutdown(self):
+        # Page fetches of abandoned pulls may still be running, e.g. after a failed first page
+        tasks = [task for task in asyncio.all_tasks()
+                 if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self.run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+email_fetch_engine_instance: Optional[EmailFetchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_email_fetch_engine() -> EmailFetchEngine:
+    global email_fetch_engine_instance
+    with _engine_lock:
+        if not email_fetch_engine_instance:
+            email_fetch_engine_instance = EmailFetchEngine(
+                base_url=config.EMAIL_API_URL,
+                timeout=config.EMAIL_API_TIMEOUT,
+                max_connections=config.EMAIL_API_MAX_CONNECTIONS,
+                max_connections_per_host=config.EMAIL_API_MAX_CONNECTIONS_PER_HOST,
+                max_concurrency=config.EMAIL_FETCH_CONCURRENCY,
+            )
+        return email_fetch_engine_instance
+
+
+def close_email_fetch_engine():
+    global email_fetch_engine_instance
+    with _engine_lock:
+        if email_fetch_engine_instance:
+            email_fetch_engine_instance.close()
+            email_fetch_engine_instance = None
@@ -1,11 +1,13 @@
+import asyncio
 from logging import getLogger
+from typing import Iterator, Mapping, NamedTuple, Optional, Tuple
 
 import requests
 
 from ..models.enums import Bank
 
 from ..schemas.api_response import DateRange
-from ..config import bank_config
+from ..config import bank_config, config
 
 from ..schemas import (
     EmailMessageModel,
@@ -13,20 +15,36 @@ from ..schemas import (
     CursorModel,
     PaginatedResponse,
 )
+from .email_fetch_engine import EmailFetchEngine, get_email_fetch_engine
+
+EmailPage = ApiResponse[PaginatedResponse[EmailMessageModel]]
+
+_END_OF_STREAM = object()
+
+
+class FetchedPage(NamedTuple):
+    bank: Bank
+    page: int
+    # None when the page could not be fetched
+    response: Optional[EmailPage]
+    is_first: bool = False
 
 
 class EmailReaderService:
-    def __init__(self):
-        self.email_api_url = "http://email-api:80"
+    def __init__(self, engine: Optional[EmailFetchEngine] = None):
+        self.email_api_url = config.EMAIL_API_URL
         self.logger = getLogger(__class__.__name__)
+        self.session = requests.Session()
+        self._engine = engine
 
-    def __fetch_paginated_email_from_bank(
-        self,
-        mailbox: str,
-        date_range: DateRange,
-        cursor: CursorModel,
-        bank: Bank,
-    ) -> ApiResponse[PaginatedResponse[EmailMessageModel]]:
+    @property
+    def engine(self) -> EmailFetchEngine:
+        if not self._engine:
+            self._engine = get_email_fetch_engine()
+        return self._engine
+
+    @staticmethod
+    def _build_params(bank: Bank, date_range: DateRange, cursor: CursorModel) -> dict:
         bank_params = bank_config[bank]
 
         params = {
@@ -39,14 +57,116 @@ class EmailReaderService:
         if bank_params.subject:
             params["subject"] = bank_params.subject
 
-        response = requests.get(
-            f"{self.email_api_url}/{mailbox}", params=params)
+        return {key: str(value) for key, value in params.items() if value is not None}
+
+    def __fetch_paginated_email_from_bank(
+        self,
+        mailbox: str,
+        date_range: DateRange,
+        cursor: CursorModel,
+        bank: Bank,
+    ) -> EmailPage:
+        response = self.session.get(
+            f"{self.email_api_url}/{mailbox}",
+            params=self._build_params(bank, date_range, cursor),
+            timeout=config.EMAIL_API_TIMEOUT)
         response.raise_for_status()
 
-        return ApiResponse[PaginatedResponse[EmailMessageModel]](**response.json())
+        return EmailPage(**response.json())
 
-    def fetch_emails_page_from_bank(self, bank: Bank, mailbox: str, date_range: DateRange, page: int, page_size: int) -> ApiResponse[PaginatedResponse[EmailMessageModel]]:
+    def fetch_emails_page_from_bank(self, bank: Bank, mailbox: str, date_range: DateRange, page: int, page_size: int) -> EmailPage:
         cursor = CursorModel(page=page, page_size=page_size)
         data = self.__fetch_paginated_email_from_bank(
             bank=bank, mailbox=mailbox, date_range=date_range, cursor=cursor)
         return data
+
+    async def afetch_emails_page_from_bank(self, bank: Bank, mailbox: str, date_range: DateRange, page: int, page_size: int) -> EmailPage:
+        cursor = CursorModel(page=page, page_size=page_size)
+        data = await self.engine.get_json(
+            f"/{mailbox}", params=self._build_params(bank, date_range, cursor))
+        return EmailPage(**data)
+
+    async def _aproduce_pages(
+        self,
+        output: asyncio.Queue,
+        bank_ranges: Mapping[Bank, DateRange],
+        mailbox: str,
+        page: int,
+        page_size: int,
+        concurrency: int,
+    ):
+        jobs: asyncio.Queue[Tuple[Bank, int, bool]] = asyncio.Queue()
+        for bank in bank_ranges:
+            jobs.put_nowait((bank, page, True))
+
+        async def worker():
+            while True:
+                bank, page_number, is_first = await jobs.get()
+                try:
+                    response = await self.afetch_emails_page_from_bank(
+                        bank, mailbox, bank_ranges[bank], page_number, page_size)
+                    if is_first and response.data and response.data.pagination:
+                        pagination = response.data.pagination
+                        total_pages = (pagination.total_items +
+                                       pagination.page_size - 1) // pagination.page_size
+                        for next_page in range(1, total_pages + 1):
+                            if next_page != page_number:
+                                jobs.put_nowait((bank, next_page, False))
+                    # Blocks while the consumer is behind, which keeps at most
+                    # `concurrency` fetched pages waiting outside the queue.
+                    await output.put(FetchedPage(bank, page_number, response, is_first))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if is_first:
+                        await output.put(e)
+                    else:
+                        self.logger.error(
+                            f"[{bank.name}] Fetching page {page_number} failed: {e!r}")
+                        await output.put(FetchedPage(bank, page_number, None))
+                finally:
+                    jobs.task_done()
+
+        workers = [asyncio.create_task(worker())
+                   for _ in range(max(1, concurrency))]
+        try:
+            await jobs.join()
+            await output.put(_END_OF_STREAM)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    def stream_pages_from_banks(
+        self,
+        bank_ranges: Mapping[Bank, DateRange],
+        mailbox: str,
+        page: int,
+        page_size: int,
+        buffer_size: int,
+    ) -> Iterator[FetchedPage]:
+        """
+        Fetch the pages of every bank in `bank_ranges`, each one for its own
+        date range, concurrently on the fetch engine's loop and yield them as
+        they arrive.
+
+        Pages are handed over through a queue of `buffer_size` items, so a slow
+        consumer pauses the fetchers instead of letting fetched pages pile up.
+        The first page of each bank is flagged with `is_first` and always
+        yielded, even when the email-api reports it as empty. An error on a
+        first page is re-raised here; other pages that fail are logged and
+        yielded with `response=None`.
+        """
+        output: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size))
+        producer = self.engine.submit(self._aproduce_pages(
+            output, dict(bank_ranges), mailbox, page, page_size,
+            config.EMAIL_FETCH_CONCURRENCY))
+        try:
+            while True:
+                item = self.engine.run(output.get())
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
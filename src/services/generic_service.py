@@ -1,67 +1,161 @@
 from http import HTTPStatus
 from logging import getLogger
-from typing import Callable, Generic, List, Optional, Type, Union
+from typing import Any, Dict, Generic, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
 
 from sqlalchemy import ColumnElement
 
+from ..config import config
+from ..models.enums import CountMode
 from ..repositories.generic_repository import GenericRepository
 from ..schemas.api_response import (ApiResponse, CursorModel, Meta,
                                     PaginatedResponse, PaginationMeta,
                                     SingleResponse)
 from ..schemas.typing import (CreateSchemaType, ModelType, ReturnSchemaType,
                               UpdateSchemaType)
+from ..utils.keyset import KeysetRow, SortKey, decode_key, encode_key, order_by_keys
+from ..utils.tracing import elapsed, traced
+from .response_cache_service import ingest_generation
 
 
-class GenericService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, ReturnSchemaType]):
-    def __init__(self, model: Type[ModelType], create_schema: Type[CreateSchemaType], update_schema: Type[UpdateSchemaType], return_schema: Type[ReturnSchemaType], repository: GenericRepository):
+class PagePlan(NamedTuple):
+    count_mode: CountMode
+    is_keyset: bool
+    # Total carried along by a window counted cursor, the count is skipped
+    carried_total: Optional[int]
+    # Whether the page query itself has to count the rows
+    with_total: bool
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    first_key: Optional[List[Any]]
+    last_key: Optional[List[Any]]
+    has_next: bool
+    has_prev: bool
+    window_total: Optional[int]
+
+
+class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, ReturnSchemaType]):
+    """
+    Everything `GenericService` and `AsyncGenericService` share: turning rows
+    into schemas and the pagination logic around the repository calls, which
+    is all they differ in.
+    """
+
+    def __init__(self, model: Type[ModelType], create_schema: Type[CreateSchemaType], update_schema: Type[UpdateSchemaType], return_schema: Type[ReturnSchemaType]):
         self.model = model
         self.create_schema = create_schema
         self.update_schema = update_schema
         self.return_schema = return_schema
-        self.repository = repository
         self.logger = getLogger(self.__class__.__name__)
 
-    def create(self, obj_in: CreateSchemaType) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
-        obj_in_data = obj_in.model_dump()
-        db_obj, elapsed_time = self.repository.create(
-            self.model(**obj_in_data))
-        meta = Meta(status=HTTPStatus.CREATED, request_time=elapsed_time)
-        item = self.return_schema.model_validate(db_obj)
-        return ApiResponse(meta=meta, data=SingleResponse(item=item))
+    def _to_schema(self, db_obj: ModelType) -> ReturnSchemaType:
+        return self.return_schema.model_validate(db_obj)
 
-    def get(self, id: str) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
-        db_obj, elapsed_time = self.repository.get(id)
+    def _row_to_item(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a plain row read with `columns` into a response item, as is by default."""
+        return row
+
+    def _single_response(self, db_obj: Optional[ModelType], elapsed_time: float) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
         status = HTTPStatus.OK if db_obj else HTTPStatus.NOT_FOUND
         meta = Meta(status=status, request_time=elapsed_time)
-        item = self.return_schema.model_validate(db_obj) if db_obj else None
+        item = self._to_schema(db_obj) if db_obj else None
         return ApiResponse(meta=meta, data=SingleResponse(item=item))
 
-    def get_all(self) -> ApiResponse[SingleResponse[List[ReturnSchemaType]]]:
-        data, elapsed_time = self.repository.get_all()
+    def _list_response(self, data: List[ModelType], elapsed_time: float) -> ApiResponse[SingleResponse[List[ReturnSchemaType]]]:
         items = [self.return_schema.model_validate(obj) for obj in data]
         return ApiResponse(meta=Meta(status=HTTPStatus.OK, request_time=elapsed_time), data=SingleResponse(item=items))
 
-    def get_paginated(self, cursor: CursorModel, filter: Optional[ColumnElement] = None,
-                      order_by: Optional[Union[ColumnElement,
-                                               list[ColumnElement]]] = None
-                      ) -> ApiResponse[PaginatedResponse[ReturnSchemaType]]:
-        current_page = cursor.page
+    @staticmethod
+    def _page_plan(cursor: CursorModel, sort: Optional[Sequence[SortKey]], count_mode: Optional[CountMode]) -> PagePlan:
+        count_mode = count_mode or CountMode(config.PAGINATION_COUNT_MODE)
+        is_keyset = bool(sort) and (cursor.is_keyset or cursor.page == 1)
+        carried_total = cursor.total_items if count_mode == CountMode.WINDOW and is_keyset else None
+        with_total = count_mode == CountMode.WINDOW and carried_total is None
+        return PagePlan(count_mode, is_keyset, carried_total, with_total)
+
+    @staticmethod
+    def _cursor_keys(cursor: CursorModel, sort: Sequence[SortKey]) -> Tuple[Optional[List[Any]], Optional[List[Any]]]:
+        try:
+            after = decode_key(sort, cursor.after)
+            before = decode_key(sort, cursor.before) if after is None else None
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor format")
+        return after, before
+
+    @staticmethod
+    def _keyset_page(
+        cursor: CursorModel, rows: List[KeysetRow], after: Optional[List[Any]], before: Optional[List[Any]]
+    ) -> Page:
+        # `rows` holds one extra row, which tells whether there is anything past this page
         page_size = cursor.page_size
+        has_more = len(rows) > page_size
+        if before is not None:
+            rows = rows[-page_size:]
+            has_next, has_prev = True, has_more
+        else:
+            rows = rows[:page_size]
+            has_next, has_prev = has_more, after is not None
+
+        # The window only sees the rows past the cursor
+        window_total = None
+        if rows and rows[0].total is not None:
+            if after is None and before is None:
+                window_total = rows[0].total
+            elif after is not None:
+                window_total = (cursor.page - 1) * page_size + rows[0].total
+
+        if not rows:
+            return Page([], None, None, False, False, window_total)
+        return Page([row.item for row in rows], rows[0].key, rows[-1].key,
+                    has_next, has_prev, window_total)
 
-        total_items, count_elapsed_time = self.repository.count(filter)
-        offset = (current_page - 1) * page_size
-        db_objs, paginated_elapsed_time = self.repository.get_paginated(
-            offset, page_size, filter, order_by)
+    @staticmethod
+    def _offset_order(
+        sort: Optional[Sequence[SortKey]], order_by: Optional[Union[ColumnElement, list[ColumnElement]]]
+    ) -> Optional[Union[ColumnElement, list[ColumnElement]]]:
+        if sort and order_by is None:
+            return order_by_keys(sort)
+        return order_by
 
-        total_pages = (total_items + page_size - 1) // page_size
-        request_time = count_elapsed_time + paginated_elapsed_time
+    @staticmethod
+    def _offset_page(cursor: CursorModel, db_objs: List[Any], window_total: Optional[int]) -> Page:
+        # `db_objs` holds one extra row, which tells whether there is a next page
+        return Page(db_objs[:cursor.page_size], None, None,
+                    len(db_objs) > cursor.page_size, cursor.page > 1, window_total)
+
+    def _paginated_response(
+        self, cursor: CursorModel, plan: PagePlan, total_items: Optional[int], page: Page,
+        request_time: float, columns: Optional[Sequence[ColumnElement]]
+    ) -> ApiResponse[PaginatedResponse[ReturnSchemaType]]:
+        current_page = cursor.page
+        page_size = cursor.page_size
+        if plan.with_total:
+            total_items = page.window_total
+        total_pages = (total_items + page_size -
+                       1) // page_size if total_items is not None else None
 
-        next_cursor = CursorModel(
-            page=current_page + 1, page_size=page_size).encode() if current_page < total_pages else None
-        prev_cursor = CursorModel(
-            page=current_page - 1, page_size=page_size).encode() if current_page > 1 else None
+        if plan.is_keyset:
+            # Window counts are only computed once, later pages carry them along
+            carry = total_items if plan.count_mode == CountMode.WINDOW else None
+            next_cursor = CursorModel(
+                page=current_page + 1, page_size=page_size, after=encode_key(page.last_key),
+                total_items=carry).encode() if page.has_next else None
+            prev_cursor = CursorModel(
+                page=max(1, current_page - 1), page_size=page_size, before=encode_key(page.first_key),
+                total_items=carry).encode() if page.has_prev else None
+        else:
+            next_cursor = CursorModel(
+                page=current_page + 1, page_size=page_size).encode() if page.has_next else None
+            prev_cursor = CursorModel(
+                page=current_page - 1, page_size=page_size).encode() if page.has_prev else None
 
-        items = [self.return_schema.model_validate(obj) for obj in db_objs]
+        if columns:
+            keys = [column.key for column in columns]
+            items = [self._row_to_item(dict(zip(keys, row)))
+                     for row in page.items]
+        else:
+            items = [self._to_schema(obj) for obj in page.items]
 
         meta = Meta(status=HTTPStatus.OK, request_time=request_time,
                     message="Transactions retrieved successfully")
@@ -74,21 +168,109 @@ class GenericService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Retu
             prev_cursor=prev_cursor
         )
 
-        response = ApiResponse(meta=meta, data=PaginatedResponse(
+        return ApiResponse(meta=meta, data=PaginatedResponse(
             pagination=pagination, items=items))
-        return response
 
+
+class GenericService(BaseService[ModelType, CreateSchemaType, UpdateSchemaType, ReturnSchemaType]):
+    def __init__(self, model: Type[ModelType], create_schema: Type[CreateSchemaType], update_schema: Type[UpdateSchemaType], return_schema: Type[ReturnSchemaType], repository: GenericRepository):
+        super().__init__(model, create_schema, update_schema, return_schema)
+        self.repository = repository
+
+    @traced
+    def create(self, obj_in: CreateSchemaType) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
+        obj_in_data = obj_in.model_dump()
+        db_obj = self.repository.create(self.model(**obj_in_data))
+        meta = Meta(status=HTTPStatus.CREATED, request_time=elapsed())
+        item = self.return_schema.model_validate(db_obj)
+        return ApiResponse(meta=meta, data=SingleResponse(item=item))
+
+    @traced
+    def get(self, id: str) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
+        db_obj = self.repository.get(id)
+        return self._single_response(db_obj, elapsed())
+
+    @traced
+    def get_all(self) -> ApiResponse[SingleResponse[List[ReturnSchemaType]]]:
+        data = self.repository.get_all()
+        return self._list_response(data, elapsed())
+
+    def _count(self, filter: Optional[ColumnElement], count_mode: CountMode) -> Optional[int]:
+        if count_mode == CountMode.EXACT:
+            return self.repository.count(filter)
+        if count_mode == CountMode.CACHED:
+            return self.repository.cached_count(filter, ingest_generation())
+        if count_mode == CountMode.ESTIMATE:
+            return self.repository.estimate_count(filter)
+        # WINDOW reads the count from the page query itself
+        return None
+
+    @traced
+    def get_paginated(self, cursor: CursorModel, filter: Optional[ColumnElement] = None,
+                      order_by: Optional[Union[ColumnElement,
+                                               list[ColumnElement]]] = None,
+                      sort: Optional[Sequence[SortKey]] = None,
+                      count_mode: Optional[CountMode] = None,
+                      columns: Optional[Sequence[ColumnElement]] = None
+                      ) -> ApiResponse[PaginatedResponse[ReturnSchemaType]]:
+        """
+        Page through the rows matching `filter`.
+
+        With `sort` the pages are read with keyset pagination: the cursors carry
+        the sort key of the first and last rows and the next page seeks past it,
+        so every page costs the same and rows ingested mid-scroll don't shift
+        the pages already served. An explicit `page` without a keyset cursor
+        falls back to OFFSET pagination with `order_by` (or `sort`'s order).
+
+        `count_mode` picks how `total_items` is filled (PAGINATION_COUNT_MODE by
+        default). Whether there is a next page never depends on it, one extra
+        row is fetched to find out.
+
+        With `columns` the page is read as plain rows of those columns and the
+        items are dicts keyed by column key, built by `_row_to_item`. They skip
+        the ORM and schema validation, which is safe for rows we wrote
+        ourselves, and the response is meant to be serialized as is.
+        """
+        plan = self._page_plan(cursor, sort, count_mode)
+        if plan.carried_total is not None:
+            total_items = plan.carried_total
+        else:
+            total_items = self._count(filter, plan.count_mode)
+
+        if plan.is_keyset:
+            after, before = self._cursor_keys(cursor, sort)
+            rows = self.repository.get_keyset_page(
+                cursor.page_size + 1, sort, filter, after=after, before=before,
+                with_total=plan.with_total, columns=columns)
+            page = self._keyset_page(cursor, rows, after, before)
+        else:
+            order_by = self._offset_order(sort, order_by)
+            offset = (cursor.page - 1) * cursor.page_size
+            if plan.with_total:
+                db_objs, window_total = self.repository.get_paginated_with_total(
+                    offset, cursor.page_size + 1, filter, order_by, columns)
+            else:
+                window_total = None
+                db_objs = self.repository.get_paginated(
+                    offset, cursor.page_size + 1, filter, order_by, columns)
+            page = self._offset_page(cursor, db_objs, window_total)
+
+        return self._paginated_response(
+            cursor, plan, total_items, page, elapsed(), columns)
+
+    @traced
     def update(self, id: str, obj_in: UpdateSchemaType) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
         obj_in_data = obj_in.model_dump()
-        db_obj, elapsed_time = self.repository.update(id, obj_in_data)
+        db_obj = self.repository.update(id, obj_in_data)
         status = HTTPStatus.OK if db_obj else HTTPStatus.NOT_FOUND
-        meta = Meta(status=status, request_time=elapsed_time)
+        meta = Meta(status=status, request_time=elapsed())
         item = self.return_schema.model_validate(db_obj) if db_obj else None
         return ApiResponse(data=SingleResponse(meta=meta, item=item))
 
+    @traced
     def delete(self, id: str) -> ApiResponse[SingleResponse[ReturnSchemaType]]:
-        db_obj, elapsed_time = self.repository.delete(id)
+        db_obj = self.repository.delete(id)
         status = HTTPStatus.OK if db_obj else HTTPStatus.NOT_FOUND
-        meta = Meta(status=status, request_time=elapsed_time)
+        meta = Meta(status=status, request_time=elapsed())
         item = self.return_schema.model_validate(db_obj) if db_obj else None
         return ApiResponse(data=SingleResponse(meta=meta, item=item))
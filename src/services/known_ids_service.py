@@ -0,0 +1,95 @@
+import threading
+from logging import getLogger
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import config
+from ..database import SessionLocal
+from ..repositories.transaction_repository import TransactionRepository
+from ..utils.bloom import BloomFilter
+
+
+class KnownTransactionIds:
+    """
+    Bloom filter of the stored transaction ids, so the pull can tell the ids
+    that are certainly new without asking the database.
+
+    It is rebuilt from the transactions table in the background, and every id
+    counts as possibly known until that finishes. The filter has false
+    positives, so ids it reports as known must still be confirmed against the
+    database. Ids written by other workers are missing from it, which only
+    means their insert hits ON CONFLICT instead of being skipped.
+    """
+
+    def __init__(self, session_factory: sessionmaker[Session], capacity: int, error_rate: float):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.logger = getLogger(self.__class__.__name__)
+        self._filter: Optional[BloomFilter] = None
+        self._ready = False
+        self._rebuild_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            session = self.session_factory()
+            try:
+                repository = TransactionRepository(session)
+                stored = repository.count()
+                bloom = BloomFilter(
+                    max(self.capacity, 2 * stored), self.error_rate)
+                self._ready = False
+                # Swapped in first so ids added while it fills aren't lost
+                self._filter = bloom
+                bloom.update(repository.iter_ids(
+                    config.KNOWN_IDS_FILTER_BATCH_SIZE))
+                self._ready = True
+            finally:
+                session.close()
+        self.logger.info(
+            f"Loaded {len(bloom)} transaction ids into the known ids filter")
+
+    def rebuild_in_background(self):
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                self.logger.warning(
+                    f"Couldn't build the known ids filter: {e!r}")
+
+        threading.Thread(target=run, name='known-ids-rebuild',
+                         daemon=True).start()
+
+    def candidates(self, ids: Iterable[str]) -> List[str]:
+        """The ones of `ids` that may already be stored."""
+        bloom = self._filter
+        if not self._ready or bloom is None:
+            return list(ids)
+        return [transaction_id for transaction_id in ids if transaction_id in bloom]
+
+    def add(self, ids: Iterable[str]):
+        bloom = self._filter
+        if bloom is not None:
+            bloom.update(ids)
+
+
+known_ids_instance: Optional[KnownTransactionIds] = None
+_known_ids_lock = threading.Lock()
+
+
+def get_known_transaction_ids() -> Optional[KnownTransactionIds]:
+    """The process-wide known ids filter, None when KNOWN_IDS_FILTER_ENABLED is off."""
+    global known_ids_instance
+    if not config.KNOWN_IDS_FILTER_ENABLED:
+        return None
+    with _known_ids_lock:
+        if not known_ids_instance:
+            known_ids_instance = KnownTransactionIds(
+                SessionLocal, config.KNOWN_IDS_FILTER_CAPACITY, config.KNOWN_IDS_FILTER_ERROR_RATE)
+            known_ids_instance.rebuild_in_background()
+        return known_ids_instance
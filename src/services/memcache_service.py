@@ -1,19 +1,106 @@
 import pickle
+import threading
+import time
 from datetime import timedelta
 from logging import getLogger
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, TypeVar
 
-from pymemcache.client.base import Client
+from pymemcache.client.base import PooledClient
 
 from ..schemas import TransactionCreate, TransactionsPageResponse
 from ..schemas.api_response import PaginationMeta
 from ..utils import hash_pagination_meta
 
+T = TypeVar('T')
+
 
 class MemcacheService:
-    def __init__(self, host: str = 'localhost', port: int = 11211):
-        self.client = Client((host, port))
+    """
+    Pickled values and counters in Memcached. When a call fails the server is
+    treated as down and skipped for `retry_after` seconds, every call answers
+    as a miss meanwhile, so callers fall back to their other tiers without
+    waiting on the network.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 11211, timeout: Optional[float] = None,
+                 retry_after: float = 30.0):
+        # Pooled so request threads can share one service
+        self.client = PooledClient(
+            (host, port), connect_timeout=timeout, timeout=timeout)
+        self.retry_after = retry_after
         self.logger = getLogger(MemcacheService.__name__)
+        self._lock = threading.Lock()
+        self._down = False
+        self._retry_at = float('-inf')
+
+    def _call(self, action: str, func: Callable[[], T], default: Optional[T] = None) -> Optional[T]:
+        with self._lock:
+            if self._down and time.monotonic() < self._retry_at:
+                return default
+        try:
+            result = func()
+        except Exception as e:
+            with self._lock:
+                went_down = not self._down
+                self._down = True
+                self._retry_at = time.monotonic() + self.retry_after
+            if went_down:
+                self.logger.warning(
+                    f"Memcached is unreachable ({action}: {e!r}), skipping it for {self.retry_after:g} seconds at a time")
+            return default
+        with self._lock:
+            came_back = self._down
+            self._down = False
+        if came_back:
+            self.logger.warning("Memcached is reachable again")
+        return result
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retrieve and unpickle a value, None when it is missing or Memcached can't be reached.
+        """
+        cached_data = self._call(f'get {key}', lambda: self.client.get(key))
+        if cached_data is not None:
+            return pickle.loads(cached_data)
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[timedelta] = None):
+        """
+        Pickle and store a value with optional expiration.
+        """
+        data = pickle.dumps(value)
+        self._call(f'set {key}', lambda: self.client.set(
+            key, data, expire=int(ttl.total_seconds()) if ttl else 0))
+
+    def _seed_counter(self, key: str) -> bool:
+        # Seeded from the clock rather than 0, so a counter lost to an eviction
+        # or a restart never comes back with a value that was already used
+        return self.client.add(key, str(time.time_ns()).encode(), noreply=False)
+
+    def get_counter(self, key: str) -> Optional[int]:
+        """
+        Read a counter kept by `incr_counter`, creating it when missing. None
+        when Memcached can't be reached.
+        """
+        def read():
+            value = self.client.get(key)
+            if value is None:
+                self._seed_counter(key)
+                value = self.client.get(key)
+            return int(value) if value is not None else None
+        return self._call(f'get counter {key}', read)
+
+    def incr_counter(self, key: str) -> Optional[int]:
+        """
+        Atomically increment a counter, None when Memcached can't be reached.
+        """
+        def increment():
+            value = self.client.incr(key, 1, noreply=False)
+            if value is None:
+                self._seed_counter(key)
+                value = self.client.incr(key, 1, noreply=False)
+            return int(value) if value is not None else None
+        return self._call(f'increment counter {key}', increment)
 
     def set_transactions(self, data: TransactionsPageResponse, ttl: Optional[timedelta] = None):
         """
@@ -0,0 +1,35 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from typing import Optional
+
+from ..config import config
+
+logger = getLogger(__name__)
+
+parse_pool_instance: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Process pool of PARSE_PROCESSES workers that parse pulled emails, started on first use."""
+    global parse_pool_instance
+    with _parse_pool_lock:
+        if not parse_pool_instance:
+            # Spawned, forking a process that runs the scheduler and the
+            # fetch engine threads could copy their locks while held
+            parse_pool_instance = ProcessPoolExecutor(
+                max_workers=config.PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'))
+            logger.info(
+                f"Started {config.PARSE_PROCESSES} email parsing processes")
+        return parse_pool_instance
+
+
+def close_parse_pool():
+    global parse_pool_instance
+    with _parse_pool_lock:
+        if parse_pool_instance:
+            parse_pool_instance.shutdown(cancel_futures=True)
+            parse_pool_instance = None
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import timedelta
+from enum import Enum
+from http import HTTPStatus
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Mapping, Optional, Tuple
+
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from ..config import config
+from ..schemas.api_response import ApiResponse, CursorModel
+from ..utils.cache import LRUCache
+from .memcache_service import MemcacheService
+
+GENERATION_KEY = 'response_cache:ingest_generation'
+
+
+class ResponseCacheService:
+    """
+    Cache of read endpoint responses, tagged with the ingest generation.
+
+    Responses are keyed by endpoint and normalized parameters plus the current
+    generation, which `bump_generation` moves forward whenever a pull writes
+    new rows. Entries of older generations are never looked up again and simply
+    age out. An in-process LRU sits in front of Memcached, which holds the
+    generation counter and the entries shared by every worker. When Memcached
+    is down there is no generation at all, pulls made by other workers could
+    not be noticed, so responses are neither cached nor looked up.
+    """
+
+    def __init__(
+        self,
+        memcache: Optional[MemcacheService],
+        l1_capacity: int,
+        ttl: int,
+        generation_ttl: float,
+    ):
+        self.memcache = memcache
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self.logger = getLogger(self.__class__.__name__)
+        self._l1: LRUCache[Tuple[float, ApiResponse]] = LRUCache(l1_capacity)
+        self._lock = threading.Lock()
+        # Bumped by this process, so its own pulls show up even without Memcached
+        self._local_generation = 0
+        self._shared_generation: Optional[int] = None
+        self._shared_generation_read_at = float('-inf')
+
+    def _current_generation(self) -> Optional[str]:
+        # Called with the lock held
+        if self._shared_generation is None:
+            return None
+        return f'{self._shared_generation}.{self._local_generation}'
+
+    def _fresh_generation(self) -> Tuple[bool, Optional[str]]:
+        """Whether the last read of the shared generation can still be trusted, and the generation it gives."""
+        with self._lock:
+            fresh = time.monotonic() - self._shared_generation_read_at < self.generation_ttl
+            return fresh, self._current_generation()
+
+    def generation(self) -> Optional[str]:
+        """The current ingest generation, None when Memcached can't tell the shared one."""
+        fresh, generation = self._fresh_generation()
+        if fresh:
+            return generation
+        shared = self.memcache.get_counter(
+            GENERATION_KEY) if self.memcache else None
+        with self._lock:
+            self._shared_generation = shared
+            self._shared_generation_read_at = time.monotonic()
+            return self._current_generation()
+
+    async def generation_async(self) -> Optional[str]:
+        """`generation`, only going to the threadpool when Memcached has to be asked."""
+        fresh, generation = self._fresh_generation()
+        return generation if fresh else await run_in_threadpool(self.generation)
+
+    def bump_generation(self):
+        shared = self.memcache.incr_counter(
+            GENERATION_KEY) if self.memcache else None
+        with self._lock:
+            self._local_generation += 1
+            self._shared_generation = shared
+            self._shared_generation_read_at = time.monotonic() if shared is not None else float('-inf')
+            generation = self._current_generation()
+        if generation is not None:
+            self.logger.info(f"Ingest generation moved to {generation}")
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, CursorModel):
+            # The raw cursor string is already decoded into the other fields
+            return value.model_dump(mode='json', exclude={'cursor'})
+        if isinstance(value, BaseModel):
+            return value.model_dump(mode='json')
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    def make_key(self, endpoint: str, params: Mapping[str, Any], generation: str) -> str:
+        normalized = json.dumps(
+            {name: self._normalize(value) for name, value in params.items()},
+            sort_keys=True, default=str)
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f'response:{generation}:{endpoint}:{digest}'
+
+    def _get_local(self, key: str) -> Optional[ApiResponse]:
+        entry = self._l1.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _get_shared(self, key: str) -> Optional[ApiResponse]:
+        shared = self.memcache.get(key) if self.memcache else None
+        if shared is None:
+            return None
+        # Parametrized response models can't be pickled, Memcached holds
+        # their JSON dump and the route's response_model validates it again
+        response = ApiResponse.model_validate(shared)
+        self._l1.put(key, (time.monotonic(), response))
+        return response
+
+    def _set_shared(self, key: str, response: ApiResponse):
+        if self.memcache:
+            self.memcache.set(key, response.model_dump(
+                mode='json'), timedelta(seconds=self.ttl))
+
+    def get_or_set(self, endpoint: str, params: Mapping[str, Any], func: Callable[[], ApiResponse]) -> ApiResponse:
+        """
+        Return the cached response of `endpoint` for `params`, calling `func`
+        and caching its result on a miss. Only successful responses are cached.
+        """
+        start_time = time.perf_counter()
+        generation = self.generation()
+        if generation is None:
+            return func()
+        key = self.make_key(endpoint, params, generation)
+
+        cached = self._get_local(key) or self._get_shared(key)
+        if cached is not None:
+            return self._from_cache(cached, start_time)
+
+        response = func()
+        if response.meta.status == HTTPStatus.OK:
+            self._l1.put(key, (time.monotonic(), response))
+            self._set_shared(key, response)
+        return response
+
+    async def get_or_set_async(
+        self, endpoint: str, params: Mapping[str, Any], func: Callable[[], Awaitable[ApiResponse]]
+    ) -> ApiResponse:
+        """
+        `get_or_set` for a coroutine `func`. The in-process tier is read on the
+        event loop, only the calls that reach Memcached go to the threadpool.
+        """
+        start_time = time.perf_counter()
+        generation = await self.generation_async()
+        if generation is None:
+            return await func()
+        key = self.make_key(endpoint, params, generation)
+
+        cached = self._get_local(key)
+        if cached is None and self.memcache:
+            cached = await run_in_threadpool(self._get_shared, key)
+        if cached is not None:
+            return self._from_cache(cached, start_time)
+
+        response = await func()
+        if response.meta.status == HTTPStatus.OK:
+            self._l1.put(key, (time.monotonic(), response))
+            if self.memcache:
+                await run_in_threadpool(self._set_shared, key, response)
+        return response
+
+    @staticmethod
+    def _from_cache(response: ApiResponse, start_time: float) -> ApiResponse:
+        # Copied so the shared entry is never modified by the caller
+        meta = response.meta.model_copy(
+            update={'request_time': time.perf_counter() - start_time})
+        return response.model_copy(update={'meta': meta})
+
+    def clear(self):
+        self._l1.clear()
+
+
+response_cache_instance: Optional[ResponseCacheService] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCacheService]:
+    """The process-wide response cache, None when RESPONSE_CACHE_ENABLED is off."""
+    global response_cache_instance
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if not response_cache_instance:
+            response_cache_instance = ResponseCacheService(
+                memcache=MemcacheService(
+                    config.MEMCACHE_HOST, config.MEMCACHE_PORT, config.MEMCACHE_TIMEOUT, config.MEMCACHE_RETRY_AFTER),
+                l1_capacity=config.RESPONSE_CACHE_L1_CAPACITY,
+                ttl=config.RESPONSE_CACHE_TTL,
+                generation_ttl=config.RESPONSE_CACHE_GENERATION_TTL,
+            )
+        return response_cache_instance
+
+
+def cached_response(
+    endpoint: str, params: Mapping[str, Any], func: Callable[[], ApiResponse]
+) -> ApiResponse:
+    """`ResponseCacheService.get_or_set` on the process-wide cache, or just `func()` when it is disabled."""
+    cache = get_response_cache()
+    return cache.get_or_set(endpoint, params, func) if cache else func()
+
+
+async def cached_response_async(
+    endpoint: str, params: Mapping[str, Any], func: Callable[[], Awaitable[ApiResponse]]
+) -> ApiResponse:
+    """`cached_response` for the async read endpoints."""
+    cache = get_response_cache()
+    return await cache.get_or_set_async(endpoint, params, func) if cache else await func()
+
+
+def ingest_generation() -> Optional[str]:
+    """
+    The ingest generation shared by every worker, None when the response cache
+    is disabled or Memcached can't tell it.
+    """
+    cache = get_response_cache()
+    return cache.generation() if cache else None
+
+
+async def ingest_generation_async() -> Optional[str]:
+    cache = get_response_cache()
+    return await cache.generation_async() if cache else None
+
+
+def bump_ingest_generation():
+    cache = get_response_cache()
+    if cache:
+        cache.bump_generation()
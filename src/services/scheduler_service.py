@@ -0,0 +1,189 @@
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from apscheduler.events import (EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED,
+                                JobEvent)
+from apscheduler.schedulers.background import BackgroundScheduler
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from ..config import bank_config, config
+from ..database import SessionLocal, engine
+from ..models.enums import Bank
+from ..schemas.api_response import CursorModel, DateRange
+
+
+class SyncJobStats(BaseModel):
+    bank: str
+    interval_minutes: int
+    runs: int = 0
+    skipped_runs: int = 0
+    running: bool = False
+    next_run_at: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_status: Optional[int] = None
+    last_total_found: int = 0
+    last_new_entries: int = 0
+    last_existing_entries: int = 0
+    last_error: Optional[str] = None
+
+
+class SyncSchedulerService:
+    """
+    Runs the incremental email pull for every bank on a fixed interval, in a
+    background thread of this process.
+
+    Missed runs are coalesced into one and a run is skipped while the previous
+    one for the same bank is still going, both inside this process (through
+    APScheduler's max_instances) and across workers (through a Postgres
+    advisory lock per bank).
+    """
+
+    def __init__(self, interval_minutes: int):
+        self.interval_minutes = max(1, interval_minutes)
+        self.logger = getLogger(self.__class__.__name__)
+        self.scheduler = BackgroundScheduler(
+            timezone=timezone.utc,
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': self.interval_minutes * 60,
+            }
+        )
+        self.scheduler.add_listener(
+            self._on_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+        self._stats: Dict[str, SyncJobStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _job_id(bank_name: str) -> str:
+        return f'sync:{bank_name}'
+
+    def start(self):
+        first_run = datetime.now(timezone.utc) + timedelta(seconds=5)
+        for bank in bank_config.keys():
+            self._stats[bank.name] = SyncJobStats(
+                bank=bank.name, interval_minutes=self.interval_minutes)
+            self.scheduler.add_job(
+                self.run_bank,
+                'interval',
+                args=[bank],
+                id=self._job_id(bank.name),
+                minutes=self.interval_minutes,
+                next_run_time=first_run,
+                replace_existing=True,
+            )
+        self.scheduler.start()
+        self.logger.info(
+            f"Scheduled an incremental pull every {self.interval_minutes} minutes for {[bank.name for bank in bank_config.keys()]}")
+
+    def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=True)
+
+    def _on_skipped(self, event: JobEvent):
+        bank_name = event.job_id.split(':', 1)[-1]
+        with self._lock:
+            if bank_name in self._stats:
+                self._stats[bank_name].skipped_runs += 1
+        self.logger.warning(
+            f"Skipped a scheduled pull for {bank_name} ({'still running' if event.code == EVENT_JOB_MAX_INSTANCES else 'missed'})")
+
+    def run_bank(self, bank: Bank):
+        stats = self._stats[bank.name]
+        lock_key = zlib.crc32(self._job_id(bank.name).encode())
+        with engine.connect() as lock_connection:
+            acquired = lock_connection.execute(
+                text('SELECT pg_try_advisory_lock(:key)'), {'key': lock_key}).scalar()
+            # The lock is held by the session, not the transaction, which would
+            # otherwise sit idle in transaction for the whole pull
+            lock_connection.commit()
+            if not acquired:
+                with self._lock:
+                    stats.skipped_runs += 1
+                self.logger.info(
+                    f"Another worker is already pulling {bank.name}, skipping")
+                return
+            try:
+                self._run_locked(bank, stats)
+            finally:
+                lock_connection.execute(
+                    text('SELECT pg_advisory_unlock(:key)'), {'key': lock_key})
+                lock_connection.commit()
+
+    def _run_locked(self, bank: Bank, stats: SyncJobStats):
+        # Imported here because the dependency getters import the services package
+        from ..dependencies.service_getters import (
+            get_currency_service, get_email_reader_service, get_transaction_service)
+
+        with self._lock:
+            stats.running = True
+            stats.last_started_at = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        db = SessionLocal()
+        try:
+            transaction_service = get_transaction_service(
+                db, get_email_reader_service(), get_currency_service(db))
+            response = transaction_service.pull_transactions_from_email(
+                CursorModel(page=1, page_size=config.PAGE_SIZE),
+                DateRange(),
+                incremental=True,
+                banks=[bank],
+            )
+            data = response.data or {}
+            with self._lock:
+                stats.last_status = response.meta.status
+                stats.last_total_found = data.get('total_found', 0)
+                stats.last_new_entries = len(data.get('new_entries', []))
+                stats.last_existing_entries = len(
+                    data.get('existing_entries', []))
+                stats.last_error = None
+        except Exception as e:
+            self.logger.exception(e)
+            with self._lock:
+                stats.last_status = HTTPStatus.INTERNAL_SERVER_ERROR
+                stats.last_error = repr(e)
+        finally:
+            db.close()
+            with self._lock:
+                stats.runs += 1
+                stats.running = False
+                stats.last_finished_at = datetime.now(timezone.utc)
+                stats.last_duration = time.perf_counter() - start_time
+            self.logger.info(
+                f"Scheduled pull for {bank.name} finished in {stats.last_duration:.4f} seconds, "
+                f"{stats.last_new_entries} new and {stats.last_existing_entries} existing entries")
+
+    def get_stats(self) -> List[SyncJobStats]:
+        with self._lock:
+            stats = [item.model_copy() for item in self._stats.values()]
+        for item in stats:
+            job = self.scheduler.get_job(self._job_id(item.bank))
+            item.next_run_at = job.next_run_time if job else None
+        return stats
+
+
+sync_scheduler_instance: Optional[SyncSchedulerService] = None
+
+
+def start_sync_scheduler() -> Optional[SyncSchedulerService]:
+    global sync_scheduler_instance
+    if config.SYNC_SCHEDULER_ENABLED and not sync_scheduler_instance:
+        sync_scheduler_instance = SyncSchedulerService(
+            config.SYNC_INTERVAL_MINUTES)
+        sync_scheduler_instance.start()
+    return sync_scheduler_instance
+
+
+def stop_sync_scheduler():
+    global sync_scheduler_instance
+    if sync_scheduler_instance:
+        sync_scheduler_instance.shutdown()
+        sync_scheduler_instance = None
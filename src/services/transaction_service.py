@@ -1,51 +1,136 @@
+import csv
+import io
 from curses import meta
 from functools import partial
 from http import HTTPStatus
 from logging import getLogger
-from typing import List, Optional, Tuple, Union, override
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, override
 
 from psycopg2.errors import DivisionByZero
-from sqlalchemy import ColumnElement, and_
+from pydantic_core import to_json
+from sqlalchemy import Column, ColumnElement, Date, and_, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..dependencies.currency_enum import cached_currency_enum
 
 from ..services.currency_service import CurrencyService
 
 from ..config import bank_config, config
+from ..database import SessionLocal
 from ..models import (Bank, TransactionIDExistsError, TransactionTable,
                       generate_transaction_id)
-from ..models.enums import TimePeriod
+from ..models.enums import CountMode, ExportFormat, TimePeriod
+from ..parsers import ParsedFields
+from ..repositories.sync_watermark_repository import SyncWatermarkRepository
 from ..repositories.transaction_repository import TransactionRepository
 from ..schemas import (ApiResponse, CursorModel, DateRange, EmailMessageModel,
                        Meta, PaginatedResponse, SingleResponse, Transaction,
                        TransactionCreate, TransactionUpdate)
-from ..schemas.api_response import PaginationMeta
 from ..schemas.currency import Currency
 from ..schemas.transaction import TransactionMetricsByPeriodResult
+from ..utils.keyset import SortKey
 from ..utils.pagination import PaginationDetails, ThreadedPaginator
-from .email_service import EmailReaderService
+from ..utils.pipeline import ProcessPoolStage, ThreadedStage
+from ..utils.tracing import elapsed, traced
+from .email_service import EmailPage, EmailReaderService, FetchedPage
+from .currency_registry import CurrencyRegistry
 from .generic_service import GenericService
+from .known_ids_service import get_known_transaction_ids
+from .parse_pool import get_parse_pool
+from .response_cache_service import bump_ingest_generation
 
 
-def parse_email_to_transaction(m: EmailMessageModel, bank: Bank) -> TransactionCreate:
-    parser = bank_config[bank].parser(m)
-    value, currency = parser.parse_value_and_currency()
-    business = parser.parse_business()
-    transaction = TransactionCreate(
+def _to_transaction(bank: Bank, date: Optional[datetime], body: Optional[str], fields: ParsedFields) -> TransactionCreate:
+    return TransactionCreate(
         bank_email=bank.email,
         bank_name=bank.name,
-        business=business,
-        business_type=parser.parse_business_type(),
-        currency=currency,
-        date=m.date,
-        value=value,
-        body=m.body.strip().replace('\n', ''),
+        business=fields.business,
+        business_type=fields.business_type,
+        currency=fields.currency,
+        date=date,
+        value=fields.value,
+        body=body.strip().replace('\n', ''),
         expense_priority=None,
         expense_type=None
     )
-    return transaction
+
+
+def parse_email_to_transaction(m: EmailMessageModel, bank: Bank) -> TransactionCreate:
+    return _to_transaction(bank, m.date, m.body, bank_config[bank].parser.parse(m.body))
+
+
+def parse_many(emails: List[EmailMessageModel], bank: Bank) -> List[TransactionCreate]:
+    """Parse a batch of `bank`'s emails with its precompiled rules."""
+    parsed = bank_config[bank].parser.parse_many(email.body for email in emails)
+    return [_to_transaction(bank, email.date, email.body, fields) for email, fields in zip(emails, parsed)]
+
+
+TRANSACTION_FIELDS = tuple(TransactionCreate.model_fields)
+
+
+def parse_records(bank: Bank, emails: List[Tuple[Optional[datetime], Optional[str]]]) -> List[tuple]:
+    """
+    Parse worker job. Parses and validates the `(date, body)` pairs of `bank`'s
+    emails, and returns each TransactionCreate as a tuple of its field values,
+    which pickles much smaller than the model.
+    """
+    parsed = bank_config[bank].parser.parse_many(body for _, body in emails)
+    return [to_record(_to_transaction(bank, date, body, fields))
+            for (date, body), fields in zip(emails, parsed)]
+
+
+def to_record(transaction: TransactionCreate) -> tuple:
+    return tuple(getattr(transaction, name) for name in TRANSACTION_FIELDS)
+
+
+def from_record(record: tuple) -> TransactionCreate:
+    # Already validated by the worker
+    return TransactionCreate.model_construct(**dict(zip(TRANSACTION_FIELDS, record)))
+
+
+# Sort orders of GET /transactions/ and of the per bank listings
+LISTING_SORT = [
+    SortKey(func.date(TransactionTable.date, type_=Date), descending=True),
+    SortKey(TransactionTable.business),
+    SortKey(TransactionTable.value, descending=True),
+    SortKey(TransactionTable.id),
+]
+BANK_LISTING_SORT = [SortKey(TransactionTable.value), SortKey(TransactionTable.id)]
+# Fields of the listing items and the columns they are read from, as plain
+# rows instead of ORM instances. body, the raw email, is only read on request.
+LISTING_FIELDS = {('currency' if column.key == 'currency_id' else column.key): column
+                  for column in TransactionTable.__table__.columns}
+LISTING_COLUMNS = [column for name, column in LISTING_FIELDS.items()
+                   if name != 'body']
+
+
+def listing_columns(fields: Optional[Iterable[str]] = None) -> List[Column]:
+    """
+    Columns to read for the listing `fields`, every field but body when none
+    are given. Raises ValueError for names that aren't transaction fields.
+    """
+    fields = list(dict.fromkeys(fields or []))
+    if not fields:
+        return LISTING_COLUMNS
+    unknown = [field for field in fields if field not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields {', '.join(unknown)}, pick from {', '.join(LISTING_FIELDS)}")
+    return [LISTING_FIELDS[field] for field in fields]
+
+
+def _csv_chunk(rows: List[List[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([[value.isoformat() if isinstance(value, datetime) else value for value in row]
+                      for row in rows])
+    return buffer.getvalue().encode()
+
+
+def _as_utc(date: datetime) -> datetime:
+    # Email dates may come without a timezone; those are treated as UTC
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
 
 
 class TransactionService(
@@ -54,8 +139,10 @@ class TransactionService(
 ):
     def __init__(self, db: Session, email_service: EmailReaderService, currency_service: CurrencyService):
         self.repository: TransactionRepository = TransactionRepository(db)
+        self.watermarks = SyncWatermarkRepository(db)
         self.email_service = email_service
         self.currency_service = currency_service
+        self.known_ids = get_known_transaction_ids()
 
         super().__init__(
             TransactionTable,
@@ -65,35 +152,36 @@ class TransactionService(
             self.repository,
         )
 
+    @traced
     def get_expenses(self, date_range: DateRange) -> ApiResponse[SingleResponse[dict]]:
-        data, exec_time = self.repository.get_expenses(date_range)
-        currency_names = ", ".join(data.keys())
-        suffix = f"from {date_range} in {currency_names}"
-        if not all(value is None for value in data.values()):
-            return ApiResponse(
-                meta=Meta(status=HTTPStatus.OK,
-                          message=f"Got expenses {suffix}", request_time=exec_time),
-                data=SingleResponse(item=data)
-            )
-        else:
-            return ApiResponse(meta=Meta(status=HTTPStatus.NO_CONTENT, message=f"No expenses {suffix} any currency", request_time=exec_time))
+        currencies = self.currency_service.registry.snapshot()
+        data = self.repository.get_expenses(date_range, currencies.codes)
+        return expenses_response(date_range, data, elapsed())
+
+    def _resolve_currency(self, code: str) -> Currency:
+        return self.currency_service.get_or_create(code)
+
+    @staticmethod
+    def _transaction_id(obj_in: TransactionCreate) -> str:
+        return generate_transaction_id(obj_in.bank_email, obj_in.value, obj_in.date)
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        """
+        The ones of `ids` already stored, with a single query. Ids the known
+        ids filter rules out are not looked up at all.
+        """
+        candidates = self.known_ids.candidates(ids) if self.known_ids else ids
+        if not candidates:
+            return set()
+        return self.repository.existing_ids(candidates)
 
     @override
+    @traced
     def create(
         self, obj_in: TransactionCreate
     ) -> ApiResponse[SingleResponse[Transaction]]:
-        transaction_id = generate_transaction_id(
-            obj_in.bank_email, obj_in.value, obj_in.date
-        )
-        currency_response = self.currency_service.get_by_code(obj_in.currency)
-        currency: Currency
-
-        if currency_response.meta.status == HTTPStatus.OK:
-            currency = currency_response.data.item
-        else:
-            new_currency_response = self.currency_service.create_from_code(
-                obj_in.currency)
-            currency = new_currency_response.data.item
+        transaction_id = self._transaction_id(obj_in)
+        currency = self._resolve_currency(obj_in.currency)
 
         obj_in_data = obj_in.model_dump()
         obj_in_data["id"] = transaction_id
@@ -101,87 +189,305 @@ class TransactionService(
         del obj_in_data['currency']
         db_obj = self.repository.model(**obj_in_data)
         try:
-            db_obj, elapsed_time = self.repository.create(db_obj)
+            db_obj = self.repository.create(db_obj)
         except IntegrityError:
             raise TransactionIDExistsError(transaction_id)
+        if self.known_ids:
+            self.known_ids.add([transaction_id])
 
-        # Map the currency relationship to the code
-        transaction_data = self.return_schema.model_validate(
-            {**db_obj.__dict__, "currency": db_obj.currency.code}
-        )
+        transaction_data = self._to_schema(db_obj)
 
         return ApiResponse(
             meta=Meta(
                 status=HTTPStatus.CREATED,
-                request_time=elapsed_time,
+                request_time=elapsed(),
                 message=f"Transaction created successfully {transaction_id}",
             ),
             data=SingleResponse(item=transaction_data),
         )
 
+    @traced
+    def create_many(
+        self, objs_in: List[TransactionCreate]
+    ) -> ApiResponse[SingleResponse[dict]]:
+        """
+        Write a batch of transactions with one multi-row INSERT. Currencies are
+        resolved once per distinct code and ids that were already stored (or
+        repeated inside the batch) are reported as existing instead of raising.
+        Stored ids are looked up up front, so a batch that was pulled before
+        writes nothing at all.
+        """
+        currencies: dict[str, Currency] = {}
+        rows: dict[str, dict] = {}
+        repeated_ids: List[str] = []
+        stored_ids: List[str] = []
+        ids = [self._transaction_id(obj_in) for obj_in in objs_in]
+        stored = self._existing_ids(ids)
+        for obj_in, transaction_id in zip(objs_in, ids):
+            if transaction_id in stored:
+                stored_ids.append(transaction_id)
+                continue
+            if transaction_id in rows:
+                repeated_ids.append(transaction_id)
+                continue
+            if obj_in.currency not in currencies:
+                currencies[obj_in.currency] = self._resolve_currency(
+                    obj_in.currency)
+            obj_in_data = obj_in.model_dump()
+            obj_in_data["id"] = transaction_id
+            obj_in_data['currency_id'] = currencies[obj_in.currency].id
+            del obj_in_data['currency']
+            rows[transaction_id] = obj_in_data
+
+        inserted_ids = self.repository.insert_many(list(rows.values()))
+        if self.known_ids:
+            self.known_ids.add(inserted_ids)
+        inserted = set(inserted_ids)
+        new_entries = [id for id in rows if id in inserted]
+        existing_entries = stored_ids + [
+            id for id in rows if id not in inserted] + repeated_ids
+
+        return ApiResponse(
+            meta=Meta(
+                status=HTTPStatus.CREATED if new_entries else HTTPStatus.OK,
+                request_time=elapsed(),
+                message=f"Inserted {len(new_entries)} of {
+                    len(objs_in)} transactions",
+            ),
+            data=SingleResponse(item={
+                'new_entries': new_entries,
+                'existing_entries': existing_entries
+            }),
+        )
+
+    def _sync_date_ranges(
+        self, date_range: DateRange, incremental: bool, banks: Optional[Iterable[Bank]] = None
+    ) -> Dict[Bank, DateRange]:
+        """
+        Date range to pull for every bank in `banks` (all configured banks by
+        default). In incremental mode a bank
+        with a watermark only asks for emails after it, minus a small overlap
+        window to pick up mail that arrived late.
+        """
+        bank_ranges: Dict[Bank, DateRange] = {}
+        for bank in (banks or bank_config.keys()):
+            bank_ranges[bank] = date_range
+            if not incremental:
+                continue
+            watermark = self.watermarks.get_last_email_date(
+                bank.name, config.MAILBOX)
+            if watermark:
+                bank_ranges[bank] = DateRange(
+                    start_date=watermark -
+                    timedelta(minutes=config.SYNC_OVERLAP_MINUTES),
+                    end_date=date_range.end_date
+                )
+        return bank_ranges
+
+    def _stream_email_pages(
+        self,
+        cursor: CursorModel,
+        bank_ranges: Dict[Bank, DateRange],
+    ) -> Iterator[FetchedPage]:
+        """
+        Yield the pages of every bank in `bank_ranges` using the engine selected
+        by EMAIL_FETCH_ENGINE. The first page of each bank is flagged so its
+        status and pagination can be inspected, and pages that could not be
+        fetched come with `response=None`.
+        """
+        if config.EMAIL_FETCH_ENGINE == 'asyncio':
+            yield from self.email_service.stream_pages_from_banks(
+                bank_ranges, config.MAILBOX, cursor.page, cursor.page_size,
+                buffer_size=config.INGEST_QUEUE_SIZE)
+            return
+
+        for bank, date_range in bank_ranges.items():
+            def fetch_func(page: int, bank: Bank = bank, date_range: DateRange = date_range) -> EmailPage:
+                return self.email_service.fetch_emails_page_from_bank(
+                    bank=bank,
+                    mailbox=config.MAILBOX,
+                    date_range=date_range,
+                    page_size=cursor.page_size,
+                    page=page
+                )
+            emails = fetch_func(cursor.page)
+            yield FetchedPage(bank, cursor.page, emails, is_first=True)
+            if emails.meta.status == HTTPStatus.OK and emails.data and emails.data.pagination.total_items:
+                pagination_metadata = emails.data.pagination
+                paginator = ThreadedPaginator[EmailPage](
+                    logger=getLogger(bank.name.upper()+'_ThreadPool'),
+                    pagination_details=PaginationDetails(
+                        page_size=pagination_metadata.page_size,
+                        total_items=pagination_metadata.total_items
+                    ),
+                    process_function=fetch_func,
+                    thread_count=config.EMAIL_PROCESSING_THREADS,
+                    first_result=emails,
+                    first_page=cursor.page,
+                    max_retries=config.EMAIL_FETCH_RETRIES,
+                    backoff=config.EMAIL_FETCH_BACKOFF
+                )
+                for page, response, _ in paginator.stream():
+                    yield FetchedPage(bank, page, response)
+
+    @staticmethod
+    def _parse_page(fetched: FetchedPage) -> Tuple[FetchedPage, List[TransactionCreate]]:
+        response = fetched.response
+        if not response or response.meta.status != HTTPStatus.OK or not response.data:
+            return fetched, []
+        transactions = parse_many(response.data.items, fetched.bank)
+        return fetched, transactions
+
+    @staticmethod
+    def _page_parse_jobs(fetched: FetchedPage) -> List[Tuple[Bank, List[Tuple[Optional[datetime], Optional[str]]]]]:
+        response = fetched.response
+        if not response or response.meta.status != HTTPStatus.OK or not response.data:
+            return []
+        emails = [(email.date, email.body) for email in response.data.items]
+        size = config.PARSE_BATCH_SIZE
+        return [(fetched.bank, emails[i:i + size]) for i in range(0, len(emails), size)]
+
+    @staticmethod
+    def _join_parsed_page(fetched: FetchedPage, batches: List[List[tuple]]) -> Tuple[FetchedPage, List[TransactionCreate]]:
+        return fetched, [from_record(record) for batch in batches for record in batch]
+
+    def _parse_stage(self, pages: Iterable[FetchedPage]) -> Iterable[Tuple[FetchedPage, List[TransactionCreate]]]:
+        """
+        Parse stage of the pull pipeline. With PARSE_PROCESSES the pages are
+        split into batches of PARSE_BATCH_SIZE emails for the parse workers,
+        otherwise they are parsed on a stage thread.
+        """
+        if config.PARSE_PROCESSES:
+            return ProcessPoolStage(
+                pages,
+                parse_records,
+                get_parse_pool(),
+                split=self._page_parse_jobs,
+                join=self._join_parsed_page,
+                max_in_flight=2 * config.PARSE_PROCESSES,
+                buffer_size=config.INGEST_QUEUE_SIZE,
+                name='parse'
+            )
+        return ThreadedStage(
+            pages,
+            self._parse_page,
+            buffer_size=config.INGEST_QUEUE_SIZE,
+            name='parse'
+        )
+
+    @traced
     def pull_transactions_from_email(
         self,
         cursor: CursorModel,
         date_range: DateRange,
+        bulk: bool = True,
+        incremental: bool = False,
+        banks: Optional[Iterable[Bank]] = None,
     ) -> ApiResponse:
+        """
+        Pull the bank emails in `date_range` into the database, for `banks` or
+        every configured bank.
+
+        With `incremental`, banks that already have a sync watermark only fetch
+        the emails after it. Once every page of a bank has been written its
+        watermark is moved to the newest email date seen, as long as the pull
+        started at the first page.
+
+        Runs as a bounded pipeline: pages are fetched on the email engine,
+        parsed on a stage thread and written here in batches, so database writes
+        overlap network fetches and at most INGEST_QUEUE_SIZE pages are held
+        between two stages at any time.
+        """
         existing_entries = []
-        paginators: List[Tuple[ThreadedPaginator, Bank]] = []
         response_messages: List[str] = []
         empty_responses = 0
+        total_found = 0
         new_entries = []
-        for bank in bank_config.keys():
-            def fetch_func(page=cursor.page): return self.email_service.fetch_emails_page_from_bank(
-                bank=bank,
-                mailbox=config.MAILBOX,
-                date_range=date_range,
-                page_size=cursor.page_size,
-                page=page
-            )
-            emails: ApiResponse[PaginatedResponse[EmailMessageModel]] = fetch_func(
-                page=cursor.page)
-            response_messages.append(emails.meta.message)
-            match emails.meta.status:
-                case HTTPStatus.OK:
-                    if emails.data:
-                        pagination_metadata = emails.data.pagination
-                        paginator = ThreadedPaginator[ApiResponse[PaginatedResponse[EmailMessageModel]]](
-                            logger=getLogger(bank.name.upper()+'_ThreadPool'),
-                            pagination_details=PaginationDetails(
-                                page_size=pagination_metadata.page_size,
-                                total_items=pagination_metadata.total_items
-                            ),
-                            process_function=fetch_func,
-                            thread_count=config.EMAIL_PROCESSING_THREADS,
-                            first_result=emails
-                        )
-                        paginators.append((paginator, bank))
-                case HTTPStatus.PARTIAL_CONTENT:
-                    self.logger.warning(emails.meta.message)
-                    empty_responses += 1
-
-        exec_time = 0.0
-        for p, bank in paginators:
-            pagination_result = p()
-            bank_api_responses: List[ApiResponse[PaginatedResponse[EmailMessageModel]]
-                                     ] = pagination_result[0]
-            thread_pool_exec_time: float = pagination_result[1]
-            exec_time += thread_pool_exec_time
-            for api_response in bank_api_responses:
-                if api_response:
-                    for email in api_response.data.items:
-                        transaction = parse_email_to_transaction(
-                            email, bank)
-                        try:
-                            response = self.create(transaction)
-                            if response.data:
-                                new_entries.append(response.data.item.id)
-                        except TransactionIDExistsError as e:
-                            existing_entries.append(e.transaction_id)
-                            response_messages.append(*e.args)
-                        except Exception as e:
-                            self.logger.exception(e)
-
-        if empty_responses == len(bank_config.keys()):
+        pending: List[TransactionCreate] = []
+        bank_ranges = self._sync_date_ranges(date_range, incremental, banks)
+        newest_dates: Dict[Bank, datetime] = {}
+        incomplete_banks: Set[Bank] = set()
+        if cursor.page != 1:
+            # Only a pull that starts at the first page moves the watermarks, like the scheduled ones
+            incomplete_banks.update(bank_ranges)
+
+        def flush():
+            if not pending:
+                return
+            response = self.create_many(pending)
+            new_entries.extend(response.data.item['new_entries'])
+            for transaction_id in response.data.item['existing_entries']:
+                existing_entries.append(transaction_id)
+                response_messages.append(
+                    *TransactionIDExistsError(transaction_id).args)
+            pending.clear()
+
+        @traced(name='pull_pipeline')
+        def run_pipeline():
+            nonlocal empty_responses, total_found
+            parsed_pages = self._parse_stage(
+                self._stream_email_pages(cursor, bank_ranges))
+            for fetched, transactions in parsed_pages:
+                if not fetched.is_first and (not fetched.response or fetched.response.meta.status != HTTPStatus.OK):
+                    # Its emails are missing, so the bank's watermark must stay behind them
+                    incomplete_banks.add(fetched.bank)
+                    response_messages.append(
+                        f"Page {fetched.page} of {fetched.bank.name} could not be fetched, its emails were not pulled")
+                for transaction in transactions:
+                    email_date = _as_utc(transaction.date)
+                    if fetched.bank not in newest_dates or email_date > newest_dates[fetched.bank]:
+                        newest_dates[fetched.bank] = email_date
+                if fetched.is_first:
+                    emails = fetched.response
+                    response_messages.append(emails.meta.message)
+                    match emails.meta.status:
+                        case HTTPStatus.OK:
+                            if emails.data:
+                                total_found += emails.data.pagination.total_items
+                        case HTTPStatus.PARTIAL_CONTENT:
+                            self.logger.warning(emails.meta.message)
+                            empty_responses += 1
+                stored = set() if bulk else self._existing_ids(
+                    [self._transaction_id(transaction) for transaction in transactions])
+                for transaction in transactions:
+                    if bulk:
+                        pending.append(transaction)
+                        if config.INGEST_BATCH_SIZE and len(pending) >= config.INGEST_BATCH_SIZE:
+                            flush()
+                        continue
+                    transaction_id = self._transaction_id(transaction)
+                    if transaction_id in stored:
+                        existing_entries.append(transaction_id)
+                        response_messages.append(
+                            *TransactionIDExistsError(transaction_id).args)
+                        continue
+                    try:
+                        response = self.create(transaction)
+                        if response.data:
+                            new_entries.append(response.data.item.id)
+                    except TransactionIDExistsError as e:
+                        existing_entries.append(e.transaction_id)
+                        response_messages.append(*e.args)
+                    except Exception as e:
+                        self.logger.exception(e)
+                        incomplete_banks.add(fetched.bank)
+                        response_messages.append(
+                            f"Transaction {transaction_id} of {fetched.bank.name} could not be stored: {e}")
+                if bulk and not config.INGEST_BATCH_SIZE:
+                    flush()
+            flush()
+
+        try:
+            run_pipeline()
+        finally:
+            # Batches are committed as they go, so even a failed pull may have
+            # written rows that the cached responses don't have
+            if new_entries:
+                bump_ingest_generation()
+        watermarks = self._advance_watermarks(
+            bank_ranges, newest_dates, incomplete_banks)
+
+        if empty_responses == len(bank_ranges):
             return ApiResponse(meta=Meta(
                 status=HTTPStatus.PARTIAL_CONTENT,
                 message=response_messages,
@@ -190,79 +496,152 @@ class TransactionService(
         return ApiResponse(meta=Meta(
             status=HTTPStatus.OK,
             message=response_messages,
-            request_time=exec_time
+            request_time=elapsed()
         ), data={
-            'total_found': sum([p[0].total_items for p in paginators]),
+            'total_found': total_found,
             'new_entries': new_entries,
-            'existing_entries': existing_entries
+            'existing_entries': existing_entries,
+            'watermarks': watermarks
         })
 
-    def get_paginated_from_bank(self, cursor: CursorModel, bank: Bank, date_range: Optional[DateRange] = None) -> ApiResponse[PaginatedResponse[Transaction]]:
-        whereclause = TransactionTable.bank_name == bank.name
-        if date_range:
-            whereclause = and_(
-                whereclause, date_range.contains(TransactionTable.date))
-        return self.get_paginated(cursor, whereclause, order_by=TransactionTable.value)
+    def _advance_watermarks(
+        self,
+        bank_ranges: Dict[Bank, DateRange],
+        newest_dates: Dict[Bank, datetime],
+        incomplete_banks: Set[Bank],
+    ) -> Dict[str, Optional[datetime]]:
+        """
+        Move each bank's watermark to the newest email written for it. A bank is
+        skipped when any of its pages or transactions failed, or when the pulled range starts
+        after the current watermark, since either would leave a gap behind it.
+        """
+        watermarks: Dict[str, Optional[datetime]] = {}
+        for bank, date_range in bank_ranges.items():
+            current = self.watermarks.get_last_email_date(
+                bank.name, config.MAILBOX)
+            watermarks[bank.name] = current
+            newest = newest_dates.get(bank)
+            if not newest or bank in incomplete_banks:
+                continue
+            if current and date_range.start_date and \
+                    _as_utc(date_range.start_date) > _as_utc(current):
+                self.logger.info(
+                    f"Not advancing the {bank.name} watermark, {date_range} starts after it")
+                continue
+            watermarks[bank.name] = self.watermarks.advance(
+                bank.name, config.MAILBOX, newest)
+        return watermarks
+
+    @override
+    def _to_schema(self, db_obj: TransactionTable) -> Transaction:
+        return transaction_schema(self.currency_service.registry, db_obj)
+
+    @override
+    def _row_to_item(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return transaction_item(self.currency_service.registry, row)
+
+    def get_paginated_from_bank(self, cursor: CursorModel, bank: Bank, date_range: Optional[DateRange] = None,
+                                count_mode: Optional[CountMode] = None,
+                                columns: Optional[List[Column]] = None) -> ApiResponse[PaginatedResponse[Transaction]]:
+        return self.get_paginated(cursor, bank_filter(bank, date_range), sort=BANK_LISTING_SORT, count_mode=count_mode,
+                                  columns=columns or LISTING_COLUMNS)
+
+    def export(
+        self, date_range: DateRange, bank: Optional[Bank], currency: Optional[Currency],
+        columns: List[Column], export_format: ExportFormat
+    ) -> Iterator[bytes]:
+        """
+        The transactions matching the filters as CSV or NDJSON chunks, oldest
+        first, for a StreamingResponse.
+
+        The rows are read through a server side cursor EXPORT_BATCH_SIZE at a
+        time and every batch is encoded into one chunk, so memory stays flat.
+        It runs on its own session: the request's is closed before the
+        response body is sent.
+        """
+        filters = [clause for clause in (
+            date_range.contains(TransactionTable.date),
+            TransactionTable.bank_name == bank.name if bank else None,
+            TransactionTable.currency_id == currency.id if currency else None,
+        ) if clause is not None]
+        keys = [column.key for column in columns]
+        fields = ['currency' if key == 'currency_id' else key for key in keys]
+
+        session = SessionLocal()
+        try:
+            repository = TransactionRepository(session)
+            if export_format == ExportFormat.CSV:
+                yield _csv_chunk([fields])
+            for rows in repository.stream_rows(
+                    columns, and_(*filters) if filters else None,
+                    [TransactionTable.date, TransactionTable.id], config.EXPORT_BATCH_SIZE):
+                items = [self._row_to_item(dict(zip(keys, row))) for row in rows]
+                if export_format == ExportFormat.CSV:
+                    yield _csv_chunk([[item[field] for field in fields] for item in items])
+                else:
+                    yield b''.join(to_json(item) + b'\n' for item in items)
+        finally:
+            session.close()
 
+    @traced
     def get_metrics_by_period(self, date_range: DateRange, period: TimePeriod, currency: Currency) -> ApiResponse[SingleResponse[TransactionMetricsByPeriodResult]]:
-        elapsed_time = 0
-        data = None
-        meta = None
         try:
-            response, elapsed_time = self.repository.get_metrics_by_period(
+            response = self.repository.get_metrics_by_period(
                 date_range, period, currency)
-            meta = Meta(
-                status=HTTPStatus.OK,
-                message=f'Got metrics grouped by {
-                    period.name} from {date_range}',
-                request_time=elapsed_time
-            )
-            data = SingleResponse(item=response)
         except DivisionByZero:
-            meta = Meta(
-                status=HTTPStatus.NOT_ACCEPTABLE,
-                message=f"Can't get metrics because there were no transactions in {
-                    currency.name} from {date_range}",
-                elapsed_time=0
-            )
+            return no_metrics_response(date_range, currency)
+        return metrics_response(date_range, period, response, elapsed())
+
+
+def transaction_schema(registry: CurrencyRegistry, db_obj: TransactionTable) -> Transaction:
+    # Map currency_id to the code from the registry instead of joining currencies
+    return Transaction.model_validate(
+        {**db_obj.__dict__, "currency": registry.code_for(db_obj.currency_id)})
+
 
-        return ApiResponse(meta=meta, data=data)
-
-    def get_paginated(self, cursor: CursorModel, filter: Optional[ColumnElement] = None,
-                      order_by: Optional[Union[ColumnElement,
-                                               list[ColumnElement]]] = None
-                      ) -> ApiResponse[PaginatedResponse[Transaction]]:
-        current_page = cursor.page
-        page_size = cursor.page_size
-
-        total_items, count_elapsed_time = self.repository.count(filter)
-        offset = (current_page - 1) * page_size
-        db_objs, paginated_elapsed_time = self.repository.get_paginated(
-            offset, page_size, filter, order_by)
-
-        total_pages = (total_items + page_size - 1) // page_size
-        request_time = count_elapsed_time + paginated_elapsed_time
-
-        next_cursor = CursorModel(
-            page=current_page + 1, page_size=page_size).encode() if current_page < total_pages else None
-        prev_cursor = CursorModel(
-            page=current_page - 1, page_size=page_size).encode() if current_page > 1 else None
-
-        # Map the currency relationship to the code
-        items = [self.return_schema.model_validate(
-            {**obj.__dict__, "currency": obj.currency.code}) for obj in db_objs]
-
-        meta = Meta(status=HTTPStatus.OK, request_time=request_time,
-                    message="Transactions retrieved successfully")
-        pagination = PaginationMeta(
-            total_items=total_items,
-            total_pages=total_pages,
-            page_size=page_size,
-            page=current_page,
-            next_cursor=next_cursor,
-            prev_cursor=prev_cursor
+def transaction_item(registry: CurrencyRegistry, row: Dict[str, Any]) -> Dict[str, Any]:
+    if 'currency_id' in row:
+        row['currency'] = registry.code_for(row.pop('currency_id'))
+    return row
+
+
+def bank_filter(bank: Bank, date_range: Optional[DateRange]) -> ColumnElement:
+    whereclause = TransactionTable.bank_name == bank.name
+    if date_range:
+        whereclause = and_(
+            whereclause, date_range.contains(TransactionTable.date))
+    return whereclause
+
+
+def expenses_response(date_range: DateRange, data: dict, exec_time: float) -> ApiResponse[SingleResponse[dict]]:
+    currency_names = ", ".join(data.keys())
+    suffix = f"from {date_range} in {currency_names}"
+    if not all(value is None for value in data.values()):
+        return ApiResponse(
+            meta=Meta(status=HTTPStatus.OK,
+                      message=f"Got expenses {suffix}", request_time=exec_time),
+            data=SingleResponse(item=data)
         )
+    else:
+        return ApiResponse(meta=Meta(status=HTTPStatus.NO_CONTENT, message=f"No expenses {suffix} any currency", request_time=exec_time))
 
-        response = ApiResponse(meta=meta, data=PaginatedResponse(
-            pagination=pagination, items=items))
-        return response
+
+def metrics_response(
+    date_range: DateRange, period: TimePeriod, metrics: List[TransactionMetricsByPeriodResult], elapsed_time: float
+) -> ApiResponse[SingleResponse[List[TransactionMetricsByPeriodResult]]]:
+    meta = Meta(
+        status=HTTPStatus.OK,
+        message=f'Got metrics grouped by {period.name} from {date_range}',
+        request_time=elapsed_time
+    )
+    return ApiResponse(meta=meta, data=SingleResponse(item=metrics))
+
+
+def no_metrics_response(date_range: DateRange, currency: Currency) -> ApiResponse:
+    meta = Meta(
+        status=HTTPStatus.NOT_ACCEPTABLE,
+        message=f"Can't get metrics because there were no transactions in {
+            currency.code} from {date_range}",
+        elapsed_time=0
+    )
+    return ApiResponse(meta=meta, data=None)
@@ -1,5 +1,6 @@
 from .cache import LRUCache
-from .decorators import catch_standard_errors, timed_operation
+from .decorators import catch_standard_errors
+from .tracing import span, traced
 from .logging import configure_root_logger
-from .response import create_exception_response, create_json_response
+from .response import create_exception_response, create_json_response, create_raw_json_response
 from .hashing import hash_any, hash_pagination_meta
@@ -1,4 +1,8 @@
-from typing import Generic, Optional, OrderedDict, TypeVar
+import threading
+import time
+from typing import Dict, Generic, Optional, OrderedDict, Tuple, TypeVar
+
+from ..config.app_settings import config
 
 T = TypeVar('T')
 
@@ -7,16 +11,67 @@ class LRUCache(Generic[T]):
     def __init__(self, capacity: int):
         self.cache: OrderedDict[str, T] = OrderedDict()
         self.capacity = capacity
+        # Shared by the request threads, and OrderedDict moves aren't atomic
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> Optional[T]:
-        if key in self.cache:
-            self.cache.move_to_end(key)
-            return self.cache[key]
-        return None
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            return None
 
     def put(self, key: str, value: T) -> None:
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        self.cache[key] = value
-        if len(self.cache) > self.capacity:
-            self.cache.popitem(last=False)
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            self.cache[key] = value
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+
+
+class CountCache:
+    """
+    Row counts keyed by table and filter.
+
+    Every write to a table bumps its generation, which drops the counts cached
+    for it. Entries also expire after `ttl` seconds, so writes made by other
+    worker processes show up eventually.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self._counts: LRUCache[Tuple[int, float, int]] = LRUCache(capacity)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.ttl = ttl
+
+    def generation(self, table: str) -> int:
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def get(self, table: str, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(f'{table}:{key}')
+            if entry is None:
+                return None
+            generation, stored_at, count = entry
+            if generation != self._generations.get(table, 0) or time.monotonic() - stored_at > self.ttl:
+                return None
+            return count
+
+    def put(self, table: str, key: str, generation: int, count: int) -> None:
+        """Store a count computed while `table` was at `generation`."""
+        with self._lock:
+            self._counts.put(f'{table}:{key}',
+                             (generation, time.monotonic(), count))
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+
+count_cache = CountCache(config.COUNT_CACHE_CAPACITY, config.COUNT_CACHE_TTL)
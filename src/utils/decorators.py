@@ -1,8 +1,6 @@
 import logging
-import time
 from functools import wraps
 from http import HTTPStatus
-from typing import Callable, Tuple, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
@@ -12,20 +10,6 @@ from ..schemas import ApiResponse, Meta
 
 logger = logging.getLogger(__name__)
 
-T = TypeVar('T')
-
-
-def timed_operation(func: Callable[..., T]) -> Callable[..., T]:
-    @wraps(func)
-    def wrapper(*args, **kwargs) -> Tuple[T, float]:
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        logger.debug(f"{func.__name__} took {elapsed_time:.4f} seconds")
-        return result, elapsed_time
-    return wrapper
-
 
 def catch_standard_errors(func):
     @wraps(func)
@@ -14,13 +14,3 @@ def generate_dynamic_enum(session: Session, table: type, column: str) -> Enum:
 def validate_enum_value(value: str, enum: Enum):
     if value not in enum.__members__:
         raise ValueError(f"Invalid value '{value}' for enum '{enum.__name__}'")
-
-
-def remap_currency_codes(code: str) -> str:
-    match code:
-        case "ARP":
-            return "ARS"
-        case "MXP":
-            return "MXN"
-        case _:
-            return code
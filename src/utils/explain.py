@@ -0,0 +1,26 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN` of a SQLAlchemy statement, rendered with the statement's own
+    bound parameters, e.g. `db.execute(Explain(select(...))).scalar()`.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False, buffers: bool = False, format: str = 'JSON'):
+        self.statement = statement
+        self.analyze = analyze
+        self.buffers = buffers
+        self.format = format
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    options = [f'FORMAT {element.format}']
+    if element.analyze:
+        options.insert(0, 'ANALYZE')
+    if element.buffers:
+        options.insert(1, 'BUFFERS')
+    return f"EXPLAIN ({', '.join(options)}) {compiler.process(element.statement, **kw)}"
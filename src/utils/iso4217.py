@@ -0,0 +1,205 @@
+"""
+Bundled ISO-4217 currency metadata, so currencies can be registered offline.
+
+The table is compiled into dicts at import, every lookup is a single dict
+access. Superseded codes, which some statements still print, are mapped to
+their current code through `ALIASES`.
+"""
+from typing import Dict, NamedTuple, Optional
+
+
+class CurrencyInfo(NamedTuple):
+    code: str
+    name: str
+    symbol: str
+    # Country or territory the currency is primarily used in
+    region: str
+
+
+# code, name, symbol, primary region
+_CURRENCIES = (
+    ('AED', 'United Arab Emirates dirham', 'د.إ', 'United Arab Emirates'),
+    ('AFN', 'Afghan afghani', '؋', 'Afghanistan'),
+    ('ALL', 'Albanian lek', 'L', 'Albania'),
+    ('AMD', 'Armenian dram', '֏', 'Armenia'),
+    ('ANG', 'Netherlands Antillean guilder', 'ƒ', 'Curaçao'),
+    ('AOA', 'Angolan kwanza', 'Kz', 'Angola'),
+    ('ARS', 'Argentine peso', '$', 'Argentina'),
+    ('AUD', 'Australian dollar', '$', 'Australia'),
+    ('AWG', 'Aruban florin', 'ƒ', 'Aruba'),
+    ('AZN', 'Azerbaijani manat', '₼', 'Azerbaijan'),
+    ('BAM', 'Bosnia and Herzegovina convertible mark', 'KM', 'Bosnia and Herzegovina'),
+    ('BBD', 'Barbadian dollar', '$', 'Barbados'),
+    ('BDT', 'Bangladeshi taka', '৳', 'Bangladesh'),
+    ('BGN', 'Bulgarian lev', 'лв', 'Bulgaria'),
+    ('BHD', 'Bahraini dinar', '.د.ب', 'Bahrain'),
+    ('BIF', 'Burundian franc', 'Fr', 'Burundi'),
+    ('BMD', 'Bermudian dollar', '$', 'Bermuda'),
+    ('BND', 'Brunei dollar', '$', 'Brunei'),
+    ('BOB', 'Bolivian boliviano', 'Bs.', 'Bolivia'),
+    ('BRL', 'Brazilian real', 'R$', 'Brazil'),
+    ('BSD', 'Bahamian dollar', '$', 'Bahamas'),
+    ('BTN', 'Bhutanese ngultrum', 'Nu.', 'Bhutan'),
+    ('BWP', 'Botswana pula', 'P', 'Botswana'),
+    ('BYN', 'Belarusian ruble', 'Br', 'Belarus'),
+    ('BZD', 'Belize dollar', '$', 'Belize'),
+    ('CAD', 'Canadian dollar', '$', 'Canada'),
+    ('CDF', 'Congolese franc', 'FC', 'DR Congo'),
+    ('CHF', 'Swiss franc', 'Fr.', 'Switzerland'),
+    ('CLP', 'Chilean peso', '$', 'Chile'),
+    ('CNY', 'Chinese yuan', '¥', 'China'),
+    ('COP', 'Colombian peso', '$', 'Colombia'),
+    ('CRC', 'Costa Rican colón', '₡', 'Costa Rica'),
+    ('CUP', 'Cuban peso', '$', 'Cuba'),
+    ('CVE', 'Cape Verdean escudo', '$', 'Cape Verde'),
+    ('CZK', 'Czech koruna', 'Kč', 'Czechia'),
+    ('DJF', 'Djiboutian franc', 'Fr', 'Djibouti'),
+    ('DKK', 'Danish krone', 'kr', 'Denmark'),
+    ('DOP', 'Dominican peso', '$', 'Dominican Republic'),
+    ('DZD', 'Algerian dinar', 'د.ج', 'Algeria'),
+    ('EGP', 'Egyptian pound', '£', 'Egypt'),
+    ('ERN', 'Eritrean nakfa', 'Nfk', 'Eritrea'),
+    ('ETB', 'Ethiopian birr', 'Br', 'Ethiopia'),
+    ('EUR', 'Euro', '€', 'European Union'),
+    ('FJD', 'Fijian dollar', '$', 'Fiji'),
+    ('FKP', 'Falkland Islands pound', '£', 'Falkland Islands'),
+    ('GBP', 'British pound', '£', 'United Kingdom'),
+    ('GEL', 'Georgian lari', '₾', 'Georgia'),
+    ('GHS', 'Ghanaian cedi', '₵', 'Ghana'),
+    ('GIP', 'Gibraltar pound', '£', 'Gibraltar'),
+    ('GMD', 'Gambian dalasi', 'D', 'Gambia'),
+    ('GNF', 'Guinean franc', 'Fr', 'Guinea'),
+    ('GTQ', 'Guatemalan quetzal', 'Q', 'Guatemala'),
+    ('GYD', 'Guyanese dollar', '$', 'Guyana'),
+    ('HKD', 'Hong Kong dollar', '$', 'Hong Kong'),
+    ('HNL', 'Honduran lempira', 'L', 'Honduras'),
+    ('HTG', 'Haitian gourde', 'G', 'Haiti'),
+    ('HUF', 'Hungarian forint', 'Ft', 'Hungary'),
+    ('IDR', 'Indonesian rupiah', 'Rp', 'Indonesia'),
+    ('ILS', 'Israeli new shekel', '₪', 'Israel'),
+    ('INR', 'Indian rupee', '₹', 'India'),
+    ('IQD', 'Iraqi dinar', 'ع.د', 'Iraq'),
+    ('IRR', 'Iranian rial', '﷼', 'Iran'),
+    ('ISK', 'Icelandic króna', 'kr', 'Iceland'),
+    ('JMD', 'Jamaican dollar', '$', 'Jamaica'),
+    ('JOD', 'Jordanian dinar', 'د.ا', 'Jordan'),
+    ('JPY', 'Japanese yen', '¥', 'Japan'),
+    ('KES', 'Kenyan shilling', 'Sh', 'Kenya'),
+    ('KGS', 'Kyrgyzstani som', 'с', 'Kyrgyzstan'),
+    ('KHR', 'Cambodian riel', '៛', 'Cambodia'),
+    ('KMF', 'Comorian franc', 'Fr', 'Comoros'),
+    ('KPW', 'North Korean won', '₩', 'North Korea'),
+    ('KRW', 'South Korean won', '₩', 'South Korea'),
+    ('KWD', 'Kuwaiti dinar', 'د.ك', 'Kuwait'),
+    ('KYD', 'Cayman Islands dollar', '$', 'Cayman Islands'),
+    ('KZT', 'Kazakhstani tenge', '₸', 'Kazakhstan'),
+    ('LAK', 'Lao kip', '₭', 'Laos'),
+    ('LBP', 'Lebanese pound', 'ل.ل', 'Lebanon'),
+    ('LKR', 'Sri Lankan rupee', 'Rs', 'Sri Lanka'),
+    ('LRD', 'Liberian dollar', '$', 'Liberia'),
+    ('LSL', 'Lesotho loti', 'L', 'Lesotho'),
+    ('LYD', 'Libyan dinar', 'ل.د', 'Libya'),
+    ('MAD', 'Moroccan dirham', 'د.م.', 'Morocco'),
+    ('MDL', 'Moldovan leu', 'L', 'Moldova'),
+    ('MGA', 'Malagasy ariary', 'Ar', 'Madagascar'),
+    ('MKD', 'Macedonian denar', 'ден', 'North Macedonia'),
+    ('MMK', 'Burmese kyat', 'Ks', 'Myanmar'),
+    ('MNT', 'Mongolian tögrög', '₮', 'Mongolia'),
+    ('MOP', 'Macanese pataca', 'P', 'Macau'),
+    ('MRU', 'Mauritanian ouguiya', 'UM', 'Mauritania'),
+    ('MUR', 'Mauritian rupee', '₨', 'Mauritius'),
+    ('MVR', 'Maldivian rufiyaa', '.ރ', 'Maldives'),
+    ('MWK', 'Malawian kwacha', 'MK', 'Malawi'),
+    ('MXN', 'Mexican peso', '$', 'Mexico'),
+    ('MYR', 'Malaysian ringgit', 'RM', 'Malaysia'),
+    ('MZN', 'Mozambican metical', 'MT', 'Mozambique'),
+    ('NAD', 'Namibian dollar', '$', 'Namibia'),
+    ('NGN', 'Nigerian naira', '₦', 'Nigeria'),
+    ('NIO', 'Nicaraguan córdoba', 'C$', 'Nicaragua'),
+    ('NOK', 'Norwegian krone', 'kr', 'Norway'),
+    ('NPR', 'Nepalese rupee', '₨', 'Nepal'),
+    ('NZD', 'New Zealand dollar', '$', 'New Zealand'),
+    ('OMR', 'Omani rial', 'ر.ع.', 'Oman'),
+    ('PAB', 'Panamanian balboa', 'B/.', 'Panama'),
+    ('PEN', 'Peruvian sol', 'S/.', 'Peru'),
+    ('PGK', 'Papua New Guinean kina', 'K', 'Papua New Guinea'),
+    ('PHP', 'Philippine peso', '₱', 'Philippines'),
+    ('PKR', 'Pakistani rupee', '₨', 'Pakistan'),
+    ('PLN', 'Polish złoty', 'zł', 'Poland'),
+    ('PYG', 'Paraguayan guaraní', '₲', 'Paraguay'),
+    ('QAR', 'Qatari riyal', 'ر.ق', 'Qatar'),
+    ('RON', 'Romanian leu', 'lei', 'Romania'),
+    ('RSD', 'Serbian dinar', 'дин.', 'Serbia'),
+    ('RUB', 'Russian ruble', '₽', 'Russia'),
+    ('RWF', 'Rwandan franc', 'Fr', 'Rwanda'),
+    ('SAR', 'Saudi riyal', 'ر.س', 'Saudi Arabia'),
+    ('SBD', 'Solomon Islands dollar', '$', 'Solomon Islands'),
+    ('SCR', 'Seychellois rupee', '₨', 'Seychelles'),
+    ('SDG', 'Sudanese pound', 'ج.س.', 'Sudan'),
+    ('SEK', 'Swedish krona', 'kr', 'Sweden'),
+    ('SGD', 'Singapore dollar', '$', 'Singapore'),
+    ('SHP', 'Saint Helena pound', '£', 'Saint Helena'),
+    ('SLE', 'Sierra Leonean leone', 'Le', 'Sierra Leone'),
+    ('SOS', 'Somali shilling', 'Sh', 'Somalia'),
+    ('SRD', 'Surinamese dollar', '$', 'Suriname'),
+    ('SSP', 'South Sudanese pound', '£', 'South Sudan'),
+    ('STN', 'São Tomé and Príncipe dobra', 'Db', 'São Tomé and Príncipe'),
+    ('SVC', 'Salvadoran colón', '₡', 'El Salvador'),
+    ('SYP', 'Syrian pound', '£', 'Syria'),
+    ('SZL', 'Swazi lilangeni', 'L', 'Eswatini'),
+    ('THB', 'Thai baht', '฿', 'Thailand'),
+    ('TJS', 'Tajikistani somoni', 'ЅМ', 'Tajikistan'),
+    ('TMT', 'Turkmenistan manat', 'm', 'Turkmenistan'),
+    ('TND', 'Tunisian dinar', 'د.ت', 'Tunisia'),
+    ('TOP', 'Tongan paʻanga', 'T$', 'Tonga'),
+    ('TRY', 'Turkish lira', '₺', 'Turkey'),
+    ('TTD', 'Trinidad and Tobago dollar', '$', 'Trinidad and Tobago'),
+    ('TWD', 'New Taiwan dollar', '$', 'Taiwan'),
+    ('TZS', 'Tanzanian shilling', 'Sh', 'Tanzania'),
+    ('UAH', 'Ukrainian hryvnia', '₴', 'Ukraine'),
+    ('UGX', 'Ugandan shilling', 'Sh', 'Uganda'),
+    ('USD', 'United States dollar', '$', 'United States'),
+    ('UYU', 'Uruguayan peso', '$', 'Uruguay'),
+    ('UZS', "Uzbekistani so'm", 'сўм', 'Uzbekistan'),
+    ('VES', 'Venezuelan bolívar soberano', 'Bs.S.', 'Venezuela'),
+    ('VND', 'Vietnamese đồng', '₫', 'Vietnam'),
+    ('VUV', 'Vanuatu vatu', 'Vt', 'Vanuatu'),
+    ('WST', 'Samoan tālā', 'T', 'Samoa'),
+    ('XAF', 'Central African CFA franc', 'Fr', 'Cameroon'),
+    ('XCD', 'Eastern Caribbean dollar', '$', 'Saint Lucia'),
+    ('XOF', 'West African CFA franc', 'Fr', 'Senegal'),
+    ('XPF', 'CFP franc', '₣', 'French Polynesia'),
+    ('YER', 'Yemeni rial', '﷼', 'Yemen'),
+    ('ZAR', 'South African rand', 'R', 'South Africa'),
+    ('ZMW', 'Zambian kwacha', 'ZK', 'Zambia'),
+    ('ZWL', 'Zimbabwean dollar', '$', 'Zimbabwe'),
+)
+
+# Superseded or non-standard code -> current ISO-4217 code
+ALIASES: Dict[str, str] = {
+    'ARP': 'ARS',
+    'MXP': 'MXN',
+    'BYR': 'BYN',
+    'GHC': 'GHS',
+    'MRO': 'MRU',
+    'RUR': 'RUB',
+    'SLL': 'SLE',
+    'STD': 'STN',
+    'TRL': 'TRY',
+    'VEF': 'VES',
+    'ZMK': 'ZMW',
+    'ROL': 'RON',
+}
+
+CURRENCIES: Dict[str, CurrencyInfo] = {
+    row[0]: CurrencyInfo(*row) for row in _CURRENCIES}
+
+
+def canonical_code(code: str) -> str:
+    """The current ISO-4217 code for `code`, unchanged when it isn't a known alias."""
+    code = code.strip().upper()
+    return ALIASES.get(code, code)
+
+
+def lookup(code: str) -> Optional[CurrencyInfo]:
+    return CURRENCIES.get(canonical_code(code))
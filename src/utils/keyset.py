@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from typing import Any, Generic, List, NamedTuple, Optional, Sequence, TypeVar
+
+from sqlalchemy import ColumnElement, and_, or_, tuple_
+
+T = TypeVar('T')
+
+
+class SortKey(NamedTuple):
+    """One column of a keyset ordering, e.g. `SortKey(TransactionTable.value, descending=True)`."""
+    column: ColumnElement
+    descending: bool = False
+
+    def order_by(self, reverse: bool = False) -> ColumnElement:
+        return self.column.asc() if self.descending == reverse else self.column.desc()
+
+
+class KeysetRow(NamedTuple, Generic[T]):
+    item: T
+    # Values of the sort keys for this row
+    key: List[Any]
+    # count(*) OVER () when it was asked for
+    total: Optional[int] = None
+
+
+def order_by_keys(keys: Sequence[SortKey], reverse: bool = False) -> List[ColumnElement]:
+    return [key.order_by(reverse) for key in keys]
+
+
+def _after(key: SortKey, value: Any, reverse: bool) -> ColumnElement:
+    return key.column < value if key.descending != reverse else key.column > value
+
+
+def _after_or_at(key: SortKey, value: Any, reverse: bool) -> ColumnElement:
+    return key.column <= value if key.descending != reverse else key.column >= value
+
+
+def seek_predicate(keys: Sequence[SortKey], values: Sequence[Any], reverse: bool = False) -> ColumnElement:
+    """
+    Predicate selecting the rows that come after `values` in the order given by
+    `keys` (or before them when `reverse` is set).
+
+    When every key sorts the same way this is a single row comparison,
+    `(a, b) > (:a, :b)`. Mixed directions are expanded to
+    `a >= :a AND (a > :a OR (a = :a AND b < :b))`, where the redundant
+    leading bound lets the planner start an index scan at the cursor.
+    """
+    if len({key.descending for key in keys}) == 1:
+        columns = tuple_(*[key.column for key in keys])
+        return _after(SortKey(columns, keys[0].descending), tuple_(*values), reverse)
+
+    clauses = []
+    for i, (key, value) in enumerate(zip(keys, values)):
+        equal_prefix = [keys[j].column == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, _after(key, value, reverse)))
+    return and_(_after_or_at(keys[0], values[0], reverse), or_(*clauses))
+
+
+def encode_key(values: Sequence[Any]) -> List[Any]:
+    """Make a row's sort key JSON serializable."""
+    return [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+
+
+def decode_key(keys: Sequence[SortKey], values: Optional[Sequence[Any]]) -> Optional[List[Any]]:
+    """Turn a sort key read back from a cursor into values comparable with `keys`."""
+    if values is None:
+        return None
+    if len(values) != len(keys):
+        raise ValueError("Invalid cursor format")
+    decoded = []
+    for key, value in zip(keys, values):
+        try:
+            python_type = key.column.type.python_type
+        except NotImplementedError:
+            python_type = None
+        if isinstance(value, str) and python_type in (date, datetime):
+            value = python_type.fromisoformat(value)
+        decoded.append(value)
+    return decoded
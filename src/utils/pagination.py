@@ -1,12 +1,16 @@
 from itertools import chain
 import logging
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
-from typing import Awaitable, Callable, Generic, List, Literal, Optional, Tuple, TypeVar
+from queue import Empty, PriorityQueue, Queue
+from typing import Awaitable, Callable, Generic, Iterator, List, Literal, Optional, Tuple, TypeVar
 
 from pydantic import BaseModel
 
-from ..utils.decorators import timed_operation
+from ..utils.tracing import traced
 
 T = TypeVar("T")
 
@@ -44,80 +48,179 @@ class Paginator(ABC, Generic[T]):
     def _paginate(self) -> List[T]:
         raise NotImplementedError
 
-    def __call__(self) -> Tuple[List[T], float]:
-        data, execution_time = self._paginate()
-        if isinstance(data[0], list):
-            return list(chain.from_iterable(data)), execution_time
+    def __call__(self) -> List[T]:
+        data = self._paginate()
+        if any(isinstance(item, list) for item in data):
+            return list(chain.from_iterable(item for item in data if item))
         else:
-            return data, execution_time
+            return data
+
+
+class PageStats(BaseModel):
+    page: int
+    attempts: int = 0
+    latency: float = 0.0
+    succeeded: bool = False
+    error: Optional[str] = None
+
+
+class PaginationStats(BaseModel):
+    pages: List[PageStats] = []
+
+    @property
+    def failed_pages(self) -> List[int]:
+        return [stats.page for stats in self.pages if not stats.succeeded]
+
+    @property
+    def retried_pages(self) -> List[int]:
+        return [stats.page for stats in self.pages if stats.attempts > 1]
+
+    @property
+    def max_latency(self) -> float:
+        return max((stats.latency for stats in self.pages), default=0.0)
 
 
 class ThreadedPaginator(Paginator[T]):
+    """
+    Fetches pages from a shared work queue: every idle worker takes the next
+    pending page, so one slow page only holds up its own worker. A page that
+    raises or returns None is put back on the queue with a jittered exponential
+    backoff until `max_retries` is exhausted. Per-page attempt and latency
+    stats are kept in `self.stats`. `first_result`, when given, is the already
+    fetched page `first_page` and is not fetched again.
+    """
+
     def __init__(
         self,
         logger: logging.Logger,
         pagination_details: PaginationDetails,
         thread_count: int,
         process_function: Callable[[int], List[T]],
-        first_result: Optional[T] = None
+        first_result: Optional[T] = None,
+        first_page: int = 1,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
     ):
         super().__init__(logger, pagination_details, process_function)
         self.thread_count = max(1, thread_count)
         self.first_result = first_result
+        self.first_page = first_page
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
         # Initialize results list with the correct length based on total pages
         self.results = [None] * (
             (self.total_items + self.page_size - 1) // self.page_size
         )
+        self.stats = PaginationStats()
 
-        if self.first_result:
-            self.results[0] = self.first_result
+        if self._has_first_result:
+            self.results[self.first_page - 1] = self.first_result
 
-    @timed_operation
-    def _paginate(self) -> List[T]:
+    @property
+    def _has_first_result(self) -> bool:
+        return bool(self.first_result) and 1 <= self.first_page <= len(self.results)
+
+    def _retry_delay(self, attempt: int) -> float:
+        # "Full jitter": a random delay up to the exponential cap
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def _attempt(self, page: int, stats: PageStats) -> Optional[T]:
+        stats.attempts += 1
+        start_time = time.perf_counter()
+        try:
+            result = self.process_function(page)
+            if result is None:
+                stats.error = "Got None"
+        except Exception as e:
+            result = None
+            stats.error = repr(e)
+        stats.latency += time.perf_counter() - start_time
+        return result
+
+    def stream(self) -> Iterator[Tuple[int, Optional[T], PageStats]]:
+        """
+        Fetch every remaining page and yield `(page, result, stats)` as soon as
+        each page either succeeds or runs out of retries (then result is None).
+        """
         total_pages = len(self.results)
         self.info(
             'pagination_details',
             f"Total Documents, Pages: {self.total_items}, {total_pages}"
         )
-
-        # Adjust the page range to skip the first page if already provided
-        # Start from page 2 if first result is available
-        start_page = 2 if self.first_result else 1
-
-        if self.thread_count == 1:
-            self.logger.info("pagination_mode"
-                             "Running in single-thread mode.")
-            for page in range(start_page, total_pages + 1):
-                self._worker(page, page)
-        else:
-            self.logger.info("pagination_mode"
-                             f"Running in multi-thread mode. ({self.thread_count} threads)")
-            pages_per_thread = (
-                total_pages + self.thread_count - 1
-            ) // self.thread_count
-            with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
-                for i in range(self.thread_count):
-                    # Calculate starting and ending pages, skipping the first page if already provided
-                    start_page_thread = max(
-                        i * pages_per_thread + 1, start_page)
-                    end_page_thread = min(
-                        start_page_thread + pages_per_thread - 1, total_pages)
-                    executor.submit(
-                        self._worker, start_page_thread, end_page_thread)
-
+        # Skip the page that was already provided
+        skipped_page = self.first_page if self._has_first_result else None
+        pending: PriorityQueue[Tuple[float, int]] = PriorityQueue()
+        page_stats = {page: PageStats(page=page)
+                      for page in range(1, total_pages + 1) if page != skipped_page}
+        for page in page_stats:
+            pending.put((0.0, page))
+        done: Queue[Tuple[int, Optional[T], PageStats]] = Queue()
+        remaining = len(page_stats)
+        lock = threading.Lock()
+        finished = threading.Event()
+        if not remaining:
+            finished.set()
+
+        def worker():
+            nonlocal remaining
+            while not finished.is_set():
+                try:
+                    ready_at, page = pending.get(timeout=0.05)
+                except Empty:
+                    continue
+                # Fresh pages sort first, so a page that is still backing off
+                # is only picked up when there is nothing else left to do.
+                delay = ready_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                stats = page_stats[page]
+                result = self._attempt(page, stats)
+                if result is None and stats.attempts <= self.max_retries:
+                    self.logger.warning(
+                        f"Page {page} failed on attempt {stats.attempts} ({stats.error}), retrying")
+                    pending.put(
+                        (time.monotonic() + self._retry_delay(stats.attempts), page))
+                    continue
+                stats.succeeded = result is not None
+                with lock:
+                    remaining -= 1
+                    if remaining == 0:
+                        finished.set()
+                done.put((page, result, stats))
+                self.debug('iteration', f"PAGE={page}:ATTEMPTS={stats.attempts}")
+
+        workers = min(self.thread_count, len(page_stats)) or 1
+        mode = "single-thread" if workers == 1 else f"multi-thread ({workers} threads)"
+        self.info('pagination_mode', f"Running in {mode} mode.")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker) for _ in range(workers)]
+            try:
+                for _ in range(len(page_stats)):
+                    page, result, stats = done.get()
+                    self.stats.pages.append(stats)
+                    if result is None:
+                        self.logger.error(
+                            f"Giving up on page {page} after {stats.attempts} attempts: {stats.error}")
+                    else:
+                        self.results[page - 1] = result
+                    yield page, result, stats
+            finally:
+                # Lets the workers exit if the consumer stopped early
+                finished.set()
+            for future in futures:
+                # Surface anything that escaped the per-page error handling
+                future.result()
+
+    @traced
+    def _paginate(self) -> List[T]:
+        for _ in self.stream():
+            pass
+        if self.stats.failed_pages:
+            self.logger.error(f"Pages {self.stats.failed_pages} could not be fetched")
+        self.info(
+            'pagination_details',
+            f"Retried pages: {self.stats.retried_pages}, slowest page took {self.stats.max_latency:.4f} seconds"
+        )
         return self.results
-
-    def _worker(self, start_page: int, end_page: int):
-        for page in range(start_page, end_page + 1):
-            if page == 1 and self.first_result is not None:
-                continue  # Skip the first page if first_result is already set
-
-            result = self.process_function(page)
-            if result is None:
-                self.logger.error(
-                    f"Processed page {page} with skip count {
-                        page} and got None."
-                )
-            else:
-                self.results[page - 1] = result
-            self.debug('iteration', f"PAGE={page}:CURSOR={page}")
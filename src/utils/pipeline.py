@@ -0,0 +1,141 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from logging import getLogger
+from typing import Any, Callable, Deque, Generic, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class ThreadedStage(Generic[T, R]):
+    """
+    One stage of a bounded producer/consumer pipeline.
+
+    `func` is applied to every item of `source` on a background thread and the
+    results are handed downstream through a queue of at most `buffer_size`
+    items. When the consumer falls behind the queue fills up and the stage
+    blocks, which in turn stops it from pulling more items from `source`.
+    Exceptions raised by `source` or `func` are re-raised in the consumer.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[T],
+        func: Callable[[T], R],
+        buffer_size: int,
+        name: str = 'stage',
+    ):
+        self.source = source
+        self.func = func
+        self.name = name
+        self.logger = getLogger(f'{self.__class__.__name__}[{name}]')
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, buffer_size))
+        self._stopped = threading.Event()
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for item in self.source:
+                if not self._put(self.func(item)):
+                    return
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            self._close_source()
+
+    def _close_source(self):
+        # Closing the source from this thread lets generator sources
+        # release whatever they hold when the consumer stops early.
+        close = getattr(self.source, 'close', None)
+        if close:
+            close()
+
+    def __iter__(self) -> Iterator[R]:
+        thread = threading.Thread(
+            target=self._run, name=f'{self.name}-stage', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.exc
+                yield item
+        finally:
+            self._stopped.set()
+
+
+class ProcessPoolStage(ThreadedStage[T, R]):
+    """
+    A `ThreadedStage` whose work runs on a process pool.
+
+    `split` turns every item of `source` into jobs, tuples of picklable
+    arguments for `func`, which are submitted to `executor`. Once all the jobs
+    of an item are done, `join` builds the stage's result from the item and
+    their results. Up to `max_in_flight` items are worked on at once, and
+    results are still handed downstream in source order.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[T],
+        func: Callable[..., Any],
+        executor: Executor,
+        split: Callable[[T], Sequence[Tuple]],
+        join: Callable[[T, List[Any]], R],
+        max_in_flight: int,
+        buffer_size: int,
+        name: str = 'stage',
+    ):
+        super().__init__(source, func, buffer_size, name)
+        self.executor = executor
+        self.split = split
+        self.join = join
+        self.max_in_flight = max(1, max_in_flight)
+
+    def _run(self):
+        pending: Deque[Tuple[T, List[Future]]] = deque()
+
+        def head_ready() -> bool:
+            return len(pending) >= self.max_in_flight or all(future.done() for future in pending[0][1])
+
+        try:
+            for item in self.source:
+                futures = [self.executor.submit(self.func, *job)
+                           for job in self.split(item)]
+                pending.append((item, futures))
+                while pending and head_ready():
+                    item, futures = pending.popleft()
+                    if not self._put(self.join(item, [future.result() for future in futures])):
+                        return
+            while pending:
+                item, futures = pending.popleft()
+                if not self._put(self.join(item, [future.result() for future in futures])):
+                    return
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            for _, futures in pending:
+                for future in futures:
+                    future.cancel()
+            self._close_source()
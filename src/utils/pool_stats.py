@@ -0,0 +1,215 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds in seconds of the checkout latency histogram
+CHECKOUT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolSnapshot(BaseModel):
+    engine: str
+    pool_size: int
+    max_overflow: int
+    # Connections handed out right now, idle in the pool, and opened past pool_size
+    checked_out: int
+    checked_in: int
+    overflow: int
+    # Checkouts waiting right now because every connection is handed out and the pool can't grow
+    waiting: int
+    peak_checked_out: int
+    peak_waiting: int
+    checkouts: int
+    checkout_timeouts: int
+    connects: int
+    disconnects: int
+    invalidations: int
+    checkout_latency_count: int
+    checkout_latency_sum: float
+    checkout_latency_max: float
+    # Cumulative number of checkouts that took at most each bound in seconds, like Prometheus' `le`
+    checkout_latency_buckets: Dict[str, int]
+
+
+class PoolStats:
+    """
+    Live counters of one engine's connection pool.
+
+    Connections handed out, opened, closed and invalidated are counted from the
+    pool events. The time each checkout waits, including opening a new
+    connection when the pool may still grow, is recorded by the pool itself,
+    which has to be one of the `Instrumented*Pool` classes.
+    """
+
+    def __init__(self, name: str, pool: QueuePool):
+        self.name = name
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._waiting = 0
+        self._peak_waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._disconnects = 0
+        self._invalidations = 0
+        self._latency_counts = [0] * (len(CHECKOUT_LATENCY_BUCKETS) + 1)
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'close', self._on_close)
+        event.listen(pool, 'invalidate', self._on_invalidate)
+        if isinstance(pool, TimedCheckout):
+            pool.stats = self
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._checked_out -= 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connects += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._disconnects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self._invalidations += 1
+
+    def begin_wait(self):
+        with self._lock:
+            self._waiting += 1
+            self._peak_waiting = max(self._peak_waiting, self._waiting)
+
+    def end_wait(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def record_checkout(self, seconds: Optional[float], timed_out: bool = False):
+        """`seconds` is None for checkouts that failed, which are left out of the latency histogram."""
+        with self._lock:
+            if timed_out:
+                self._timeouts += 1
+            if seconds is None:
+                return
+            self._latency_counts[bisect.bisect_left(CHECKOUT_LATENCY_BUCKETS, seconds)] += 1
+            self._latency_sum += seconds
+            self._latency_max = max(self._latency_max, seconds)
+
+    def snapshot(self) -> PoolSnapshot:
+        pool = self.pool
+        with self._lock:
+            buckets, total = {}, 0
+            for bound, count in zip([*map(str, CHECKOUT_LATENCY_BUCKETS), '+Inf'], self._latency_counts):
+                total += count
+                buckets[bound] = total
+            return PoolSnapshot(
+                engine=self.name,
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=self._checked_out,
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+                waiting=self._waiting,
+                peak_checked_out=self._peak_checked_out,
+                peak_waiting=self._peak_waiting,
+                checkouts=self._checkouts,
+                checkout_timeouts=self._timeouts,
+                connects=self._connects,
+                disconnects=self._disconnects,
+                invalidations=self._invalidations,
+                checkout_latency_count=total,
+                checkout_latency_sum=self._latency_sum,
+                checkout_latency_max=self._latency_max,
+                checkout_latency_buckets=buckets,
+            )
+
+
+class TimedCheckout:
+    """
+    Pool mixin that reports how long every checkout takes to its `PoolStats`,
+    and counts the ones that have to wait for a connection to be returned.
+    """
+    stats: Optional[PoolStats] = None
+
+    def _must_wait(self) -> bool:
+        # Nothing idle and no room to open another connection
+        return self._pool.empty() and -1 < self._max_overflow <= self._overflow
+
+    def _do_get(self):
+        stats = self.stats
+        if stats is None:
+            return super()._do_get()
+        waiting = self._must_wait()
+        if waiting:
+            stats.begin_wait()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            stats.record_checkout(None, timed_out=True)
+            raise
+        except BaseException:
+            stats.record_checkout(None)
+            raise
+        finally:
+            if waiting:
+                stats.end_wait()
+        stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool, which keeps the event listeners but not `stats`
+        pool = super().recreate()
+        pool.stats = self.stats
+        if self.stats is not None:
+            self.stats.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+_registry: Dict[str, PoolStats] = {}
+_registry_lock = threading.Lock()
+
+
+def instrument_pool(name: str, pool: QueuePool) -> PoolStats:
+    """Start collecting the statistics of `pool`, listed by `pool_snapshots` under `name`."""
+    stats = PoolStats(name, pool)
+    with _registry_lock:
+        _registry[name] = stats
+    return stats
+
+
+def forget_pool(name: str):
+    with _registry_lock:
+        _registry.pop(name, None)
+
+
+def pool_snapshots() -> List[PoolSnapshot]:
+    with _registry_lock:
+        stats = list(_registry.values())
+    return [item.snapshot() for item in stats]
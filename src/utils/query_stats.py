@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, event
+
+from .tracing import Span, current_span
+
+slow_query_logger = logging.getLogger('slow_queries')
+
+# Characters of a statement, and of its parameters, written to the slow query log
+MAX_LOGGED_LENGTH = 2000
+
+
+class QueryTotals(BaseModel):
+    engine: str
+    statements: int
+    # Statements the database answered with an error, a cancelled one among them
+    failed_statements: int
+    statement_time: float
+    slow_statements: int
+    slowest_statement: float
+
+
+def normalize_statement(statement: str) -> str:
+    """`statement` on a single line, with every run of whitespace collapsed."""
+    return ' '.join(statement.split())
+
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_LOGGED_LENGTH else f'{text[:MAX_LOGGED_LENGTH]}...'
+
+
+class QueryStats:
+    """
+    Statement counters of one engine, fed by its cursor events.
+
+    Every statement is also timed as a `db` span under the current span, so
+    the `Server-Timing` header of a request tells how many statements it ran
+    and for how long. Statements that take `slow_threshold` seconds or more,
+    failed ones included, go to the `slow_queries` log.
+    """
+
+    def __init__(self, name: str, engine: Engine, slow_threshold: Optional[float], log_parameters: bool):
+        self.name = name
+        self.slow_threshold = slow_threshold
+        self.log_parameters = log_parameters
+        self._lock = threading.Lock()
+        self._statements = 0
+        self._failed = 0
+        self._statement_time = 0.0
+        self._slow = 0
+        self._slowest = 0.0
+
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+        event.listen(engine, 'handle_error', self._on_error)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        statement_span = Span('db')
+        parent = current_span()
+        if parent is not None:
+            parent.children.append(statement_span)
+        context._statement_span = statement_span
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._finish(context, statement, parameters, failed=False)
+
+    def _on_error(self, exception_context):
+        self._finish(exception_context.execution_context, exception_context.statement,
+                     exception_context.parameters, failed=True)
+
+    def _finish(self, context, statement: Optional[str], parameters: Any, failed: bool):
+        statement_span: Optional[Span] = getattr(context, '_statement_span', None)
+        if statement_span is None:
+            return
+        context._statement_span = None
+        statement_span.end = time.perf_counter()
+        seconds = statement_span.duration
+        slow = self.slow_threshold is not None and seconds >= self.slow_threshold
+        with self._lock:
+            self._statements += 1
+            self._statement_time += seconds
+            self._slowest = max(self._slowest, seconds)
+            if failed:
+                self._failed += 1
+            if slow:
+                self._slow += 1
+        if slow:
+            self._log_slow(statement or '', parameters, seconds, failed)
+
+    def _log_slow(self, statement: str, parameters: Any, seconds: float, failed: bool):
+        outcome = 'failed after' if failed else 'took'
+        message = f"[{self.name}] {outcome} {seconds * 1000:.1f} ms: {_truncate(normalize_statement(statement))}"
+        if self.log_parameters and parameters:
+            message += f" -- parameters: {_truncate(repr(parameters))}"
+        slow_query_logger.warning(message)
+
+    def totals(self) -> QueryTotals:
+        with self._lock:
+            return QueryTotals(
+                engine=self.name,
+                statements=self._statements,
+                failed_statements=self._failed,
+                statement_time=self._statement_time,
+                slow_statements=self._slow,
+                slowest_statement=self._slowest,
+            )
+
+
+_registry: Dict[str, QueryStats] = {}
+_registry_lock = threading.Lock()
+
+
+def instrument_engine(name: str, engine: Engine, slow_threshold: Optional[float] = None,
+                      log_parameters: bool = True) -> QueryStats:
+    """Start counting the statements `engine` runs, listed by `query_totals` under `name`."""
+    stats = QueryStats(name, engine, slow_threshold, log_parameters)
+    with _registry_lock:
+        _registry[name] = stats
+    return stats
+
+
+def forget_engine(name: str):
+    with _registry_lock:
+        _registry.pop(name, None)
+
+
+def query_totals() -> List[QueryTotals]:
+    with _registry_lock:
+        stats = list(_registry.values())
+    return [item.totals() for item in stats]
@@ -2,8 +2,10 @@
 
 from http import HTTPStatus
 
+from fastapi import Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from pydantic_core import to_json
 
 from ..schemas.api_response import ApiResponse, Meta
 
@@ -17,3 +19,13 @@ def create_exception_response(status_code: HTTPStatus, exception: Exception) ->
 
 def create_json_response(api_response: ApiResponse) -> JSONResponse:
     return JSONResponse(status_code=api_response.meta.status, content=jsonable_encoder(api_response))
+
+
+def create_raw_json_response(api_response: ApiResponse) -> Response:
+    """
+    Serialize `api_response` to JSON bytes in a single pydantic-core pass. The
+    route's response_model and jsonable_encoder are bypassed, so this is only
+    for responses built from data we trust, like rows read from our own tables.
+    """
+    return Response(content=to_json(api_response), status_code=api_response.meta.status,
+                    media_type='application/json')
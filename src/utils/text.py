@@ -1,7 +1,10 @@
 import re
 
+TRAILING_T = re.compile(r'\s+T$')
+WHITESPACE_RUN = re.compile(r'\s{2,}')
+
 
 def strip_excess_whitespace(text: str) -> list[str]:
-    cleaned_string = re.sub(r'\s+T$', '', text).strip()
-    parts = re.split(r'\s{2,}', cleaned_string)
+    cleaned_string = TRAILING_T.sub('', text).strip()
+    parts = WHITESPACE_RUN.split(cleaned_string)
     return parts
@@ -0,0 +1,134 @@
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar('F', bound=Callable)
+
+
+class Span:
+    """A named, timed piece of work and the spans started inside it."""
+    __slots__ = ('name', 'start', 'end', 'children')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List['Span'] = []
+
+    @property
+    def duration(self) -> float:
+        """Seconds from its start to its end, or until now while it is open."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def walk(self) -> Iterator['Span']:
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+
+# Innermost open span of the running request, task or thread
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """
+    Time the block as a child of the current span. Threads and tasks started
+    from a request see its spans when they copy the context, as Starlette's
+    threadpool does, other threads start spans of their own.
+    """
+    parent = _current_span.get()
+    current = Span(name)
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{name} took {current.end - current.start:.4f} seconds")
+
+
+def traced(func: Optional[F] = None, *, name: Optional[str] = None):
+    """Run every call of a function or coroutine in a span named after it."""
+    def decorate(func: F) -> F:
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def elapsed() -> float:
+    """Seconds since the current span started, what a service reports as `Meta.request_time`."""
+    current = _current_span.get()
+    return current.duration if current is not None else 0.0
+
+
+def server_timing(root: Span) -> str:
+    """
+    `Server-Timing` header value with the time spent in every span name under
+    `root`, and the total. Names seen more than once say how many times in
+    their description, like `db;dur=4.10;desc="12 calls"`.
+    """
+    totals: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for item in root.walk():
+        totals[item.name] = totals.get(item.name, 0.0) + item.duration
+        counts[item.name] = counts.get(item.name, 0) + 1
+    metrics = [
+        f'{name};dur={seconds * 1000:.2f}' + (f';desc="{counts[name]} calls"' if counts[name] > 1 else '')
+        for name, seconds in totals.items()
+    ]
+    metrics.append(f'total;dur={root.duration * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Trace every HTTP request under a root span and send the time spent in its
+    spans as a `Server-Timing` header, which browsers show next to the request.
+    Work done after the headers, like a streamed body, is not in it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with span('request') as root:
+            async def send_with_timing(message: Message):
+                if message['type'] == 'http.response.start':
+                    MutableHeaders(scope=message).append(
+                        'Server-Timing', server_timing(root))
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
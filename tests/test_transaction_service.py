@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config import config
+from src.models import TransactionTable
+from src.models.currency import CurrencyTable
+from src.repositories.transaction_repository import TransactionRepository
+from src.services import currency_registry
+from src.services.currency_registry import CurrencyRegistry
+from src.services.currency_service import CurrencyService
+from src.services.transaction_service import TransactionService
+from src.schemas.transaction import TransactionCreate
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine('sqlite://', poolclass=StaticPool,
+                           connect_args={'check_same_thread': False})
+    CurrencyTable.__table__.create(engine)
+    TransactionTable.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO currencies (id, code, created_at) VALUES (1, 'CRC', '2024-01-01')"))
+    Session = sessionmaker(engine)
+
+    # The rollups are written with PostgreSQL only statements
+    monkeypatch.setattr(TransactionRepository, '_add_to_rollups', lambda self, rows: None)
+    monkeypatch.setattr(config, 'KNOWN_IDS_FILTER_ENABLED', False)
+    monkeypatch.setattr(currency_registry, 'currency_registry_instance', CurrencyRegistry(Session, 300))
+
+    db = Session()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_create_returns_body(session):
+    service = TransactionService(session, None, CurrencyService(session))
+    transaction = TransactionCreate(
+        bank_name='BAC',
+        bank_email='notificacion@notificacionesbaccr.com',
+        business='SUPERMERCADO',
+        currency='CRC',
+        date=datetime(2024, 5, 1, 12, 30),
+        value=1500.0,
+        body='<p>Compra aprobada</p>',
+    )
+
+    response = service.create(transaction)
+
+    assert response.data.item.body == '<p>Compra aprobada</p>'
+    assert response.data.item.currency == 'CRC'